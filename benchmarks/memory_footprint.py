@@ -0,0 +1,237 @@
+"""
+Memory footprint benchmarks for DNI objects and collections, measured with
+tracemalloc.
+
+Run it to compare the current footprint against the recorded baselines, or to
+record new ones:
+
+    $ python benchmarks/memory_footprint.py
+    $ python benchmarks/memory_footprint.py --sizes 1000 10000 --update
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+import dni
+
+DEFAULT_SIZES = [10**exponent for exponent in range(3, 8)]
+DEFAULT_TOLERANCE = 0.1
+BASELINES_PATH = Path(__file__).resolve().parent / "memory_baselines.json"
+
+
+def measure_dni_instance_bytes(quantity: int) -> float:
+    """
+    Measure the memory retained by each DNI instance.
+
+    :param quantity: how many instances to create.
+    :return: the bytes per instance.
+    """
+    dni_strings = generate_dni_strings(quantity)
+    dni.DNI(dni_strings[0])  # Warm up regex caches out of the measurement.
+
+    tracemalloc.start()
+    try:
+        instances = [dni.DNI(dni_string) for dni_string in dni_strings]
+        retained_bytes, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return (retained_bytes - sys.getsizeof(instances)) / quantity
+
+
+def measure_extracted_list_element_bytes(quantity: int) -> float:
+    """
+    Measure the memory retained by each element of the list returned by
+    ``dni.extract_dnis_from_text``, list slot included.
+
+    :param quantity: how many DNIs the text contains.
+    :return: the bytes per element.
+    """
+    text = " ".join(generate_dni_strings(quantity))
+    dni.extract_dnis_from_text(text[:9])
+
+    tracemalloc.start()
+    try:
+        extracted_dnis = dni.extract_dnis_from_text(text)
+        retained_bytes, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(extracted_dnis) == quantity
+    return retained_bytes / quantity
+
+
+def measure_is_valid_bytes(quantity: int) -> Dict[str, float]:
+    """
+    Measure the transient memory used by ``dni.is_valid`` calls, and the
+    memory they leave behind.
+
+    :param quantity: how many calls to make.
+    :return: the peak transient bytes of a call and the retained bytes per
+     call.
+    """
+    dni_strings = generate_dni_strings(quantity)
+    dni.is_valid(dni_strings[0])
+
+    tracemalloc.start()
+    try:
+        base_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for dni_string in dni_strings:
+            dni.is_valid(dni_string)
+        retained_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "is_valid_peak_transient_bytes": peak_bytes - base_bytes,
+        "is_valid_retained_bytes_per_call": (retained_bytes - base_bytes)
+        / quantity,
+    }
+
+
+def measure(quantity: int) -> Dict[str, float]:
+    """
+    Run every measurement for one input size.
+
+    :param quantity: the number of elements.
+    :return: the measurements, by name.
+    """
+    results = {
+        "dni_instance_bytes": measure_dni_instance_bytes(quantity),
+        "extracted_list_element_bytes": measure_extracted_list_element_bytes(
+            quantity
+        ),
+    }
+    results.update(measure_is_valid_bytes(quantity))
+
+    return {name: round(value, 2) for name, value in results.items()}
+
+
+def generate_dni_strings(quantity: int) -> List[str]:
+    """
+    Generate distinct, valid DNI strings.
+
+    :param quantity: how many to generate.
+    :return: the DNI strings.
+    """
+    return [
+        f"{number:08d}" + dni.compute_check_letter(number)
+        for number in range(quantity)
+    ]
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baselines: Dict[str, Dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """
+    Compare measurements against baselines. Only growths beyond the tolerance
+    count as regressions; sizes or measurements without a baseline are
+    ignored.
+
+    :param results: measurements by input size and name.
+    :param baselines: baseline measurements by input size and name.
+    :param tolerance: the allowed relative growth.
+    :return: a description of every regression found.
+    """
+    regressions = []
+    for size, measurements in results.items():
+        for name, value in measurements.items():
+            baseline = baselines.get(size, {}).get(name)
+            if baseline is None:
+                continue
+            allowed = max(baseline * (1 + tolerance), baseline + 1)
+            if value > allowed:
+                regressions.append(
+                    f"{name} at {size} elements grew from {baseline} to"
+                    f" {value} bytes"
+                )
+
+    return regressions
+
+
+def load_baselines(python_version: str = None) -> Dict[str, Dict[str, float]]:
+    """
+    Read the recorded baselines for a Python version. Object sizes change
+    between Python versions, so each version has its own baselines.
+
+    :param python_version: a "major.minor" version, the running one if None.
+    :return: the baselines by input size and name, empty if none recorded.
+    """
+    python_version = python_version or _current_python_version()
+    if not BASELINES_PATH.exists():
+        return {}
+
+    with open(BASELINES_PATH, "rt") as baselines_file:
+        return json.load(baselines_file).get(python_version, {})
+
+
+def save_baselines(results: Dict[str, Dict[str, float]]) -> None:
+    """
+    Record measurements as the baselines of the running Python version,
+    keeping the ones of other versions and sizes.
+
+    :param results: measurements by input size and name.
+    :return: None
+    """
+    all_baselines = {}
+    if BASELINES_PATH.exists():
+        with open(BASELINES_PATH, "rt") as baselines_file:
+            all_baselines = json.load(baselines_file)
+
+    version_baselines = all_baselines.setdefault(_current_python_version(), {})
+    version_baselines.update(results)
+
+    with open(BASELINES_PATH, "wt") as baselines_file:
+        json.dump(all_baselines, baselines_file, indent=2, sort_keys=True)
+        baselines_file.write("\n")
+
+
+def _current_python_version() -> str:
+    """
+    Get the "major.minor" version of the running Python.
+
+    :return: the version.
+    """
+    return ".".join(platform.python_version_tuple()[:2])
+
+
+def main() -> int:
+    """
+    Measure, then compare with or update the baselines.
+
+    :return: the exit code, 1 if there are regressions.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update", action="store_true")
+    arguments = parser.parse_args()
+
+    results = {}
+    for size in arguments.sizes:
+        results[str(size)] = measure(size)
+        print(json.dumps({size: results[str(size)]}))
+
+    if arguments.update:
+        save_baselines(results)
+        return 0
+
+    regressions = find_regressions(
+        results, load_baselines(), arguments.tolerance
+    )
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
-from typing import List, Callable, Union, Tuple
-import re
+from typing import List, Callable, Union, Tuple, Iterator, TextIO
+from collections import Counter
 from functools import partial
 import random
 
@@ -22,6 +22,7 @@ from .exceptions import (
     DNIExceptionDetails,
     _DoNotRaiseMe,
 )
+from .scanner import DNIScanner, DNIMatch, ExtractionReport
 
 __all__ = [
     "DNI",
@@ -31,11 +32,34 @@ __all__ = [
     "add_or_fix_check_letter",
     "text_contains_dni",
     "extract_dnis_from_text",
+    "iter_dni_matches",
+    "count_dnis",
+    "dni_frequencies",
+    "iter_range",
+    "fill_range",
+    "report",
+    "ValidationReport",
+    "estimate_quality",
+    "QualityEstimate",
+    "DNICardinalitySketch",
+    "DNIHeavyHitters",
+    "DNIFuzzyIndex",
+    "FuzzyMatch",
+    "DNIWatchlist",
+    "partition",
+    "validate",
+    "extract",
+    "DNIMatch",
+    "ExtractionReport",
+    "DNIScanner",
     "MissingCheckLetterException",
     "InvalidCheckLetterException",
     "NoNumberFoundException",
 ]
 
+# Module-level functions behave like this scanner.
+_DEFAULT_SCANNER = DNIScanner()
+
 
 class DNI:
     """
@@ -47,22 +71,16 @@ class DNI:
 
     def __init__(self, potentiaL_dni_string: str, fix_issues: bool = False):
         try:
-            _search_and_raise_issues_with_potential_dni_string(
-                potentiaL_dni_string
-            )
-            self._dni = _remove_clutter_from_potential_dni_string(
-                potentiaL_dni_string
-            ).upper()
+            number, check_letter = _DEFAULT_SCANNER.parse(potentiaL_dni_string)
         except (MissingCheckLetterException, InvalidCheckLetterException):
             if not fix_issues:
-                _search_and_raise_issues_with_potential_dni_string(
-                    potentiaL_dni_string
-                )  # Call it again but let it raise this time
-            number = self._dni = _extract_exactly_one_dni_number_from_string(
+                raise
+            number = _DEFAULT_SCANNER.extract_exactly_one_number(
                 potentiaL_dni_string
             )
-            valid_check_letter = compute_check_letter(number)
-            self._dni = number + valid_check_letter.upper()
+            check_letter = compute_check_letter(number)
+
+        self._dni = number + check_letter
 
     @property
     def number(self) -> str:
@@ -172,7 +190,70 @@ class DNI:
         check_letter = compute_check_letter(number)
 
         dni_string = number + check_letter
-        return DNI(dni_string)
+        return cls.from_validated(dni_string)
+
+    @classmethod
+    def from_int(cls, number: int) -> "DNI":
+        """
+        Build a DNI instance from the integer value of its number, computing
+        the check letter. No string is parsed.
+
+        :param number: the number, between 0 and 99999999.
+        :return: the DNI instance.
+        """
+        if not 0 <= number < 10**8:
+            raise ValueError(
+                f"DNI numbers must be between 0 and 99999999, not {number}"
+            )
+
+        check_letter = compute_check_letter(number)
+        return cls.from_validated(f"{number:08d}{check_letter}")
+
+    @classmethod
+    def from_parts(cls, number: str, check_letter: str) -> "DNI":
+        """
+        Build a DNI instance from an already separated number and check
+        letter, such as the ones in a ``DNIMatch``. No string is parsed: the
+        check letter is just compared to the right one for the number.
+
+        :param number: the 8 digit number, in ASCII digits.
+        :param check_letter: the check letter, in upper or lower case.
+        :return: the DNI instance.
+        """
+        # str.isdigit also accepts other Unicode digits, such as "²".
+        if len(number) != 8 or any(
+            character not in NUMBER_CHARACTERS for character in number
+        ):
+            raise NoNumberFoundException(DNIExceptionDetails(string=number))
+
+        check_letter = check_letter.upper()
+        valid_check_letter = compute_check_letter(number)
+        if check_letter != valid_check_letter:
+            raise InvalidCheckLetterException(
+                DNIExceptionDetails(
+                    string=number + check_letter,
+                    number=number,
+                    invalid_check_letter=check_letter,
+                    valid_check_letter=valid_check_letter,
+                )
+            )
+
+        return cls.from_validated(number + check_letter)
+
+    @classmethod
+    def from_validated(cls, dni_string: str) -> "DNI":
+        """
+        Build a DNI instance from a string that is already known to be a valid
+        DNI formatted like ``DNI.format()``, skipping any parsing and checks.
+        Passing any other string leads to a broken instance.
+
+        :param dni_string: the valid DNI string.
+        :return: the DNI instance.
+        """
+        a_dni = cls.__new__(cls)
+        a_dni._dni = dni_string  # pylint: disable=protected-access
+
+        return a_dni
 
 
 def is_valid(potential_dni_string: str) -> bool:
@@ -183,14 +264,7 @@ def is_valid(potential_dni_string: str) -> bool:
     :return: True if so, False otherwise.
     """
 
-    return _true_unless_some_exception(
-        callable_to_run=partial(DNI, potential_dni_string),
-        exceptions_that_lead_to_false=(
-            NoNumberFoundException,
-            MissingCheckLetterException,
-            InvalidCheckLetterException,
-        ),
-    )
+    return _DEFAULT_SCANNER.validate(potential_dni_string)
 
 
 def check_letter_is_valid(potential_dni_string: str) -> bool:
@@ -262,39 +336,93 @@ def add_or_fix_check_letter(dni_or_number_string: str) -> str:
 
 def text_contains_dni(text: str) -> bool:
     """
-    Check if a text contains or more DNI occurrences.
+    Check if a text contains or more DNI occurrences. Stops scanning the text
+    at the first occurrence.
 
     :param text: a text that may contain some or no DNI-valid substrings.
     :return: True if so, False otherwise.
     """
-    dni_matching_strings = re.findall(
-        REGEX_FOR_FULL_DNI_WITH_POSSIBLE_CLUTTER, text
-    )
+    return _DEFAULT_SCANNER.contains(text)
 
-    if dni_matching_strings:
-        return True
 
-    return False
+def iter_dni_matches(text_or_stream: Union[str, TextIO]) -> Iterator[DNIMatch]:
+    """
+    Lazily find DNI-valid substrings in a text, along with their positions.
+    The check letters are not validated.
 
+    :param text_or_stream: a text that may contain some or no DNI-valid
+     substrings, or a text stream, such as a file opened in text mode, that
+     will be read in chunks.
+    :return: an iterator over the matches, in order of appearance. Offsets
+     are relative to the start of the text or stream.
+    """
+    return _DEFAULT_SCANNER.finditer(text_or_stream)
+
+
+def count_dnis(text_or_stream: Union[str, TextIO]) -> int:
+    """
+    Count the DNIs with a valid check letter in a text, without building DNI
+    instances for them.
 
-def extract_dnis_from_text(text: str) -> List[DNI]:
+    :param text_or_stream: a text that may contain some or no DNI-valid
+     substrings, or a text stream.
+    :return: the number of DNIs found, repetitions included.
+    """
+    return sum(1 for _ in _iter_valid_dni_strings(text_or_stream))
+
+
+def dni_frequencies(
+    text_or_stream: Union[str, TextIO], top: int = None
+) -> List[Tuple[str, int]]:
+    """
+    Count how many times each DNI with a valid check letter appears in a text,
+    without building DNI instances for them.
+
+    :param text_or_stream: a text that may contain some or no DNI-valid
+     substrings, or a text stream.
+    :param top: if set, only return this many of the most common DNIs.
+    :return: a list of (DNI string, count) pairs, most common first. DNI
+     strings are formatted like ``DNI.format()``.
+    """
+    if top is not None and top <= 0:
+        raise ValueError(
+            f"You can only request the top 1 or more DNIs, not {top}"
+        )
+
+    return Counter(_iter_valid_dni_strings(text_or_stream)).most_common(top)
+
+
+def extract_dnis_from_text(
+    text: str, mode: str = "strict"
+) -> Union[List[DNI], ExtractionReport]:
     """
     Find DNI-valid substrings in a text and generate DNI instances from them.
 
     :param text: a text that may contain some or no DNI-valid substrings.
-    :return: a list with the found DNIs as instances of the DNI class.
+    :param mode: what to do with candidates with an invalid check letter:
+     raise an ``InvalidCheckLetterException`` ("strict"), skip them
+     ("valid_only"), replace their check letter with the right one ("fix"),
+     or return them along with the valid ones ("report").
+    :return: a list with the found DNIs as instances of the DNI class, or an
+     ``ExtractionReport`` in "report" mode.
     """
+    return _DEFAULT_SCANNER.extract(text, mode)
 
-    dni_matching_strings = re.findall(
-        REGEX_FOR_FULL_DNI_WITH_POSSIBLE_CLUTTER, text
-    )
 
-    found_dnis = [
-        DNI(number + check_letter)
-        for number, check_letter in dni_matching_strings
-    ]
+def _iter_valid_dni_strings(
+    text_or_stream: Union[str, TextIO]
+) -> Iterator[str]:
+    """
+    Find the DNIs with a valid check letter in a text, skipping the ones with
+    an invalid check letter.
 
-    return found_dnis
+    :param text_or_stream: a text or a text stream.
+    :return: an iterator over the DNIs, formatted like ``DNI.format()``.
+    """
+    for dni_match in iter_dni_matches(text_or_stream):
+        check_letter = dni_match.check_letter.upper()
+        if check_letter == compute_check_letter(dni_match.number):
+            yield dni_match.number + check_letter
 
 
 def _search_and_raise_issues_with_potential_dni_string(
@@ -307,42 +435,7 @@ def _search_and_raise_issues_with_potential_dni_string(
     :param potential_dni_string: the string that may contain a DNI.
     :return: None
     """
-    has_8_letter_number = _contains_exactly_one_dni_number(
-        potential_dni_string
-    )
-    if not has_8_letter_number:
-        raise NoNumberFoundException(
-            DNIExceptionDetails(string=potential_dni_string)
-        )
-
-    number = _extract_exactly_one_dni_number_from_string(potential_dni_string)
-
-    has_check_letter_character = _contains_one_dni_number_and_check_letter(
-        potential_dni_string
-    )
-    if not has_check_letter_character:
-        raise MissingCheckLetterException(
-            DNIExceptionDetails(string=potential_dni_string, number=number)
-        )
-
-    found_check_letter_character = _extract_exactly_one_check_letter_from_string(
-        potential_dni_string
-    ).upper()
-
-    valid_check_letter = compute_check_letter(number)
-    check_letter_character_is_valid = (
-        found_check_letter_character == valid_check_letter
-    )
-
-    if not check_letter_character_is_valid:
-        raise InvalidCheckLetterException(
-            DNIExceptionDetails(
-                string=potential_dni_string,
-                number=number,
-                invalid_check_letter=found_check_letter_character,
-                valid_check_letter=valid_check_letter,
-            )
-        )
+    _DEFAULT_SCANNER.parse(potential_dni_string)
 
 
 def _contains_one_dni_number_and_check_letter(a_string: str) -> bool:
@@ -356,13 +449,7 @@ def _contains_one_dni_number_and_check_letter(a_string: str) -> bool:
     if not _contains_exactly_one_dni_number(a_string):
         return False
 
-    has_check_letter_character = re.findall(
-        REGEX_FOR_FULL_DNI_WITH_POSSIBLE_CLUTTER, a_string
-    )
-    if not has_check_letter_character:
-        return False
-
-    return True
+    return _DEFAULT_SCANNER.contains(a_string)
 
 
 def _extract_exactly_one_check_letter_from_string(a_string: str) -> str:
@@ -376,9 +463,7 @@ def _extract_exactly_one_check_letter_from_string(a_string: str) -> str:
     if not _contains_one_dni_number_and_check_letter(a_string):
         _search_and_raise_issues_with_potential_dni_string(a_string)
 
-    return re.findall(REGEX_FOR_FULL_DNI_WITH_POSSIBLE_CLUTTER, a_string)[0][1]
-    # Get first result and get second capture group, which is the one for the
-    # check letter.
+    return next(_DEFAULT_SCANNER.finditer(a_string)).check_letter
 
 
 def _contains_exactly_one_dni_number(a_string: str) -> bool:
@@ -410,17 +495,9 @@ def _extract_exactly_one_dni_number_from_string(
      number.
     :return: the number in string form.
     """
-    results = _extract_multiple_dni_numbers_from_string(
+    return _DEFAULT_SCANNER.extract_exactly_one_number(
         string_that_contains_dni_number
     )
-    if not results:
-        raise NoNumberFoundException(
-            DNIExceptionDetails(string=string_that_contains_dni_number)
-        )
-    if len(results) > 1:
-        raise MultipleMatchesException()
-
-    return results.pop()
 
 
 def _extract_multiple_dni_numbers_from_string(
@@ -428,23 +505,13 @@ def _extract_multiple_dni_numbers_from_string(
 ) -> List[str]:
     """
     Extracts all occurences of 8 letter numbers in the string. Raises an
-    exception if the string does not contain such a number or contains more
-    than one.
+    exception if the string does not contain such a number.
 
     :param string_that_contains_dni_numbers: the string that contains some
      numbers.
     :return: a list with the found numbers.
     """
-
-    results = re.findall(
-        REGEX_FOR_8_DIGIT_NUMBER, string_that_contains_dni_numbers
-    )
-    if not results:
-        raise NoNumberFoundException(
-            DNIExceptionDetails(string=string_that_contains_dni_numbers)
-        )
-
-    return results
+    return _DEFAULT_SCANNER.extract_numbers(string_that_contains_dni_numbers)
 
 
 def _remove_clutter_from_potential_dni_string(a_string: str) -> str:
@@ -456,9 +523,7 @@ def _remove_clutter_from_potential_dni_string(a_string: str) -> str:
     :return: the same string, without any character that is not a valid DNI
      character.
     """
-    string_without_clutter = re.sub(REGEX_FOR_NOT_A_DNI_CHAR, "", a_string)
-
-    return string_without_clutter
+    return _DEFAULT_SCANNER.remove_clutter(a_string)
 
 
 def _generate_one_random_dni_number() -> str:
@@ -525,3 +590,20 @@ def _true_unless_some_exception(
         exceptions_that_lead_to_false=exceptions_that_lead_to_false,
         exceptions_that_lead_to_true=_DoNotRaiseMe,
     )
+
+
+# These modules build on the DNI class, so they can only be imported once it
+# is defined.
+# pylint: disable=wrong-import-position,cyclic-import
+from .ranges import iter_range, fill_range
+from .reporting import (
+    report,
+    ValidationReport,
+    estimate_quality,
+    QualityEstimate,
+)
+from .sketches import DNICardinalitySketch, DNIHeavyHitters
+from .fuzzy import DNIFuzzyIndex, FuzzyMatch
+from .watchlist import DNIWatchlist
+from .partitioning import partition
+from .dispatch import validate, extract
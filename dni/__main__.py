@@ -0,0 +1,151 @@
+"""
+Command line interface of the package. Run ``python -m dni --help`` to see the
+available commands.
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from . import server, tracing
+
+
+def main(arguments: List[str] = None) -> None:
+    """
+    Run the command line interface.
+
+    :param arguments: the command line arguments. If None, the ones the
+     process was started with.
+    :return: None
+    """
+    parser = _build_parser()
+    parsed_arguments = parser.parse_args(arguments)
+    if parsed_arguments.command is None:
+        parser.print_help()
+        return
+
+    parsed_arguments.run(parsed_arguments)
+
+
+def _serve(parsed_arguments: argparse.Namespace) -> None:
+    """
+    Run the ``serve`` command.
+
+    :param parsed_arguments: the parsed command line arguments.
+    :return: None
+    """
+    executor = None
+    if parsed_arguments.workers > 0:
+        executor = ProcessPoolExecutor(parsed_arguments.workers)
+
+    try:
+        server.serve(
+            host=parsed_arguments.host,
+            port=parsed_arguments.port,
+            max_batch_size=parsed_arguments.max_batch_size,
+            max_batch_latency=parsed_arguments.max_batch_latency_ms / 1000,
+            executor=executor,
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _profile(parsed_arguments: argparse.Namespace) -> None:
+    """
+    Run the ``profile`` command.
+
+    :param parsed_arguments: the parsed command line arguments.
+    :return: None
+    """
+    with tracing.trace() as summary:
+        tracing.run_workload(parsed_arguments.iterations)
+    print(summary.format())
+    print()
+
+    profiler = cProfile.Profile()
+    profiler.runcall(tracing.run_workload, parsed_arguments.iterations)
+    stats = pstats.Stats(profiler)
+    stats.sort_stats(parsed_arguments.sort)
+    # Only the functions of the package, not the ones of the workload.
+    stats.print_stats(
+        re.escape(os.path.dirname(os.path.abspath(__file__)))
+        + r"[/\\](?!tracing\.py)",
+        parsed_arguments.limit,
+    )
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build the parser of the command line arguments.
+
+    :return: the parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m dni", description="Deal with Spanish DNIs."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="run an HTTP/JSON service to validate, fix and extract DNIs",
+    )
+    serve_parser.set_defaults(run=_serve)
+    serve_parser.add_argument("--host", default=server.DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    serve_parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=server.DEFAULT_MAX_BATCH_SIZE,
+        help="how many values are processed together at most",
+    )
+    serve_parser.add_argument(
+        "--max-batch-latency-ms",
+        type=float,
+        default=server.DEFAULT_MAX_BATCH_LATENCY * 1000,
+        help="how long a value waits at most for its batch to fill up",
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="how many worker processes handle batches, 0 to handle them"
+        " in the event loop",
+    )
+
+    profile_parser = subparsers.add_parser(
+        "profile",
+        help="time a representative workload by phase and list its hot"
+        " functions",
+    )
+    profile_parser.set_defaults(run=_profile)
+    profile_parser.add_argument(
+        "--iterations",
+        type=int,
+        default=10000,
+        help="how many rounds of operations the workload runs",
+    )
+    profile_parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="how many functions to list",
+    )
+    profile_parser.add_argument(
+        "--sort",
+        default="tottime",
+        choices=["tottime", "cumulative", "ncalls"],
+        help="how to sort the functions",
+    )
+
+    return parser
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Deferred imports of optional dependencies, such as NumPy and pyarrow. They
+take far longer to load than the rest of the package, so they are only
+imported by the functions that need them, and ``import dni`` stays fast.
+"""
+
+import importlib
+from functools import lru_cache
+from types import ModuleType
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def import_optional(module_name: str) -> Optional[ModuleType]:
+    """
+    Import an optional dependency the first time it is needed. Failed imports
+    are remembered too, so they are not retried on every call.
+
+    :param module_name: the absolute name of the module.
+    :return: the module, or None if it is not installed.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
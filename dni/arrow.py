@@ -0,0 +1,269 @@
+"""
+Apache Arrow integration. Validate, fix and extract DNIs from Arrow string or
+binary columns without turning every value into a Python string.
+
+Requires ``pyarrow`` to be installed.
+"""
+
+from typing import Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError as import_error:  # pragma: no cover
+    raise ImportError(
+        "The dni.arrow module requires pyarrow. Install it with:"
+        " pip install pyarrow"
+    ) from import_error
+
+from . import extract_dnis_from_text as _extract_dnis_from_python_text
+from .constants import (
+    UPPERCASE_CHECK_LETTERS,
+    UPPER_AND_LOWER_CASE_CHECK_LETTERS,
+    MAX_ALLOWED_SEP_CHARS,
+)
+from .exceptions import (
+    NoNumberFoundException,
+    MissingCheckLetterException,
+    InvalidCheckLetterException,
+)
+
+ArrowColumn = Union["pa.Array", "pa.ChunkedArray"]
+
+VALID_STATUS = "valid"
+
+_COLUMN_EXTRACTION_MODES = ("strict", "valid_only", "fix")
+
+# Arrow runs regexes with RE2, which has no lookarounds. Runs of more than 8
+# digits are masked first so that any 8 digit match is a whole DNI number, and
+# the check letter lookarounds are spelled out as explicit alternatives,
+# shortest separator first to mimic the lazy behaviour of the Python regex.
+_RE2_FOR_TOO_LONG_NUMBERS = "[0-9]{9,}"
+_RE2_FOR_8_DIGIT_NUMBER = "[0-9]{8}"
+_RE2_FOR_FULL_DNI_WITH_POSSIBLE_CLUTTER = (
+    "(?P<number>[0-9]{8})"
+    "(?:|"
+    + "|".join(
+        "[^\\n]" * (sep_length - 1)
+        + f"[^{UPPER_AND_LOWER_CASE_CHECK_LETTERS}\\n]"
+        for sep_length in range(1, MAX_ALLOWED_SEP_CHARS + 1)
+    )
+    + ")"
+    f"(?P<check_letter>[{UPPER_AND_LOWER_CASE_CHECK_LETTERS}])"
+    f"(?:[^{UPPER_AND_LOWER_CASE_CHECK_LETTERS}]|$)"
+)
+
+
+def is_valid(column: ArrowColumn) -> ArrowColumn:
+    """
+    Check which values of an Arrow column are valid DNIs, following the same
+    rules as ``dni.is_valid``.
+
+    :param column: a string or binary ``pyarrow.Array`` or ``ChunkedArray``.
+    :return: a boolean Arrow array, null where the input is null.
+    """
+    return pc.equal(validation_status(column), VALID_STATUS)
+
+
+def validation_status(column: ArrowColumn) -> ArrowColumn:
+    """
+    Classify every value of an Arrow column. Values are tagged as ``"valid"``
+    or with the ``description`` of the exception that ``dni.DNI`` would raise
+    for them (``"missing_dni_number"``, ``"missing_check_letter"`` or
+    ``"invalid_check_letter"``).
+
+    :param column: a string or binary ``pyarrow.Array`` or ``ChunkedArray``.
+    :return: a string Arrow array with the status codes, null where the input
+     is null.
+    """
+    column = _as_string_column(column)
+    masked_column = _mask_too_long_numbers(column)
+
+    has_one_number = pc.equal(
+        pc.count_substring_regex(masked_column, _RE2_FOR_8_DIGIT_NUMBER), 1
+    )
+    parts = pc.extract_regex(
+        masked_column, _RE2_FOR_FULL_DNI_WITH_POSSIBLE_CLUTTER
+    )
+    found_check_letter = pc.utf8_upper(pc.struct_field(parts, "check_letter"))
+    valid_check_letter = _compute_check_letters(
+        pc.struct_field(parts, "number")
+    )
+
+    status = pc.if_else(
+        pc.equal(found_check_letter, valid_check_letter),
+        VALID_STATUS,
+        InvalidCheckLetterException.description,
+    )
+    status = pc.if_else(
+        pc.is_null(parts), MissingCheckLetterException.description, status
+    )
+    status = pc.if_else(
+        has_one_number, status, NoNumberFoundException.description
+    )
+
+    return status
+
+
+def add_or_fix_check_letter(column: ArrowColumn) -> ArrowColumn:
+    """
+    Add the right check letter to DNI numbers, or replace the existing one if
+    it is not valid, like ``dni.add_or_fix_check_letter`` does for a single
+    string. Valid DNIs are returned unchanged. Values without a DNI number
+    become null instead of raising.
+
+    :param column: a string or binary ``pyarrow.Array`` or ``ChunkedArray``.
+    :return: a string Arrow array with the fixed values.
+    """
+    column = _as_string_column(column)
+    status = validation_status(column)
+    number = pc.extract_regex(
+        _mask_too_long_numbers(column),
+        f"(?P<number>{_RE2_FOR_8_DIGIT_NUMBER})",
+    )
+    number = pc.struct_field(number, "number")
+    fixed = pc.binary_join_element_wise(
+        number, _compute_check_letters(number), ""
+    )
+
+    fixed_values = pc.if_else(pc.equal(status, VALID_STATUS), column, fixed)
+    fixed_values = pc.if_else(
+        pc.equal(status, NoNumberFoundException.description),
+        pa.scalar(None, type=fixed_values.type),
+        fixed_values,
+    )
+
+    return fixed_values
+
+
+def dni_numbers(column: ArrowColumn) -> ArrowColumn:
+    """
+    Get the DNI number of every value of an Arrow column, as an integer.
+    Values without exactly one DNI number become null, like in
+    ``add_or_fix_check_letter``.
+
+    :param column: a string or binary ``pyarrow.Array`` or ``ChunkedArray``.
+    :return: an int64 Arrow array with the numbers.
+    """
+    masked_column = _mask_too_long_numbers(_as_string_column(column))
+    has_one_number = pc.equal(
+        pc.count_substring_regex(masked_column, _RE2_FOR_8_DIGIT_NUMBER), 1
+    )
+    number = pc.struct_field(
+        pc.extract_regex(
+            masked_column, f"(?P<number>{_RE2_FOR_8_DIGIT_NUMBER})"
+        ),
+        "number",
+    )
+    number = pc.if_else(
+        has_one_number, number, pa.scalar(None, type=number.type)
+    )
+
+    return pc.cast(number, pa.int64())
+
+
+def extract_dnis_from_text(
+    column: ArrowColumn, mode: str = "valid_only"
+) -> ArrowColumn:
+    """
+    Find the DNIs contained in every value of an Arrow column of texts. Only
+    values that contain at least one 8 digit number are converted to Python
+    strings to be scanned; the rest are resolved within Arrow.
+
+    :param column: a string or binary ``pyarrow.Array`` or ``ChunkedArray``.
+    :param mode: what to do with candidates with an invalid check letter, as
+     in ``dni.extract_dnis_from_text``, except for "report", which has no
+     column form. Unlike there, the default is "valid_only", as in the
+     SQLite ``dni_extract`` function, so that a single wrong check letter
+     does not fail the whole column.
+    :return: an Arrow list array with the found DNIs, formatted as strings,
+     null where the input is null.
+    """
+    if mode not in _COLUMN_EXTRACTION_MODES:
+        raise ValueError(
+            f"Mode must be one of {', '.join(_COLUMN_EXTRACTION_MODES)},"
+            f" not {mode}"
+        )
+
+    column = _as_string_column(column)
+    if isinstance(column, pa.ChunkedArray):
+        return pa.chunked_array(
+            [_extract_dnis_from_array(chunk, mode) for chunk in column.chunks],
+            type=pa.list_(pa.string()),
+        )
+
+    return _extract_dnis_from_array(column, mode)
+
+
+def _extract_dnis_from_array(array: "pa.Array", mode: str) -> "pa.Array":
+    """
+    Extract the DNIs of every text of a single, non-chunked Arrow array.
+
+    :param array: a string Arrow array.
+    :param mode: what to do with candidates with an invalid check letter.
+    :return: an Arrow list array with the found DNIs.
+    """
+    is_candidate = pc.fill_null(
+        pc.match_substring_regex(array, _RE2_FOR_8_DIGIT_NUMBER), False
+    )
+    candidate_positions = pc.indices_nonzero(is_candidate).to_pylist()
+    candidate_texts = pc.take(array, candidate_positions).to_pylist()
+
+    found_dnis = [
+        None if is_null else [] for is_null in pc.is_null(array).to_pylist()
+    ]
+    for position, text in zip(candidate_positions, candidate_texts):
+        found_dnis[position] = [
+            a_dni.format()
+            for a_dni in _extract_dnis_from_python_text(text, mode)
+        ]
+
+    return pa.array(found_dnis, type=pa.list_(pa.string()))
+
+
+def _compute_check_letters(numbers: ArrowColumn) -> ArrowColumn:
+    """
+    Vectorized version of ``dni.compute_check_letter``.
+
+    :param numbers: a string Arrow array with 8 digit numbers, or nulls.
+    :return: a string Arrow array with the uppercase check letters.
+    """
+    as_integers = pc.cast(numbers, pa.int64())
+    remainders = pc.subtract(
+        as_integers, pc.multiply(pc.divide(as_integers, 23), 23)
+    )  # Integer division, as not every pyarrow version has a modulo kernel.
+
+    return pc.take(pa.array(list(UPPERCASE_CHECK_LETTERS)), remainders)
+
+
+def _mask_too_long_numbers(column: ArrowColumn) -> ArrowColumn:
+    """
+    Replace runs of more than 8 digits so that they can not be mistaken for a
+    DNI number by regexes without lookarounds.
+
+    :param column: a string Arrow array.
+    :return: the masked string Arrow array.
+    """
+    return pc.replace_substring_regex(column, _RE2_FOR_TOO_LONG_NUMBERS, "_")
+
+
+def _as_string_column(column: ArrowColumn) -> ArrowColumn:
+    """
+    Make sure a column holds strings. Binary columns are reinterpreted as
+    UTF-8 strings.
+
+    :param column: a string or binary Arrow array.
+    :return: a string Arrow array.
+    """
+    if pa.types.is_binary(column.type):
+        return pc.cast(column, pa.string())
+    if pa.types.is_large_binary(column.type):
+        return pc.cast(column, pa.large_string())
+    if pa.types.is_string(column.type) or pa.types.is_large_string(
+        column.type
+    ):
+        return column
+
+    raise TypeError(
+        f"Expected a string or binary Arrow column, not {column.type}"
+    )
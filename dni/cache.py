@@ -0,0 +1,241 @@
+"""
+A persistent cache of extraction results, keyed by the hash of the contents of
+each document, so that rescans of a mostly unchanged corpus only run the
+scanner on new or modified documents.
+
+Results are stored in a SQLite database. Entries are also keyed by the package
+version, the scanner settings and the extraction mode, so changing any of them
+never returns stale results: the old entries are just not found anymore, and
+``clear`` removes them.
+"""
+
+import hashlib
+import json
+import sqlite3
+from typing import Dict, List, Union
+
+from . import DNI, DNIMatch, DNIScanner, ExtractionReport, _DEFAULT_SCANNER
+from ._version import __version__
+from .files import extract_dnis_from_file
+from .scanner import EXTRACTION_MODES
+
+ExtractionResults = Union[List[DNI], ExtractionReport]
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extraction_results (
+    namespace TEXT NOT NULL,
+    content_hash BLOB NOT NULL,
+    results TEXT NOT NULL,
+    PRIMARY KEY (namespace, content_hash)
+)
+"""
+
+
+class ExtractionCache:
+    """
+    Cache the DNIs extracted from documents, keyed by their contents.
+
+    :param database_path: the SQLite database file to keep the cache in. It
+     is created if it does not exist.
+    :param scanner: the scanner used to find DNIs. If None, the one used by
+     the module-level functions.
+    """
+
+    def __init__(self, database_path: str, scanner: DNIScanner = None):
+        self.scanner = scanner or _DEFAULT_SCANNER
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(database_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+
+    def extract(self, text: str, mode: str = "strict") -> ExtractionResults:
+        """
+        Find the DNIs in a text, like ``DNIScanner.extract``, reusing the
+        results of any previous extraction from the same text.
+
+        :param text: a text that may contain some or no DNI-valid substrings.
+        :param mode: what to do with candidates with an invalid check letter,
+         as in ``extract_dnis_from_text``.
+        :return: the found DNIs, as ``extract_dnis_from_text`` returns them.
+        """
+        content_hash = hashlib.blake2b(
+            text.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+
+        return self._get_or_compute(
+            content_hash, mode, lambda: self.scanner.extract(text, mode)
+        )
+
+    def extract_from_file(
+        self, file_path: str, mode: str = "strict"
+    ) -> Dict[str, ExtractionResults]:
+        """
+        Find the DNIs in a file, like ``dni.files.extract_dnis_from_file``,
+        reusing the results of any previous extraction from a file with the
+        same contents. The file is hashed as a stream, so it is never fully
+        loaded in memory.
+
+        :param file_path: the file to scan, which may be compressed.
+        :param mode: what to do with candidates with an invalid check letter,
+         as in ``extract_dnis_from_text``.
+        :return: the found DNIs, by member name, as
+         ``dni.files.extract_dnis_from_file`` returns them.
+        """
+        content_hash = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as a_file:
+            for chunk in iter(lambda: a_file.read(_HASH_CHUNK_SIZE), b""):
+                content_hash.update(chunk)
+
+        def compute():
+            results_by_member = extract_dnis_from_file(
+                file_path, mode, scanner=self.scanner
+            )
+            # Files that are not zip archives are named after their path,
+            # which may differ between files with the same contents.
+            return {
+                "" if member_name == file_path else member_name: results
+                for member_name, results in results_by_member.items()
+            }
+
+        results_by_member = self._get_or_compute(
+            content_hash.digest(), mode, compute, by_member=True
+        )
+
+        return {
+            member_name or file_path: results
+            for member_name, results in results_by_member.items()
+        }
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+
+        :return: None
+        """
+        with self._connection:
+            self._connection.execute("DELETE FROM extraction_results")
+        self._connection.execute("VACUUM")
+
+    def close(self) -> None:
+        """
+        Close the database of the cache.
+
+        :return: None
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception_info):
+        self.close()
+
+    def _get_or_compute(
+        self, content_hash: bytes, mode: str, compute, by_member: bool = False
+    ):
+        """
+        Look up the results for some contents, computing and storing them if
+        they are not cached.
+
+        :param content_hash: the hash of the contents.
+        :param mode: the extraction mode.
+        :param compute: a callable that computes the results.
+        :param by_member: whether the results are a dictionary by member name,
+         rather than the results of a single text.
+        :return: the results.
+        """
+        if mode not in EXTRACTION_MODES:
+            raise ValueError(
+                f"Mode must be one of {', '.join(EXTRACTION_MODES)}, not {mode}"
+            )
+
+        namespace = self._namespace(mode, by_member)
+        row = self._connection.execute(
+            "SELECT results FROM extraction_results"
+            " WHERE namespace = ? AND content_hash = ?",
+            (namespace, content_hash),
+        ).fetchone()
+        if row is not None:
+            self.hits += 1
+            if by_member:
+                return {
+                    member_name: _deserialize_results(serialized_results)
+                    for member_name, serialized_results in json.loads(row[0])
+                }
+            return _deserialize_results(json.loads(row[0]))
+
+        self.misses += 1
+        results = compute()
+        if by_member:
+            serialized_results = [
+                [member_name, _serialize_results(member_results)]
+                for member_name, member_results in results.items()
+            ]
+        else:
+            serialized_results = _serialize_results(results)
+
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO extraction_results VALUES (?, ?, ?)",
+                (namespace, content_hash, json.dumps(serialized_results)),
+            )
+
+        return results
+
+    def _namespace(self, mode: str, by_member: bool) -> str:
+        """
+        Identify everything, besides the contents, that the results of an
+        extraction depend on.
+
+        :param mode: the extraction mode.
+        :param by_member: whether the results are by member name.
+        :return: the identifier.
+        """
+        return (
+            f"{__version__}|{self.scanner!r}|{mode}"
+            f"|{'by_member' if by_member else 'text'}"
+        )
+
+
+def _serialize_results(results: ExtractionResults) -> Union[list, dict]:
+    """
+    Turn extraction results into JSON compatible objects.
+
+    :param results: the results.
+    :return: a list of DNI strings, or a dictionary with the DNI strings and
+     the invalid matches of an ``ExtractionReport``.
+    """
+    if isinstance(results, ExtractionReport):
+        return {
+            "dnis": [a_dni.format() for a_dni in results.dnis],
+            "invalid_matches": [
+                list(dni_match) for dni_match in results.invalid_matches
+            ],
+        }
+
+    return [a_dni.format() for a_dni in results]
+
+
+def _deserialize_results(
+    serialized_results: Union[list, dict],
+) -> ExtractionResults:
+    """
+    Rebuild extraction results serialized with ``_serialize_results``.
+
+    :param serialized_results: the serialized results.
+    :return: the results.
+    """
+    if isinstance(serialized_results, dict):
+        return ExtractionReport(
+            dnis=_deserialize_results(serialized_results["dnis"]),
+            invalid_matches=[
+                DNIMatch(*fields)
+                for fields in serialized_results["invalid_matches"]
+            ],
+        )
+
+    return [
+        DNI.from_validated(dni_string) for dni_string in serialized_results
+    ]
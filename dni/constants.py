@@ -11,8 +11,24 @@ REGEX_FOR_UPPER_OR_LOWER_CHECK_LETTERS = (
 REGEX_FOR_8_DIGIT_NUMBER = "(?<![0-9]{1})([0-9]{8})(?![0-9]{1})"
 MAX_ALLOWED_SEP_CHARS = 3
 REGEX_FOR_FULL_DNI_WITH_POSSIBLE_CLUTTER = (
-    f"{REGEX_FOR_8_DIGIT_NUMBER}.{{0,{MAX_ALLOWED_SEP_CHARS}}}"
+    f"{REGEX_FOR_8_DIGIT_NUMBER}.{{0,{MAX_ALLOWED_SEP_CHARS}}}?"
     f"{REGEX_FOR_UPPER_OR_LOWER_CHECK_LETTERS}"
 )
 REGEX_FOR_NOT_A_DNI_CHAR = f"[^0-9{UPPER_AND_LOWER_CASE_CHECK_LETTERS}]"
 NUMBER_CHARACTERS = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
+FULL_WIDTH_DIGITS = "０１２３４５６７８９"
+FULL_WIDTH_UPPERCASE_CHECK_LETTERS = "".join(
+    chr(ord(letter) + 0xFEE0) for letter in UPPERCASE_CHECK_LETTERS
+)
+FULL_WIDTH_LOWERCASE_CHECK_LETTERS = "".join(
+    chr(ord(letter) + 0xFEE0) for letter in LOWERCASE_CHECK_LETTERS
+)
+# Unicode characters that scanned and OCR'd documents use in place of ASCII
+# separators: no-break and ideographic spaces, dashes and minus signs, and
+# full-width punctuation.
+UNICODE_SEPARATORS_BY_ASCII_SEPARATOR = {
+    " ": "\u00a0\u2007\u202f\u3000",
+    "-": "\u2010\u2011\u2012\u2013\u2014\u2015\u2212\ufe63\uff0d",
+    ".": "\uff0e",
+    "/": "\uff0f",
+}
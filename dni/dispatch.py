@@ -0,0 +1,748 @@
+"""
+Validate and extract DNIs from any kind of input through a single entry
+point, that picks the fastest way to handle it::
+
+    >>> dni.validate("12345678Z")
+    True
+    >>> dni.validate(customers["nif"])  # A boolean Series, same index.
+    >>> dni.extract(pathlib.Path("archive.zip"), mode="report")
+
+Small inputs are handled one value at a time, as the setup cost of the other
+paths does not pay off for them. Collections of at least
+``vectorized_min_size`` values are validated with the vectorized functions of
+``dni.arrow``, when pyarrow is installed. Collections of at least
+``parallel_min_size`` values, and texts of at least ``parallel_min_chars``
+characters, are split among worker processes.
+
+Files of at least ``parallel_min_chars`` bytes are scanned in parallel too,
+as far as their format allows: uncompressed files are split into ranges of
+lines, and the members of zip archives are scanned separately. Gzip, bzip2
+and xz files can only be decompressed from the start, so they are always
+scanned in a single process.
+
+The default thresholds suit a typical machine. ``calibrate`` measures the
+costs of every path on the current one and sets the thresholds where they
+break even, and ``set_thresholds`` overrides them.
+"""
+
+import math
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple, TextIO, Union
+
+from . import DNI, ExtractionReport, is_valid, _DEFAULT_SCANNER
+from ._optional import import_optional
+from .constants import UPPERCASE_CHECK_LETTERS
+from .files import extract_dnis_from_file, is_compressed
+
+Thresholds = namedtuple(
+    "Thresholds",
+    field_names=[
+        "vectorized_min_size",
+        "parallel_min_size",
+        "parallel_min_chars",
+    ],
+)
+Thresholds.__doc__ = """
+The input sizes from which each path is taken: the number of values of a
+collection for the vectorized (``vectorized_min_size``) and the parallel
+(``parallel_min_size``) paths, and the number of characters of a text, or
+bytes of a file, for the parallel path (``parallel_min_chars``). None never
+takes the path.
+"""
+
+DEFAULT_THRESHOLDS = Thresholds(
+    vectorized_min_size=1000,
+    parallel_min_size=200000,
+    parallel_min_chars=20 * 1024 * 1024,
+)
+
+_thresholds = DEFAULT_THRESHOLDS
+_PIECES_PER_WORKER = 4
+_MAX_BYTES_PER_FILE_PIECE = 64 * 1024 * 1024
+_DECODING_ERRORS = "replace"  # As in dni.files.
+_CALIBRATION_SEPARATORS = ("", "-", " ")
+
+
+def validate(values, workers: int = None):
+    """
+    Check which values are valid DNIs, following the same rules as
+    ``is_valid``, whatever the kind and size of the input.
+
+    :param values: a string; a list, or any other iterable, of strings; a
+     NumPy array or pandas Series of strings; or an Arrow string column.
+     Values that are not strings, such as None or NaN, are not valid.
+    :param workers: how many processes validate large collections. If None,
+     as many as CPUs; 0 or 1 validate them in the current process.
+    :return: a bool for a string, a NumPy bool array of the same shape for a
+     NumPy array, a bool Series with the same index for a Series, a boolean
+     Arrow array for an Arrow column, null where the input is null, and a
+     list of bools for any other iterable.
+    """
+    if isinstance(values, str):
+        return is_valid(values)
+
+    pyarrow = sys.modules.get("pyarrow")  # Only loaded if a column exists.
+    if pyarrow is not None and isinstance(
+        values, (pyarrow.Array, pyarrow.ChunkedArray)
+    ):
+        return import_optional("dni.arrow").is_valid(values)
+
+    return _map_collection(values, _validate_values, workers, dtype=bool)
+
+
+def extract(
+    source: Union[str, os.PathLike, TextIO, Any],
+    mode: str = "strict",
+    workers: int = None,
+):
+    """
+    Find the DNIs in a text, a stream, a file or a collection of texts,
+    whatever its size.
+
+    Plain strings are always taken as texts, never as file paths, so that a
+    text can not be mistaken for the name of a file that happens to exist.
+    Pass file paths as ``pathlib.Path`` instances, or any other
+    ``os.PathLike``.
+
+    :param source: a text; a text stream, such as a file opened in text mode,
+     which is read in chunks; the path of a file, which may be compressed, as
+     in ``dni.files.extract_dnis_from_file``; or a list, NumPy array or pandas
+     Series of texts. Values of a collection that are not strings, such as
+     None or NaN, have no DNIs.
+    :param mode: what to do with candidates with an invalid check letter, as
+     in ``extract_dnis_from_text``.
+    :param workers: how many processes scan large texts, files and
+     collections. If None, as many as CPUs; 0 or 1 scan them in the current
+     process. Gzip, bzip2 and xz files, and zip archives with a single
+     member, are always scanned in the current process.
+    :return: for a text or a stream, what ``extract_dnis_from_text`` returns
+     for it; for a file, those results by member name; for a Series, a Series
+     with the results of every text and the same index; and for any other
+     collection, a list with the results of every text.
+    """
+    if isinstance(source, str):
+        if _is_at_least(len(source), _parallel_min(_thresholds, workers)[0]):
+            return _extract_in_parallel(
+                source, mode, _resolve_workers(workers)
+            )
+        return _DEFAULT_SCANNER.extract(source, mode)
+
+    if isinstance(source, os.PathLike):
+        return _extract_file(os.fspath(source), mode, workers)
+
+    if hasattr(source, "read"):
+        return _DEFAULT_SCANNER.extract(source, mode)
+
+    return _map_collection(
+        source, partial(_extract_values, mode=mode), workers, dtype=None
+    )
+
+
+def get_thresholds() -> Thresholds:
+    """
+    Get the thresholds in use.
+
+    :return: the thresholds.
+    """
+    return _thresholds
+
+
+def set_thresholds(thresholds: Thresholds) -> None:
+    """
+    Change the thresholds in use, such as to turn off the parallel path::
+
+        >>> set_thresholds(get_thresholds()._replace(parallel_min_size=None))
+
+    :param thresholds: the new thresholds. ``DEFAULT_THRESHOLDS`` restores
+     the default ones.
+    :return: None
+    """
+    global _thresholds  # pylint: disable=global-statement
+    _thresholds = Thresholds(*thresholds)
+
+
+def calibrate(sample_size: int = 20000, workers: int = None) -> Thresholds:
+    """
+    Run a short benchmark of every path on this machine and set the
+    thresholds to the input sizes from which each path is faster than the
+    previous one. It takes around a second.
+
+    :param sample_size: how many values the benchmark validates with each
+     path.
+    :param workers: how many processes the parallel path would use, as in
+     ``validate``.
+    :return: the new thresholds.
+    """
+    values = _generate_calibration_values(sample_size, random.Random(0))
+    workers = _resolve_workers(workers)
+
+    scalar_cost = _time_per_item(_validate_scalar, values)
+    sequential_cost = scalar_cost
+    vectorized_min_size = None
+    dni_arrow = import_optional("dni.arrow")
+    if dni_arrow is not None:
+        _validate_vectorized(values[:10])  # Loads Arrow's lazy kernels.
+        fixed_cost, vectorized_cost = _fit_linear_cost(
+            _validate_vectorized, values
+        )
+        vectorized_min_size = _break_even(
+            fixed_cost, scalar_cost - vectorized_cost
+        )
+        sequential_cost = min(scalar_cost, vectorized_cost)
+
+    parallel_min_size = None
+    parallel_min_chars = None
+    if workers > 1:
+        vectorized_only = partial(_validate_values, vectorized_min_size=0)
+        fixed_cost, parallel_cost = _fit_linear_cost(
+            partial(
+                _run_in_parallel,
+                vectorized_only if dni_arrow is not None else _validate_scalar,
+                workers=workers,
+            ),
+            values,
+        )
+        parallel_min_size = _break_even(
+            fixed_cost, sequential_cost - parallel_cost
+        )
+
+        text = "\n".join(
+            f"Cliente: {value}; pedido sin DNI." for value in values
+        )
+        extraction_cost = _time_per_item(
+            partial(_DEFAULT_SCANNER.extract, mode="report"), text
+        )
+        fixed_cost, parallel_cost = _fit_linear_cost(
+            partial(_extract_in_parallel, mode="report", workers=workers), text
+        )
+        parallel_min_chars = _break_even(
+            fixed_cost, extraction_cost - parallel_cost
+        )
+
+    set_thresholds(
+        Thresholds(
+            vectorized_min_size=vectorized_min_size,
+            parallel_min_size=parallel_min_size,
+            parallel_min_chars=parallel_min_chars,
+        )
+    )
+
+    return _thresholds
+
+
+def _map_collection(values, function: Callable, workers: int, dtype):
+    """
+    Run a function that takes a list of values and returns a list of
+    results on a collection, and give back the results in the same kind of
+    collection.
+
+    :param values: the collection.
+    :param function: the function, which takes the values and the threshold
+     of the vectorized path, and runs in the worker processes.
+    :param workers: how many processes may run the function, as in
+     ``validate``.
+    :param dtype: the NumPy type of the results, or None to return a list
+     for NumPy arrays.
+    :return: the results.
+    """
+    pandas = sys.modules.get("pandas")  # Only loaded if a Series is passed.
+    if pandas is not None and isinstance(values, pandas.Series):
+        return pandas.Series(
+            _map_values(values.tolist(), function, workers),
+            index=values.index,
+            name=values.name,
+            dtype=dtype or object,
+        )
+
+    numpy = sys.modules.get("numpy")  # Only loaded if an array exists.
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        results = _map_values(values.ravel().tolist(), function, workers)
+        if dtype is None:
+            return results
+        return numpy.array(results, dtype=dtype).reshape(values.shape)
+
+    return _map_values(list(values), function, workers)
+
+
+def _map_values(values: List, function: Callable, workers: int) -> List:
+    """
+    Run a function on a list of values, splitting it among worker processes
+    if it is large enough.
+
+    :param values: the values.
+    :param function: the function, as in ``_map_collection``.
+    :param workers: how many processes may run the function.
+    :return: the results, in the same order as the values.
+    """
+    function = partial(
+        function, vectorized_min_size=_thresholds.vectorized_min_size
+    )
+    parallel_min_size = _parallel_min(_thresholds, workers)[1]
+    if _is_at_least(len(values), parallel_min_size):
+        return _run_in_parallel(function, values, _resolve_workers(workers))
+
+    return function(values)
+
+
+def _run_in_parallel(function: Callable, values: List, workers: int) -> List:
+    """
+    Run a function on slices of a list of values in worker processes.
+
+    :param function: a picklable function that takes a list of values and
+     returns a list of results.
+    :param values: the values.
+    :param workers: how many processes to use.
+    :return: the results, in the same order as the values.
+    """
+    slice_size = math.ceil(len(values) / (workers * _PIECES_PER_WORKER)) or 1
+    slices = [
+        values[start : start + slice_size]
+        for start in range(0, len(values), slice_size)
+    ]
+    return [
+        result
+        for slice_results in _map_in_processes(function, slices, workers)
+        for result in slice_results
+    ]
+
+
+def _map_in_processes(function: Callable, items: List, workers: int) -> List:
+    """
+    Run a function on every item in worker processes. The process pool is
+    only imported here, as loading it slows down ``import dni``.
+
+    :param function: a picklable function that takes an item.
+    :param items: the items, which must be picklable.
+    :param workers: how many processes to use.
+    :return: the results, in the same order as the items.
+    """
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(function, items))
+
+
+def _validate_values(
+    values: List, vectorized_min_size: Union[int, None] = None
+) -> List[bool]:
+    """
+    Check which values of a list are valid DNIs, vectorized if there are
+    enough of them. Runs in the worker processes.
+
+    :param values: the values.
+    :param vectorized_min_size: the threshold of the vectorized path.
+    :return: whether each value is a valid DNI.
+    """
+    if _is_at_least(len(values), vectorized_min_size) and (
+        import_optional("dni.arrow") is not None
+    ):
+        return _validate_vectorized(values)
+
+    return _validate_scalar(values)
+
+
+def _validate_scalar(values: List) -> List[bool]:
+    """
+    Check which values of a list are valid DNIs, one at a time.
+
+    :param values: the values.
+    :return: whether each value is a valid DNI.
+    """
+    return [isinstance(value, str) and is_valid(value) for value in values]
+
+
+def _validate_vectorized(values: List) -> List[bool]:
+    """
+    Check which values of a list are valid DNIs, with Arrow.
+
+    :param values: the values.
+    :return: whether each value is a valid DNI.
+    """
+    pyarrow = import_optional("pyarrow")
+    dni_arrow = import_optional("dni.arrow")
+    try:
+        column = pyarrow.array(values, type=pyarrow.string(), from_pandas=True)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        column = pyarrow.array(
+            [value if isinstance(value, str) else None for value in values],
+            type=pyarrow.string(),
+        )
+
+    return (
+        dni_arrow.is_valid(column)
+        .fill_null(False)
+        .to_numpy(zero_copy_only=False)
+        .tolist()
+    )
+
+
+def _extract_values(
+    values: List, mode: str, vectorized_min_size: Union[int, None] = None
+) -> List[Union[List[DNI], ExtractionReport]]:
+    """
+    Find the DNIs in every text of a list. Runs in the worker processes.
+
+    There is no vectorized path: every found DNI is built as an instance in
+    Python anyway, and texts without a DNI number are skipped by a single
+    regex search, which leaves nothing for Arrow to win.
+
+    :param values: the texts.
+    :param mode: what to do with candidates with an invalid check letter.
+    :param vectorized_min_size: unused, taken for symmetry with
+     ``_validate_values``.
+    :return: the results of every text.
+    """
+    del vectorized_min_size
+
+    return [
+        _DEFAULT_SCANNER.extract(value if isinstance(value, str) else "", mode)
+        for value in values
+    ]
+
+
+def _extract_in_parallel(
+    text: str, mode: str, workers: int
+) -> Union[List[DNI], ExtractionReport]:
+    """
+    Find the DNIs in a long text by scanning pieces of it in worker
+    processes. Texts are only cut after line breaks, which DNIs can not span.
+
+    :param text: the text.
+    :param mode: what to do with candidates with an invalid check letter.
+    :param workers: how many processes to use.
+    :return: what ``extract_dnis_from_text`` returns for the text.
+    """
+    pieces = _split_after_line_breaks(text, workers * _PIECES_PER_WORKER)
+    if len(pieces) == 1:
+        return _DEFAULT_SCANNER.extract(text, mode)
+
+    results = _map_in_processes(
+        partial(_extract_from_piece, mode=mode), pieces, workers
+    )
+
+    return _merge_results(results, mode)
+
+
+def _extract_file(
+    file_path: str, mode: str, workers: Union[int, None]
+) -> Dict[str, Union[List[DNI], ExtractionReport]]:
+    """
+    Find the DNIs in a file, in parallel if it is large enough and its format
+    allows it.
+
+    :param file_path: the file, which may be compressed.
+    :param mode: what to do with candidates with an invalid check letter.
+    :param workers: how many processes may be used, as in ``extract``.
+    :return: what ``dni.files.extract_dnis_from_file`` returns for the file.
+    """
+    if not _is_at_least(
+        os.path.getsize(file_path), _parallel_min(_thresholds, workers)[0]
+    ):
+        return extract_dnis_from_file(file_path, mode)
+
+    if not is_compressed(file_path):
+        return _extract_file_in_parallel(
+            file_path, mode, _resolve_workers(workers)
+        )
+
+    return extract_dnis_from_file(
+        file_path, mode, workers=_resolve_workers(workers)
+    )
+
+
+def _extract_file_in_parallel(
+    file_path: str, mode: str, workers: int
+) -> Dict[str, Union[List[DNI], ExtractionReport]]:
+    """
+    Find the DNIs in a large uncompressed file by scanning byte ranges of it
+    in worker processes. Ranges are only cut after line breaks, which DNIs
+    can not span.
+
+    :param file_path: the file.
+    :param mode: what to do with candidates with an invalid check letter.
+    :param workers: how many processes to use.
+    :return: what ``dni.files.extract_dnis_from_file`` returns for the file.
+    """
+    n_pieces = max(
+        workers * _PIECES_PER_WORKER,
+        math.ceil(os.path.getsize(file_path) / _MAX_BYTES_PER_FILE_PIECE),
+    )
+    byte_ranges = _split_file_after_line_breaks(file_path, n_pieces)
+
+    piece_results = _map_in_processes(
+        partial(_extract_from_file_piece, file_path, mode=mode),
+        byte_ranges,
+        workers,
+    )
+
+    results = []
+    offset = 0
+    for piece_length, result in piece_results:
+        results.append(_shift_invalid_matches(result, offset, mode))
+        offset += piece_length
+
+    return {file_path: _merge_results(results, mode)}
+
+
+def _extract_from_file_piece(
+    file_path: str, byte_range: Tuple[int, int], mode: str
+) -> Tuple[int, Union[List[DNI], ExtractionReport]]:
+    """
+    Find the DNIs in a byte range of a file. Runs in the worker processes.
+
+    The range is decoded and its line breaks are translated as
+    ``dni.files.open_text`` does, so offsets match the ones of a sequential
+    scan once shifted.
+
+    :param file_path: the file.
+    :param byte_range: the offsets of the first byte of the range and of the
+     byte after its last one.
+    :param mode: what to do with candidates with an invalid check letter.
+    :return: the length of the range, in characters, and its results, with
+     the offsets of invalid matches relative to the start of the range.
+    """
+    start, end = byte_range
+    with open(file_path, "rb") as a_file:
+        a_file.seek(start)
+        text = (
+            a_file.read(end - start)
+            .decode("utf-8", errors=_DECODING_ERRORS)
+            .replace("\r\n", "\n")
+            .replace("\r", "\n")
+        )
+
+    return len(text), _DEFAULT_SCANNER.extract(text, mode)
+
+
+def _split_file_after_line_breaks(
+    file_path: str, n_pieces: int
+) -> List[Tuple[int, int]]:
+    """
+    Cut a file into about evenly sized byte ranges, right after line breaks.
+
+    :param file_path: the file.
+    :param n_pieces: how many ranges to cut it into at most.
+    :return: the offsets of the first byte of every range and of the byte
+     after its last one.
+    """
+    file_size = os.path.getsize(file_path)
+    starts = [0]
+    with open(file_path, "rb") as a_file:
+        for piece in range(1, n_pieces):
+            a_file.seek(max(file_size * piece // n_pieces, starts[-1]))
+            a_file.readline()
+            if a_file.tell() >= file_size:
+                break
+            starts.append(a_file.tell())
+
+    return list(zip(starts, starts[1:] + [file_size]))
+
+
+def _merge_results(
+    results: List[Union[List[DNI], ExtractionReport]], mode: str
+) -> Union[List[DNI], ExtractionReport]:
+    """
+    Put together the results of consecutive pieces of a text.
+
+    :param results: the results of every piece, in order.
+    :param mode: the mode they were extracted with.
+    :return: the results of the whole text.
+    """
+    if mode == "report":
+        return ExtractionReport(
+            dnis=[a_dni for result in results for a_dni in result.dnis],
+            invalid_matches=[
+                dni_match
+                for result in results
+                for dni_match in result.invalid_matches
+            ],
+        )
+
+    return [a_dni for result in results for a_dni in result]
+
+
+def _shift_invalid_matches(
+    result: Union[List[DNI], ExtractionReport], offset: int, mode: str
+) -> Union[List[DNI], ExtractionReport]:
+    """
+    Make the offsets of the invalid matches of a piece of a text relative to
+    the start of the whole text.
+
+    :param result: the results of the piece.
+    :param offset: the offset of the piece in the text.
+    :param mode: the mode they were extracted with.
+    :return: the shifted results.
+    """
+    if mode != "report" or not offset:
+        return result
+
+    return result._replace(
+        invalid_matches=[
+            dni_match._replace(
+                start=dni_match.start + offset, end=dni_match.end + offset
+            )
+            for dni_match in result.invalid_matches
+        ]
+    )
+
+
+def _extract_from_piece(
+    piece: Tuple[int, str], mode: str
+) -> Union[List[DNI], ExtractionReport]:
+    """
+    Find the DNIs in a piece of a text. Runs in the worker processes.
+
+    :param piece: the offset of the piece in the text and the piece itself.
+    :param mode: what to do with candidates with an invalid check letter.
+    :return: the results for the piece, with the offsets of invalid matches
+     relative to the start of the whole text.
+    """
+    offset, text = piece
+
+    return _shift_invalid_matches(
+        _DEFAULT_SCANNER.extract(text, mode), offset, mode
+    )
+
+
+def _split_after_line_breaks(
+    text: str, n_pieces: int
+) -> List[Tuple[int, str]]:
+    """
+    Cut a text into about evenly sized pieces, right after line breaks.
+
+    :param text: the text.
+    :param n_pieces: how many pieces to cut it into at most.
+    :return: the offset of every piece in the text and the piece itself.
+    """
+    starts = [0]
+    for piece in range(1, n_pieces):
+        line_break = text.find(
+            "\n", max(len(text) * piece // n_pieces, starts[-1])
+        )
+        if line_break == -1 or line_break + 1 == len(text):
+            break
+        starts.append(line_break + 1)
+
+    return [
+        (start, text[start:end])
+        for start, end in zip(starts, starts[1:] + [len(text)])
+    ]
+
+
+def _parallel_min(
+    thresholds: Thresholds, workers: Union[int, None]
+) -> Tuple[Union[int, None], Union[int, None]]:
+    """
+    Get the thresholds of the parallel path, for texts and for collections,
+    turned off if there are not several workers.
+
+    :param thresholds: the thresholds.
+    :param workers: how many processes may be used, as in ``validate``.
+    :return: the thresholds for texts, in characters, and for collections,
+     in values.
+    """
+    if _resolve_workers(workers) <= 1:
+        return None, None
+
+    return thresholds.parallel_min_chars, thresholds.parallel_min_size
+
+
+def _resolve_workers(workers: Union[int, None]) -> int:
+    """
+    Get how many processes to use.
+
+    :param workers: the requested number, or None for as many as CPUs.
+    :return: the number of processes.
+    """
+    if workers is None:
+        return os.cpu_count() or 1
+
+    return workers
+
+
+def _is_at_least(size: int, threshold: Union[int, None]) -> bool:
+    """
+    Check if an input is large enough for a path.
+
+    :param size: the size of the input.
+    :param threshold: the threshold of the path, or None if it is off.
+    :return: True if so, False otherwise.
+    """
+    return threshold is not None and size >= threshold
+
+
+def _generate_calibration_values(
+    size: int, random_generator: random.Random
+) -> List[str]:
+    """
+    Generate potential DNIs to benchmark with: mostly valid ones, written in
+    different ways, and some with a wrong check letter.
+
+    :param size: how many to generate.
+    :param random_generator: the source of randomness.
+    :return: the potential DNIs.
+    """
+    values = []
+    for _ in range(size):
+        number = random_generator.randrange(10**8)
+        check_letter = UPPERCASE_CHECK_LETTERS[
+            (number + (random_generator.random() < 0.1)) % 23
+        ]
+        separator = random_generator.choice(_CALIBRATION_SEPARATORS)
+        values.append(f"{number:08d}{separator}{check_letter}")
+
+    return values
+
+
+def _time_per_item(function: Callable, items) -> float:
+    """
+    Time a function on a sequence.
+
+    :param function: the function.
+    :param items: the sequence, such as a list or a text.
+    :return: the seconds taken per item of the sequence.
+    """
+    start = time.perf_counter()
+    function(items)
+
+    return (time.perf_counter() - start) / len(items)
+
+
+def _fit_linear_cost(function: Callable, items) -> Tuple[float, float]:
+    """
+    Estimate the fixed and the per item cost of running a function on a
+    sequence, from its time on a tenth of the sequence and on all of it.
+
+    :param function: the function.
+    :param items: the sequence.
+    :return: the fixed cost and the cost per item, in seconds.
+    """
+    small_items = items[: len(items) // 10]
+    small_duration = _time_per_item(function, small_items) * len(small_items)
+    duration = _time_per_item(function, items) * len(items)
+
+    cost_per_item = max(
+        (duration - small_duration) / (len(items) - len(small_items)), 0.0
+    )
+
+    return max(duration - cost_per_item * len(items), 0.0), cost_per_item
+
+
+def _break_even(fixed_cost: float, saving_per_item: float) -> Union[int, None]:
+    """
+    Find the input size from which a path with a fixed cost pays off.
+
+    :param fixed_cost: the cost of taking the path, in seconds.
+    :param saving_per_item: how much faster the path is per item, in seconds.
+    :return: the input size, or None if the path never pays off.
+    """
+    if saving_per_item <= 0:
+        return None
+
+    return max(math.ceil(fixed_cost / saving_per_item), 1)
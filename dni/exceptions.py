@@ -39,6 +39,17 @@ class DNIException(Exception):
         """
         return {"type": self.description, "details": self.details_to_render}
 
+    def __reduce__(self):
+        """
+        Rebuild exceptions from their details when unpickled, such as when
+        they are raised in worker processes.
+        """
+        details = getattr(self, "details", None)
+        if details is None:
+            return super().__reduce__()
+
+        return type(self), (details,)
+
 
 class NoNumberFoundException(DNIException):
     """
@@ -54,13 +65,14 @@ class NoNumberFoundException(DNIException):
             self.message = (
                 f"Could not find a DNI number in: '{exception_details.string}'"
             )
+
+        super().__init__(self.message)
+
         self.details_to_render = {
             "message": self.message,
             "string": self.details.string,
         }
 
-        super().__init__(self.message)
-
 
 class MissingCheckLetterException(DNIException):
     """
@@ -103,22 +115,42 @@ class InvalidCheckLetterException(DNIException):
                 f" valid check letter for found number '{self.details.number}'."
             )
 
+        super().__init__(self.message)
+
         self.details_to_render = {
-            "message": self.details.message,
+            "message": self.message,
             "string": self.details.string,
             "found_number": self.details.number,
             "invalid_check_letter": self.details.invalid_check_letter,
             "valid_check_letter": self.details.valid_check_letter,
         }
 
-        super().__init__(self.message)
-
 
-class MultipleMatchesException(Exception):
+class MultipleMatchesException(DNIException):
     """
     Expected only one occurrence, but found multiple.
     """
 
+    description = "multiple_dni_numbers"
+
+    def __init__(
+        self, exception_details: DNIExceptionDetails = DNIExceptionDetails()
+    ):
+        self.details = exception_details
+        self.message = exception_details.message
+        if self.message is None:
+            self.message = (
+                "Found more than one DNI number in:"
+                f" '{exception_details.string}'"
+            )
+
+        super().__init__(self.message)
+
+        self.details_to_render = {
+            "message": self.message,
+            "string": self.details.string,
+        }
+
 
 class _DoNotRaiseMe(Exception):
     """
@@ -0,0 +1,173 @@
+"""
+Scan files for DNIs, including compressed ones. Gzip, bzip2, xz and zip files
+are recognized by their contents, whatever their name, and are decompressed as
+a stream into the chunked extractor, so no temporary files are written and
+memory use does not grow with the size of the file.
+"""
+
+import importlib
+import io
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, Iterator, List, TextIO, Union
+
+from . import DNI, DNIScanner, ExtractionReport, _DEFAULT_SCANNER
+
+# The compression modules, zipfile and the process pool are only imported
+# when a file needs them, as loading them slows down ``import dni``.
+_MODULES_BY_MAGIC_NUMBER = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "lzma",
+}
+_ZIP_MAGIC_NUMBER = b"PK\x03\x04"
+_MAGIC_NUMBER_SIZE = 6
+_DECODING_ERRORS = "replace"  # DNIs are ASCII, so garbage can not hide one.
+
+
+def extract_dnis_from_file(
+    file_path: str,
+    mode: str = "strict",
+    workers: int = 0,
+    scanner: DNIScanner = None,
+    encoding: str = "utf-8",
+) -> Dict[str, Union[List[DNI], ExtractionReport]]:
+    """
+    Find the DNIs in a file, which may be compressed. Zip archives may have
+    several members, each of them is scanned separately.
+
+    :param file_path: the file to scan.
+    :param mode: what to do with candidates with an invalid check letter, as
+     in ``extract_dnis_from_text``.
+    :param workers: how many processes scan the members of a zip archive in
+     parallel. 0 scans them in the current process.
+    :param scanner: the scanner used to find DNIs. If None, the one used by
+     the module-level functions.
+    :param encoding: the encoding of the text in the file.
+    :return: the found DNIs, as ``extract_dnis_from_text`` returns them, by
+     member name. Files that are not zip archives have a single member named
+     after the file.
+    """
+    scan_member = partial(
+        _extract_dnis_from_member,
+        file_path,
+        mode=mode,
+        scanner=scanner or _DEFAULT_SCANNER,
+        encoding=encoding,
+    )
+    member_names = list_members(file_path)
+
+    if workers > 0 and len(member_names) > 1:
+        futures = importlib.import_module("concurrent.futures")
+        with futures.ProcessPoolExecutor(workers) as executor:
+            return dict(
+                zip(member_names, executor.map(scan_member, member_names))
+            )
+
+    return {
+        member_name: scan_member(member_name) for member_name in member_names
+    }
+
+
+def list_members(file_path: str) -> List[str]:
+    """
+    Get the names of the members of a file that hold text to scan.
+
+    :param file_path: the file, which may be compressed.
+    :return: the names of the files in a zip archive, or just the file path
+     for any other file.
+    """
+    if _read_magic_number(file_path).startswith(_ZIP_MAGIC_NUMBER):
+        with importlib.import_module("zipfile").ZipFile(file_path) as archive:
+            return [
+                member.filename
+                for member in archive.infolist()
+                if not member.is_dir()
+            ]
+
+    return [file_path]
+
+
+def is_compressed(file_path: str) -> bool:
+    """
+    Check if a file is compressed, or a zip archive, by its contents.
+
+    :param file_path: the file.
+    :return: True if so, False otherwise.
+    """
+    magic_number = _read_magic_number(file_path)
+
+    return magic_number.startswith(_ZIP_MAGIC_NUMBER) or any(
+        magic_number.startswith(a_magic_number)
+        for a_magic_number in _MODULES_BY_MAGIC_NUMBER
+    )
+
+
+@contextmanager
+def open_text(
+    file_path: str, member_name: str = None, encoding: str = "utf-8"
+) -> Iterator[TextIO]:
+    """
+    Open a file, or a member of a zip archive, as a text stream,
+    decompressing it on the fly if needed.
+
+    :param file_path: the file, which may be compressed.
+    :param member_name: the member to open, if the file is a zip archive. If
+     None, the only member of the archive. Ignored for other files.
+    :param encoding: the encoding of the text in the file.
+    :return: a context manager that gives the text stream.
+    """
+    magic_number = _read_magic_number(file_path)
+
+    if magic_number.startswith(_ZIP_MAGIC_NUMBER):
+        with importlib.import_module("zipfile").ZipFile(file_path) as archive:
+            if member_name is None:
+                (member_name,) = list_members(file_path)
+            with archive.open(member_name) as binary_stream:
+                yield io.TextIOWrapper(
+                    binary_stream, encoding=encoding, errors=_DECODING_ERRORS
+                )
+        return
+
+    opener = open
+    for a_magic_number, module_name in _MODULES_BY_MAGIC_NUMBER.items():
+        if magic_number.startswith(a_magic_number):
+            opener = importlib.import_module(module_name).open
+    with opener(
+        file_path, "rt", encoding=encoding, errors=_DECODING_ERRORS
+    ) as text_stream:
+        yield text_stream
+
+
+def _extract_dnis_from_member(
+    file_path: str,
+    member_name: str,
+    mode: str,
+    scanner: DNIScanner,
+    encoding: str,
+) -> Union[List[DNI], ExtractionReport]:
+    """
+    Find the DNIs in a member of a file. Runs in the worker processes, so it
+    only takes and returns picklable objects.
+
+    :param file_path: the file.
+    :param member_name: the member, or the file path if the file is not a zip
+     archive.
+    :param mode: what to do with candidates with an invalid check letter.
+    :param scanner: the scanner used to find DNIs.
+    :param encoding: the encoding of the text in the file.
+    :return: the found DNIs.
+    """
+    with open_text(file_path, member_name, encoding) as text_stream:
+        return scanner.extract(text_stream, mode)
+
+
+def _read_magic_number(file_path: str) -> bytes:
+    """
+    Read the first bytes of a file, which tell its format.
+
+    :param file_path: the file.
+    :return: the bytes.
+    """
+    with open(file_path, "rb") as a_file:
+        return a_file.read(_MAGIC_NUMBER_SIZE)
@@ -0,0 +1,249 @@
+"""
+Near-match lookups of DNIs, to link records that refer to the same person
+even when their DNIs were typed with a mistake.
+"""
+
+from collections import namedtuple
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from . import DNI, DNIScanner, compute_check_letter, _DEFAULT_SCANNER
+from ._optional import import_optional
+from .constants import UPPERCASE_CHECK_LETTERS
+from .exceptions import (
+    InvalidCheckLetterException,
+    MissingCheckLetterException,
+)
+from .sketches import _as_number, _unpack_numbers
+
+EXACT_EDIT = "exact"
+SUBSTITUTION_EDIT = "substitution"
+TRANSPOSITION_EDIT = "transposition"
+
+_NUMBER_DIGITS = 8
+_NUMBER_SPACE_SIZE = 10**_NUMBER_DIGITS
+_POWERS_OF_TEN = [
+    10 ** (_NUMBER_DIGITS - 1 - i) for i in range(_NUMBER_DIGITS)
+]
+
+FuzzyMatch = namedtuple(
+    "FuzzyMatch", field_names=["dni", "edit", "check_letter_matches", "score"]
+)
+FuzzyMatch.__doc__ = """
+A known DNI that is close to a looked up string.
+
+``edit`` tells how the number of the looked up string differs from the number
+of the known DNI: ``"exact"`` if it does not, ``"substitution"`` if one digit
+is different or ``"transposition"`` if two adjacent digits are swapped.
+
+``check_letter_matches`` tells if the check letter of the looked up string is
+the valid one for the known DNI, or is None if the string has no check letter.
+A typo in the number rarely keeps the check letter valid, so a written check
+letter that matches a known DNI, but not the typed number, points to it.
+
+``score`` ranks the matches from 3 to 0, best first: exact numbers with a
+matching check letter, edited numbers with a matching check letter, exact
+numbers without one and edited numbers without one.
+"""
+
+
+class _DNIBitmap:
+    """
+    A set of DNIs kept as a bitmap over the space of 8 digit numbers, so
+    memory use is fixed at 12.5 MB, however many DNIs it holds, and checking
+    if a number is in it takes constant time. DNIs are identified by their
+    number.
+
+    :param dnis: the DNIs to add, as in ``update``.
+    """
+
+    def __init__(self, dnis: Iterable[Union[DNI, str, int]] = ()):
+        self._bitmap = bytearray(_NUMBER_SPACE_SIZE // 8)
+        self._size = 0
+        self.update(dnis)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, a_dni: Union[DNI, str, int]) -> bool:
+        return self._contains_number(_as_number(a_dni))
+
+    def add(self, a_dni: Union[DNI, str, int]) -> None:
+        """
+        Add a DNI.
+
+        :param a_dni: a DNI instance, a DNI string formatted like
+         ``DNI.format()`` or the integer value of a DNI number.
+        :return: None
+        """
+        number = _as_number(a_dni)
+        if not 0 <= number < _NUMBER_SPACE_SIZE:
+            raise ValueError(
+                f"DNI numbers must be between 0 and 99999999, not {number}"
+            )
+
+        byte_index, bit = number >> 3, 1 << (number & 7)
+        if not self._bitmap[byte_index] & bit:
+            self._bitmap[byte_index] |= bit
+            self._size += 1
+
+    def update(self, dnis: Iterable[Union[DNI, str, int]]) -> None:
+        """
+        Add many DNIs.
+
+        :param dnis: DNI instances, DNI strings formatted like
+         ``DNI.format()`` or integer values of DNI numbers.
+        :return: None
+        """
+        for a_dni in dnis:
+            self.add(a_dni)
+
+    def update_packed(self, packed_dnis) -> None:
+        """
+        Add many DNIs from a packed array, with vectorized operations.
+        Requires NumPy.
+
+        :param packed_dnis: a NumPy integer array of DNI numbers, or a buffer
+         of 9 byte DNI records, such as the ones filled by ``fill_range``.
+        :return: None
+        """
+        numpy = import_optional("numpy")
+        if numpy is None:  # pragma: no cover
+            raise ImportError(
+                f"Updating a {type(self).__name__} from packed arrays"
+                " requires numpy. Install it with: pip install numpy"
+            )
+
+        numbers = _unpack_numbers(packed_dnis)
+        if numbers.size and numbers.max() >= _NUMBER_SPACE_SIZE:
+            raise ValueError("DNI numbers must be between 0 and 99999999")
+
+        bitmap = numpy.frombuffer(self._bitmap, dtype=numpy.uint8)
+        numpy.bitwise_or.at(
+            bitmap,
+            (numbers >> numpy.uint64(3)).astype(numpy.intp),
+            (numpy.uint8(1) << (numbers & numpy.uint64(7))).astype(
+                numpy.uint8
+            ),
+        )
+        self._size = int(numpy.unpackbits(bitmap).sum(dtype=numpy.int64))
+
+    def _contains_number(self, number: int) -> bool:
+        """
+        Check if a number is in the set.
+
+        :param number: the integer value of the number.
+        :return: True if so, False otherwise.
+        """
+        if not 0 <= number < _NUMBER_SPACE_SIZE:
+            return False
+
+        return bool(self._bitmap[number >> 3] & (1 << (number & 7)))
+
+
+class DNIFuzzyIndex(_DNIBitmap):
+    """
+    Find the known DNIs within one digit substitution or adjacent
+    transposition of a string.
+
+    Known DNIs are kept as a bitmap over the space of 8 digit numbers, so
+    memory use is fixed at 12.5 MB, however many DNIs are known, and a lookup
+    only checks the 79 numbers around the looked up one, whatever the size of
+    the index.
+
+    :param known_dnis: the DNIs to index, as in ``update``.
+    :param scanner: the scanner used to parse looked up strings. If None, the
+     one used by the module-level functions.
+    """
+
+    def __init__(
+        self,
+        known_dnis: Iterable[Union[DNI, str, int]] = (),
+        scanner: DNIScanner = None,
+    ):
+        super().__init__(known_dnis)
+        self.scanner = scanner or _DEFAULT_SCANNER
+
+    def lookup(self, potential_dni_string: str) -> List[FuzzyMatch]:
+        """
+        Find the known DNIs whose number is the number of a string, or is
+        within one digit substitution or adjacent transposition of it.
+
+        :param potential_dni_string: the string, which must hold exactly one
+         DNI number, with or without a check letter, valid or not.
+        :return: the matches, best first, as ranked by their ``score``.
+        """
+        number, check_letter = self._parse_leniently(potential_dni_string)
+
+        matches = []
+        for candidate_number, edit in _iter_neighbour_numbers(number):
+            if not self._contains_number(candidate_number):
+                continue
+
+            valid_check_letter = UPPERCASE_CHECK_LETTERS[candidate_number % 23]
+            check_letter_matches = (
+                None
+                if check_letter is None
+                else check_letter == valid_check_letter
+            )
+            score = 2 * bool(check_letter_matches) + (edit == EXACT_EDIT)
+            matches.append(
+                FuzzyMatch(
+                    dni=DNI.from_validated(
+                        f"{candidate_number:08d}{valid_check_letter}"
+                    ),
+                    edit=edit,
+                    check_letter_matches=check_letter_matches,
+                    score=score,
+                )
+            )
+
+        return sorted(
+            matches, key=lambda a_match: (-a_match.score, a_match.dni.number)
+        )
+
+    def _parse_leniently(
+        self, potential_dni_string: str
+    ) -> Tuple[int, Union[str, None]]:
+        """
+        Get the number and the check letter of a string, even if the check
+        letter is missing or invalid.
+
+        :param potential_dni_string: the string.
+        :return: the integer value of the number, and the uppercase check
+         letter, or None if there is none.
+        """
+        number = self.scanner.extract_exactly_one_number(potential_dni_string)
+        issue = self.scanner.diagnose(potential_dni_string)
+
+        if isinstance(issue, MissingCheckLetterException):
+            return int(number), None
+        if isinstance(issue, InvalidCheckLetterException):
+            return int(number), issue.details.invalid_check_letter
+
+        return int(number), compute_check_letter(number)
+
+
+def _iter_neighbour_numbers(number: int) -> Iterator[Tuple[int, str]]:
+    """
+    Generate a number and every number within one digit substitution or
+    adjacent transposition of it.
+
+    :param number: the integer value of an 8 digit number.
+    :return: an iterator over the numbers and the edit that gives them.
+    """
+    yield number, EXACT_EDIT
+
+    digits = [(number // power) % 10 for power in _POWERS_OF_TEN]
+    for digit, power in zip(digits, _POWERS_OF_TEN):
+        for other_digit in range(10):
+            if other_digit != digit:
+                yield number + (other_digit - digit) * power, SUBSTITUTION_EDIT
+
+    for position in range(_NUMBER_DIGITS - 1):
+        left_digit, right_digit = digits[position], digits[position + 1]
+        if left_digit != right_digit:
+            right_power = _POWERS_OF_TEN[position + 1]
+            yield (
+                number + (right_digit - left_digit) * 9 * right_power,
+                TRANSPOSITION_EDIT,
+            )
@@ -0,0 +1,432 @@
+"""
+Validate, fix or redact DNIs in selected fields of JSON Lines records, such as
+event archives, streaming through files of any size.
+
+Fields are selected with paths of keys separated by dots. Lists are entered
+with ``[*]``, for all their items, or with an index, such as ``[0]``::
+
+    >>> dni.jsonl.process(
+    >>>     in_stream, out_stream, paths=["customer.nif", "items[*].holder_id"]
+    >>> )
+
+Records are read one at a time and processed in batches, so the values of many
+records are handled together by the vectorized functions of ``dni.arrow`` when
+``pyarrow`` is installed.
+
+Lines that are not JSON documents are skipped and logged with their line
+number, so that a single broken record does not lose the rest of the stream,
+unless ``on_malformed_line="raise"`` makes them fatal.
+"""
+
+import json
+import logging
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Iterable, Iterator, List, TextIO, Tuple, Union
+
+try:
+    import pyarrow
+    from . import arrow as dni_arrow
+except ImportError:  # pragma: no cover
+    dni_arrow = None
+
+from . import add_or_fix_check_letter, is_valid, _DEFAULT_SCANNER
+from .exceptions import NoNumberFoundException
+
+ACTIONS = ("validate", "fix", "redact")
+MALFORMED_LINE_ACTIONS = ("report", "skip", "raise")
+ANNOTATION_KEY = "_dni_valid"
+REDACTED_VALUE = "[REDACTED]"
+BATCH_SIZE = 1024  # Records.
+
+_LOGGER = logging.getLogger(__name__)
+_WILDCARD = None  # Paths are sent to worker processes, so no object().
+_REGEX_FOR_PATH_PART = re.compile(r"([^.\[\]]+)|\[(\*|\d+)\]|(\.)")
+
+PathStep = Union[str, int, None]
+
+
+def process(  # pylint: disable=too-many-arguments
+    in_stream: TextIO,
+    out_stream: TextIO,
+    paths: List[str],
+    action: str = "validate",
+    workers: int = 0,
+    *,
+    on_malformed_line: str = "report",
+) -> int:
+    """
+    Read JSON Lines records from a stream, handle the DNIs in some of their
+    fields and write the records to another stream, in the same order.
+
+    :param in_stream: the text stream to read records from.
+    :param out_stream: the text stream to write records to.
+    :param paths: the paths of the fields that hold DNIs.
+    :param action: what to do with the fields. "validate" keeps them as they
+     are and annotates each record with a ``"_dni_valid"`` object, that maps
+     the path of every found field to whether it holds a valid DNI. "fix"
+     adds or fixes their check letter, like ``add_or_fix_check_letter``.
+     "redact" replaces the fields that hold a DNI number with
+     ``"[REDACTED]"``. Only string values are considered: other values are
+     annotated as not valid and never changed.
+    :param workers: how many processes handle batches of records in
+     parallel. 0 handles them in the current process.
+    :param on_malformed_line: what to do with the lines that are not JSON
+     documents. "report" skips them and logs a warning with their line
+     number, "skip" skips them silently and "raise" raises a ``ValueError``
+     with their line number, after writing the records before them.
+    :return: the number of records written.
+    """
+    if action not in ACTIONS:
+        raise ValueError(
+            f"Action must be one of {', '.join(ACTIONS)}, not {action}"
+        )
+    if on_malformed_line not in MALFORMED_LINE_ACTIONS:
+        raise ValueError(
+            "Malformed line action must be one of "
+            f"{', '.join(MALFORMED_LINE_ACTIONS)}, not {on_malformed_line}"
+        )
+    parsed_paths = [_parse_path(path) for path in paths]
+
+    process_lines = partial(_process_lines, parsed_paths, action)
+    line_batches = _iter_line_batches(in_stream, BATCH_SIZE)
+    write_batches = partial(
+        _write_batches,
+        out_stream=out_stream,
+        on_malformed_line=on_malformed_line,
+    )
+    if workers > 0:
+        with ProcessPoolExecutor(workers) as executor:
+            processed_batches = _map_in_order(
+                executor, process_lines, line_batches, workers * 2
+            )
+            return write_batches(processed_batches)
+
+    return write_batches(map(process_lines, line_batches))
+
+
+def _process_lines(
+    parsed_paths: List[List[PathStep]],
+    action: str,
+    numbered_lines: List[Tuple[int, str]],
+) -> Tuple[List[str], List[Tuple[int, int, str]]]:
+    """
+    Handle the DNIs of a batch of JSON Lines records. Runs in the worker
+    processes, so it only takes and returns picklable objects.
+
+    :param parsed_paths: the paths of the fields, as steps to follow.
+    :param action: what to do with the fields.
+    :param numbered_lines: the records, one JSON document per line, with
+     their line numbers.
+    :return: the handled records, one JSON document per line, and the lines
+     that are not JSON documents, as their line number, how many handled
+     records come before them and the parsing error.
+    """
+    records, malformed_lines = _parse_lines(numbered_lines)
+
+    fields = [
+        field
+        for record in records
+        for steps in parsed_paths
+        for field in _find_fields(record, steps)
+    ]
+    text_fields = [field for field in fields if isinstance(field[3], str)]
+    results = _APPLY_BY_ACTION[action]([field[3] for field in text_fields])
+
+    if action == "validate":
+        for record in records:
+            if isinstance(record, dict):
+                record[ANNOTATION_KEY] = {}
+        for record, _, _, _, concrete_path in fields:
+            record[ANNOTATION_KEY][concrete_path] = False
+        for (record, _, _, _, concrete_path), result in zip(
+            text_fields, results
+        ):
+            record[ANNOTATION_KEY][concrete_path] = result
+    else:
+        for (_, container, key, _, _), result in zip(text_fields, results):
+            container[key] = result
+
+    return (
+        [json.dumps(record, ensure_ascii=False) + "\n" for record in records],
+        malformed_lines,
+    )
+
+
+def _parse_lines(
+    numbered_lines: List[Tuple[int, str]],
+) -> Tuple[List[Any], List[Tuple[int, int, str]]]:
+    """
+    Parse JSON Lines records, keeping aside the lines that are not JSON
+    documents.
+
+    :param numbered_lines: the records, with their line numbers.
+    :return: the parsed records, and the malformed lines, as their line
+     number, how many records come before them and the parsing error.
+    """
+    records = []
+    malformed_lines = []
+    for line_number, line in numbered_lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError as error:
+            malformed_lines.append((line_number, len(records), str(error)))
+
+    return records, malformed_lines
+
+
+def _validate_values(values: List[str]) -> List[bool]:
+    """
+    Check which values are valid DNIs.
+
+    :param values: the values.
+    :return: whether each value is valid.
+    """
+    if dni_arrow is not None and values:
+        return dni_arrow.is_valid(
+            pyarrow.array(values, pyarrow.string())
+        ).to_pylist()
+
+    return [is_valid(value) for value in values]
+
+
+def _fix_values(values: List[str]) -> List[str]:
+    """
+    Add or fix the check letter of values with a DNI number, and leave the
+    rest unchanged.
+
+    :param values: the values.
+    :return: the fixed values.
+    """
+    if dni_arrow is not None and values:
+        fixed_values = dni_arrow.add_or_fix_check_letter(
+            pyarrow.array(values, pyarrow.string())
+        ).to_pylist()
+        return [
+            value if fixed_value is None else fixed_value
+            for value, fixed_value in zip(values, fixed_values)
+        ]
+
+    return [_fix_or_keep(value) for value in values]
+
+
+def _redact_values(values: List[str]) -> List[str]:
+    """
+    Redact the values with a DNI number, and leave the rest unchanged.
+
+    :param values: the values.
+    :return: the redacted values.
+    """
+    return [
+        REDACTED_VALUE if _contains_dni_number(value) else value
+        for value in values
+    ]
+
+
+_APPLY_BY_ACTION = {
+    "validate": _validate_values,
+    "fix": _fix_values,
+    "redact": _redact_values,
+}
+
+
+def _fix_or_keep(value: str) -> str:
+    """
+    Add or fix the check letter of a value, if it has a DNI number.
+
+    :param value: the value.
+    :return: the fixed value, or the same value if there is no DNI number.
+    """
+    try:
+        return add_or_fix_check_letter(value)
+    except NoNumberFoundException:
+        return value
+
+
+def _contains_dni_number(value: str) -> bool:
+    """
+    Check if a value has one or more DNI numbers.
+
+    :param value: the value.
+    :return: True if so, False otherwise.
+    """
+    try:
+        _DEFAULT_SCANNER.extract_numbers(value)
+    except NoNumberFoundException:
+        return False
+
+    return True
+
+
+def _parse_path(path: str) -> List[PathStep]:
+    """
+    Split the path of a field into the keys and indexes to follow.
+
+    :param path: the path, such as ``"items[*].holder_id"``.
+    :return: the steps: keys, indexes or wildcards.
+    """
+    steps = []
+    position = 0
+    expects_key = True
+    while position < len(path):
+        a_match = _REGEX_FOR_PATH_PART.match(path, position)
+        if a_match is None:
+            raise ValueError(f"Invalid field path: {path}")
+
+        key, index, dot = a_match.groups()
+        if key is not None and expects_key:
+            steps.append(key)
+        elif index is not None and not expects_key:
+            steps.append(_WILDCARD if index == "*" else int(index))
+        elif dot is None or expects_key:
+            raise ValueError(f"Invalid field path: {path}")
+        expects_key = dot is not None
+        position = a_match.end()
+
+    if not steps or expects_key:
+        raise ValueError(f"Invalid field path: {path}")
+
+    return steps
+
+
+def _find_fields(
+    record: Any, steps: List[PathStep]
+) -> List[Tuple[dict, Union[dict, list], Union[str, int], Any, str]]:
+    """
+    Find the fields of a record that a path points to.
+
+    :param record: the record.
+    :param steps: the steps of the path to the fields.
+    :return: a list with the record, the object or list that holds the field,
+     its key or index, its value and its concrete path, with indexes instead
+     of wildcards, for every field found.
+    """
+    if not isinstance(record, dict):
+        return []
+
+    holders = [(record, "")]
+    for step in steps[:-1]:
+        holders = [
+            (holder[key], concrete_path)
+            for holder, holder_path in holders
+            for key, concrete_path in _select_keys(holder, step, holder_path)
+        ]
+
+    return [
+        (record, holder, key, holder[key], concrete_path)
+        for holder, holder_path in holders
+        for key, concrete_path in _select_keys(holder, steps[-1], holder_path)
+    ]
+
+
+def _select_keys(
+    holder: Any, step: PathStep, holder_path: str
+) -> List[Tuple[Union[str, int], str]]:
+    """
+    Find the keys or indexes of an object or list that a path step points to.
+
+    :param holder: the object or list.
+    :param step: the step.
+    :param holder_path: the concrete path of the object or list.
+    :return: a list with the keys or indexes and their concrete paths.
+    """
+    if isinstance(step, str):
+        if not isinstance(holder, dict) or step not in holder:
+            return []
+        return [(step, f"{holder_path}.{step}" if holder_path else step)]
+
+    if not isinstance(holder, list):
+        return []
+    if step is _WILDCARD:
+        return [
+            (index, f"{holder_path}[{index}]") for index in range(len(holder))
+        ]
+    if step < len(holder):
+        return [(step, f"{holder_path}[{step}]")]
+
+    return []
+
+
+def _iter_line_batches(
+    in_stream: TextIO, batch_size: int
+) -> Iterator[List[Tuple[int, str]]]:
+    """
+    Read the non-empty lines of a stream in batches, with their line numbers.
+
+    :param in_stream: the stream.
+    :param batch_size: how many lines a batch holds at most.
+    :return: an iterator over the batches.
+    """
+    batch = []
+    for line_number, line in enumerate(in_stream, start=1):
+        if not line.strip():
+            continue
+        batch.append((line_number, line))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def _map_in_order(
+    executor: ProcessPoolExecutor,
+    function: partial,
+    batches: Iterable[List[Tuple[int, str]]],
+    max_pending: int,
+) -> Iterator[Tuple[List[str], List[Tuple[int, int, str]]]]:
+    """
+    Like ``executor.map``, but only reading a few batches ahead, so that
+    memory use does not grow with the input.
+
+    :param executor: the pool of processes.
+    :param function: the function to run on every batch.
+    :param batches: the batches.
+    :param max_pending: how many batches can be in flight at once.
+    :return: an iterator over the results, in the same order as the batches.
+    """
+    pending = deque()
+    for batch in batches:
+        pending.append(executor.submit(function, batch))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def _write_batches(
+    processed_batches: Iterable[Tuple[List[str], List[Tuple[int, int, str]]]],
+    out_stream: TextIO,
+    on_malformed_line: str,
+) -> int:
+    """
+    Write batches of records to a stream, and handle their malformed lines.
+
+    :param processed_batches: the batches, one JSON document per line, with
+     their malformed lines.
+    :param out_stream: the stream.
+    :param on_malformed_line: what to do with the malformed lines.
+    :return: the number of records written.
+    """
+    written_records = 0
+    for lines, malformed_lines in processed_batches:
+        for line_number, position, error in malformed_lines:
+            if on_malformed_line == "raise":
+                out_stream.writelines(lines[:position])
+                raise ValueError(
+                    f"Line {line_number} is not a JSON document: {error}"
+                )
+            if on_malformed_line == "report":
+                _LOGGER.warning(
+                    "Skipping line %d, which is not a JSON document: %s",
+                    line_number,
+                    error,
+                )
+        out_stream.writelines(lines)
+        written_records += len(lines)
+
+    return written_records
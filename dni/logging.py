@@ -0,0 +1,115 @@
+"""
+Keep DNIs out of logs. ``RedactingFilter`` masks them in log records before
+handlers emit them::
+
+    >>> handler = logging.StreamHandler()
+    >>> handler.addFilter(dni.logging.RedactingFilter())
+
+Filters added to a handler see every record the handler emits, including the
+ones propagated from child loggers, while filters added to a logger only see
+the records logged directly on it.
+"""
+
+import logging
+import re
+from functools import lru_cache
+
+from . import DNIScanner, _DEFAULT_SCANNER
+from .constants import FULL_WIDTH_DIGITS
+
+DEFAULT_MASK = "[REDACTED]"
+DEFAULT_CACHE_SIZE = 1024  # Messages.
+
+
+class RedactingFilter(logging.Filter):
+    """
+    A logging filter that replaces the DNIs in the messages of log records
+    with a mask. Check letters are not validated, so DNIs with a typo in them
+    are masked too.
+
+    Records are only scanned for DNIs if their message has a run of 8 digits,
+    which most log lines lack, and the redacted versions of recently seen
+    messages are cached, since services tend to log the same lines over and
+    over.
+
+    :param name: the name of the logger whose records are redacted, along
+     with its children's. Records from other loggers pass through unchanged.
+     If empty, every record is redacted.
+    :param mask: the text that replaces each DNI.
+    :param scanner: the scanner used to find DNIs. If None, the one used by
+     the module-level functions.
+    :param cache_size: how many redacted messages to keep. 0 disables the
+     cache.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        mask: str = DEFAULT_MASK,
+        scanner: DNIScanner = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        super().__init__(name)
+        self.mask = mask
+        self.scanner = scanner or _DEFAULT_SCANNER
+
+        digits = "0-9"
+        if self.scanner.unicode_tolerant:
+            digits += FULL_WIDTH_DIGITS
+        self._candidate_pattern = re.compile(f"[{digits}]{{8}}")
+        self._redact_message = lru_cache(maxsize=cache_size)(
+            self._redact_uncached_message
+        )
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Mask the DNIs in the message of a log record. The arguments of the
+        message are merged into it, so DNIs in them are masked too, and the
+        record is left with no arguments.
+
+        :param record: the record, which is changed in place.
+        :return: True, as records are never dropped: records from loggers
+         that the filter does not redact are passed through unchanged.
+        """
+        if not super().filter(record):
+            return True
+
+        message = record.getMessage()
+        if self._candidate_pattern.search(message) is None:
+            return True
+
+        redacted_message = self._redact_message(message)
+        if redacted_message != message:
+            record.msg = redacted_message
+            record.args = None
+
+        return True
+
+    def redact(self, text: str) -> str:
+        """
+        Mask the DNIs in a text, as the filter does with log messages.
+
+        :param text: the text.
+        :return: the text, with every DNI replaced by the mask.
+        """
+        if self._candidate_pattern.search(text) is None:
+            return text
+
+        return self._redact_message(text)
+
+    def _redact_uncached_message(self, message: str) -> str:
+        """
+        Mask the DNIs in a message, without looking it up in the cache.
+
+        :param message: the message.
+        :return: the message, with every DNI replaced by the mask.
+        """
+        parts = []
+        position = 0
+        for dni_match in self.scanner.finditer(message):
+            parts.append(message[position : dni_match.start])
+            parts.append(self.mask)
+            position = dni_match.end
+        parts.append(message[position:])
+
+        return "".join(parts)
@@ -0,0 +1,297 @@
+"""
+Route DNIs to partitions, so that distributed jobs, such as deduplications or
+joins, find every occurrence of the same person on the same node.
+
+The partition of a DNI only depends on its number, hashed with a fixed
+function, so it does not change with the way the DNI is written, across
+processes, machines or versions of this package. Partitions are picked with
+jump consistent hashing: when the number of partitions grows from ``n`` to
+``n + 1``, only ``1 / (n + 1)`` of the DNIs move, all of them to the new
+partition.
+"""
+
+import os
+import sys
+from typing import Callable, Iterable, TextIO, Union
+
+from . import DNI, _DEFAULT_SCANNER
+from ._optional import import_optional
+from .exceptions import MultipleMatchesException, NoNumberFoundException
+from .sketches import _hash_number, _hash_numbers, _unpack_numbers
+
+DEFAULT_FILE_NAME_TEMPLATE = "part-{partition:05d}.txt"
+UNPARTITIONED_FILE_NAME = "unpartitioned.txt"
+
+_JUMP_MULTIPLIER = 2862933555777941757
+_JUMP_MASK = (1 << 64) - 1
+
+
+def partition(values, n_partitions: int):
+    """
+    Find the partition of many DNIs.
+
+    :param values: the DNIs. Either an iterable of DNI instances, strings
+     with a DNI number or integer values of DNI numbers; a NumPy integer array
+     of DNI numbers or a buffer of 9 byte DNI records, such as the ones filled
+     by ``fill_range``; or an Arrow string column. Arrays and columns are
+     handled with vectorized operations.
+    :param n_partitions: how many partitions there are.
+    :return: the partition of every DNI, from 0 to ``n_partitions - 1``. A
+     list for iterables, with None for the values that do not have exactly
+     one DNI number; a NumPy int64 array for NumPy arrays and buffers; and an
+     Arrow int64 array for Arrow columns, with nulls for the values without
+     exactly one DNI number.
+    """
+    _raise_if_invalid_partition_count(n_partitions)
+
+    # Arrow columns and NumPy arrays can only be passed once their modules
+    # are loaded, so they are not imported just to check.
+    pyarrow = sys.modules.get("pyarrow")
+    if pyarrow is not None and isinstance(
+        values, (pyarrow.Array, pyarrow.ChunkedArray)
+    ):
+        numbers = import_optional("dni.arrow").dni_numbers(values)
+        if isinstance(numbers, pyarrow.ChunkedArray):
+            numbers = numbers.combine_chunks()
+        partitions = _jump_hash_numbers(
+            numbers.fill_null(0).to_numpy().astype("uint64"),
+            n_partitions,
+        )
+        return pyarrow.array(
+            partitions, mask=numbers.is_null().to_numpy(zero_copy_only=False)
+        )
+
+    numpy = sys.modules.get("numpy")
+    is_array = numpy is not None and isinstance(values, numpy.ndarray)
+    is_buffer = isinstance(values, (bytes, bytearray, memoryview))
+    if is_array or (is_buffer and import_optional("numpy") is not None):
+        return _jump_hash_numbers(_unpack_numbers(values), n_partitions)
+
+    return [_partition_of_value(value, n_partitions) for value in values]
+
+
+def partition_of(a_dni: Union[DNI, str, int], n_partitions: int) -> int:
+    """
+    Find the partition of a DNI.
+
+    :param a_dni: a DNI instance, a string with a DNI number or the integer
+     value of a DNI number.
+    :param n_partitions: how many partitions there are.
+    :return: the partition, from 0 to ``n_partitions - 1``.
+    """
+    _raise_if_invalid_partition_count(n_partitions)
+
+    if isinstance(a_dni, DNI):
+        number = int(a_dni.number)
+    elif isinstance(a_dni, int):
+        number = a_dni
+    else:
+        number = int(_DEFAULT_SCANNER.extract_exactly_one_number(a_dni))
+
+    if not 0 <= number < 10**8:
+        raise ValueError(
+            f"DNI numbers must be between 0 and 99999999, not {number}"
+        )
+
+    return _jump_hash(_hash_number(number), n_partitions)
+
+
+class PartitionedWriter:
+    """
+    Write records to one file per partition, routing them by the DNI they
+    hold. Files are opened the first time a record goes to them, and records
+    without exactly one DNI number go to a separate file.
+
+    :param directory: the directory to write the files in. It is created if
+     it does not exist.
+    :param n_partitions: how many partitions there are.
+    :param key: a function that gets the DNI of a record, as taken by
+     ``partition_of``. If None, the record itself is scanned for a DNI
+     number.
+    :param file_name_template: the name of the file of each partition, with a
+     ``{partition}`` field for its index.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        n_partitions: int,
+        key: Callable[[str], Union[DNI, str, int]] = None,
+        file_name_template: str = DEFAULT_FILE_NAME_TEMPLATE,
+    ):
+        _raise_if_invalid_partition_count(n_partitions)
+
+        self._directory = directory
+        self._n_partitions = n_partitions
+        self._key = key
+        self._file_name_template = file_name_template
+        self._files = {}
+        self.record_counts = [0] * n_partitions
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, record: str) -> Union[int, None]:
+        """
+        Write a record to the file of its partition.
+
+        :param record: the record, as a line of text. A line break is added
+         if it does not end with one.
+        :return: the partition of the record, or None if it has no DNI
+         number.
+        """
+        record_key = record if self._key is None else self._key(record)
+        a_partition = _partition_of_value(record_key, self._n_partitions)
+        if a_partition is not None:
+            self.record_counts[a_partition] += 1
+
+        self._get_file(a_partition).write(
+            record if record.endswith("\n") else record + "\n"
+        )
+
+        return a_partition
+
+    def write_many(self, records: Iterable[str]) -> None:
+        """
+        Write many records to the files of their partitions.
+
+        :param records: the records, as lines of text.
+        :return: None
+        """
+        for record in records:
+            self.write(record)
+
+    def file_path(self, a_partition: Union[int, None]) -> str:
+        """
+        Get the path of the file of a partition.
+
+        :param a_partition: the partition, or None for the records without a
+         DNI number.
+        :return: the path.
+        """
+        if a_partition is None:
+            return os.path.join(self._directory, UNPARTITIONED_FILE_NAME)
+
+        return os.path.join(
+            self._directory,
+            self._file_name_template.format(partition=a_partition),
+        )
+
+    def close(self) -> None:
+        """
+        Close the files of the partitions.
+
+        :return: None
+        """
+        for a_file in self._files.values():
+            a_file.close()
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception_info):
+        self.close()
+
+    def _get_file(self, a_partition: Union[int, None]) -> TextIO:
+        """
+        Get the file of a partition, opening it if needed.
+
+        :param a_partition: the partition, or None for the records without a
+         DNI number.
+        :return: the file, opened for writing text.
+        """
+        if a_partition not in self._files:
+            # pylint: disable=consider-using-with
+            self._files[a_partition] = open(
+                self.file_path(a_partition), "w", encoding="utf-8"
+            )
+
+        return self._files[a_partition]
+
+
+def _partition_of_value(
+    value: Union[DNI, str, int], n_partitions: int
+) -> Union[int, None]:
+    """
+    Find the partition of a value that may not hold a DNI number.
+
+    :param value: the value.
+    :param n_partitions: how many partitions there are.
+    :return: the partition, or None if the value is None or does not have
+     exactly one DNI number.
+    """
+    if value is None:
+        return None
+
+    try:
+        return partition_of(value, n_partitions)
+    except (NoNumberFoundException, MultipleMatchesException, ValueError):
+        return None
+
+
+def _jump_hash(key: int, n_partitions: int) -> int:
+    """
+    Pick the partition of a 64 bit key with jump consistent hashing, as
+    described by Lamping and Veach.
+
+    :param key: the key.
+    :param n_partitions: how many partitions there are.
+    :return: the partition.
+    """
+    bucket, jump = -1, 0
+    while jump < n_partitions:
+        bucket = jump
+        key = (key * _JUMP_MULTIPLIER + 1) & _JUMP_MASK
+        jump = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+
+    return bucket
+
+
+def _jump_hash_numbers(
+    numbers: "numpy.ndarray", n_partitions: int
+) -> "numpy.ndarray":
+    """
+    Vectorized version of ``_jump_hash`` over the hashes of DNI numbers. Every
+    key takes about ``ln(n_partitions)`` jumps, and all keys jump at once.
+
+    :param numbers: the numbers, as 64 bit unsigned integers.
+    :param n_partitions: how many partitions there are.
+    :return: the partitions, as an int64 array.
+    """
+    if numbers.size and numbers.max() >= 10**8:
+        raise ValueError("DNI numbers must be between 0 and 99999999")
+
+    numpy = import_optional("numpy")
+    keys = _hash_numbers(numbers)
+    buckets = numpy.zeros(numbers.shape, dtype=numpy.int64)
+    # Only the keys that are still jumping are kept, so every round is
+    # cheaper than the previous one.
+    positions = numpy.arange(numbers.size)
+    jumps = numpy.zeros(numbers.shape, dtype=numpy.int64)
+    with numpy.errstate(over="ignore"):
+        while positions.size:
+            buckets[positions] = jumps
+            keys = keys * numpy.uint64(_JUMP_MULTIPLIER) + numpy.uint64(1)
+            jumps = (
+                (jumps + 1).astype(numpy.float64)
+                * (float(1 << 31) / ((keys >> numpy.uint64(33)) + 1.0))
+            ).astype(numpy.int64)
+            is_jumping = jumps < n_partitions
+            positions = positions[is_jumping]
+            keys = keys[is_jumping]
+            jumps = jumps[is_jumping]
+
+    return buckets
+
+
+def _raise_if_invalid_partition_count(n_partitions: int) -> None:
+    """
+    Check that a number of partitions can be used.
+
+    :param n_partitions: the number of partitions.
+    :return: None
+    """
+    if n_partitions < 1:
+        raise ValueError(
+            "The number of partitions must be at least 1, but it is:"
+            f" {n_partitions}"
+        )
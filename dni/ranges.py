@@ -0,0 +1,131 @@
+"""
+Enumerate every valid DNI in a range of numbers. Check letters are not
+computed one by one: the remainder of consecutive numbers modulo 23 just moves
+forward by one, so the letters simply cycle through ``UPPERCASE_CHECK_LETTERS``.
+"""
+
+from itertools import cycle
+from typing import Iterator, Union
+
+from . import DNI
+from ._optional import import_optional
+from .constants import UPPERCASE_CHECK_LETTERS
+
+DNI_RECORD_SIZE = 9  # 8 digits and the check letter, one byte each.
+_NUMBER_LIMIT = 10**8
+
+
+def iter_range(
+    start: int, stop: int, as_: type = str
+) -> Iterator[Union[str, int, DNI]]:
+    """
+    Lazily generate every valid DNI whose number is in a range.
+
+    :param start: the first number of the range.
+    :param stop: the end of the range, not included.
+    :param as_: the type to generate. ``str`` for DNI strings formatted like
+     ``DNI.format()``, ``DNI`` for DNI instances, or ``int`` for the bare
+     numbers, from which the check letter can always be recomputed.
+    :return: an iterator over the DNIs, in increasing order.
+    """
+    _raise_if_out_of_range(start, stop)
+    if as_ not in (str, int, DNI):
+        raise ValueError(f"as_ must be either str, int or DNI, not {as_}")
+
+    if as_ is int:
+        return iter(range(start, stop))
+
+    dni_strings = (
+        f"{number:08d}{check_letter}"
+        for number, check_letter in zip(
+            range(start, stop), _cycle_check_letters_from(start)
+        )
+    )
+    if as_ is DNI:
+        return (DNI.from_validated(a_string) for a_string in dni_strings)
+
+    return dni_strings
+
+
+def fill_range(buffer, start: int) -> int:
+    """
+    Fill a writable buffer with consecutive valid DNIs, starting at some
+    number. Each DNI takes a 9 byte ASCII record, so the buffer can be, for
+    instance, a ``bytearray``, an ``array.array("B")``, or a NumPy array of
+    dtype ``"S9"`` or ``uint8``. The buffer is filled with vectorized NumPy
+    operations if NumPy is installed.
+
+    :param buffer: a C-contiguous writable buffer, with a size multiple of 9
+     bytes.
+    :param start: the number of the first DNI.
+    :return: the number of DNIs written.
+    """
+    view = memoryview(buffer).cast("B")
+    quantity, leftover_bytes = divmod(view.nbytes, DNI_RECORD_SIZE)
+    if leftover_bytes:
+        raise ValueError(
+            f"The buffer size must be a multiple of {DNI_RECORD_SIZE} bytes,"
+            f" but it is {view.nbytes} bytes long"
+        )
+    _raise_if_out_of_range(start, start + quantity)
+
+    if import_optional("numpy") is not None:
+        _fill_range_with_numpy(view, start, quantity)
+    else:  # pragma: no cover
+        view[:] = "".join(iter_range(start, start + quantity)).encode("ascii")
+
+    return quantity
+
+
+def _fill_range_with_numpy(view: memoryview, start: int, quantity: int):
+    """
+    Vectorized fill of a buffer with consecutive DNI records.
+
+    :param view: a writable byte view of the buffer.
+    :param start: the number of the first DNI.
+    :param quantity: the number of DNIs to write.
+    :return: None
+    """
+    numpy = import_optional("numpy")
+    records = numpy.frombuffer(view, dtype=numpy.uint8).reshape(
+        quantity, DNI_RECORD_SIZE
+    )
+    numbers = numpy.arange(start, start + quantity, dtype=numpy.int64)
+
+    check_letter_codes = numpy.frombuffer(
+        UPPERCASE_CHECK_LETTERS.encode("ascii"), dtype=numpy.uint8
+    )
+    records[:, 8] = check_letter_codes[numbers % 23]
+    for digit_position in range(7, -1, -1):
+        records[:, digit_position] = numbers % 10 + ord("0")
+        numbers //= 10
+
+
+def _cycle_check_letters_from(number: int) -> Iterator[str]:
+    """
+    Cycle endlessly through the check letters of consecutive numbers.
+
+    :param number: the first number.
+    :return: an iterator over the check letters.
+    """
+    remainder = number % 23
+
+    return cycle(
+        UPPERCASE_CHECK_LETTERS[remainder:]
+        + UPPERCASE_CHECK_LETTERS[:remainder]
+    )
+
+
+def _raise_if_out_of_range(start: int, stop: int) -> None:
+    """
+    Make sure a range only covers 8 digit numbers.
+
+    :param start: the first number of the range.
+    :param stop: the end of the range, not included.
+    :return: None
+    """
+    if not 0 <= start <= stop <= _NUMBER_LIMIT:
+        raise ValueError(
+            f"The range must satisfy 0 <= start <= stop <= {_NUMBER_LIMIT},"
+            f" but it is [{start}, {stop})"
+        )
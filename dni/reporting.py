@@ -0,0 +1,482 @@
+"""
+Summaries of the validity of large amounts of potential DNIs, computed in a
+single pass and in constant memory, no matter how large the input is, or
+estimated from a random sample of it.
+"""
+
+import math
+import os
+import random
+import sys
+from collections import Counter, namedtuple
+from collections.abc import Sequence
+from contextlib import ExitStack
+from itertools import chain, count, islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple, Union
+
+from . import DNIScanner, _DEFAULT_SCANNER
+from .files import is_compressed, list_members, open_text
+from .exceptions import (
+    NoNumberFoundException,
+    MissingCheckLetterException,
+    InvalidCheckLetterException,
+    MultipleMatchesException,
+)
+
+VALID_OUTCOME = "valid"
+OUTCOMES = (
+    VALID_OUTCOME,
+    NoNumberFoundException.description,
+    MissingCheckLetterException.description,
+    InvalidCheckLetterException.description,
+    MultipleMatchesException.description,
+)
+DEFAULT_SAMPLES_PER_OUTCOME = 5
+
+# Smaller files are read whole, which is as fast as seeking and gives exact
+# rates whenever they hold fewer records than the sample.
+_MIN_BYTES_FOR_SEEKING = 64 * 1024 * 1024
+_RECORDS_PER_MARGIN_CHECK = 100
+_BYTES_PER_BACKWARD_READ = 4096
+_DECODING_ERRORS = "replace"
+
+ValidationReport = namedtuple(
+    "ValidationReport",
+    field_names=[
+        "total",
+        "counts",
+        "found_check_letters",
+        "expected_check_letters",
+        "samples",
+    ],
+)
+ValidationReport.__doc__ = """
+A summary of the validity of some potential DNIs.
+
+``total`` is the number of strings checked, and ``counts`` how many of them had
+each outcome: ``"valid"``, or the ``description`` of the exception that
+explains why they are not valid, such as ``"invalid_check_letter"``.
+
+``found_check_letters`` and ``expected_check_letters`` count the check letters
+of the strings with an invalid check letter, as written and as they should be.
+
+``samples`` holds, for each failure outcome, a uniform random sample of the
+failures, rendered with ``render_as_dict()``.
+"""
+
+QualityEstimate = namedtuple(
+    "QualityEstimate",
+    field_names=[
+        "sample_size",
+        "rates",
+        "intervals",
+        "confidence",
+        "exhaustive",
+    ],
+)
+QualityEstimate.__doc__ = """
+An estimate of the share of potential DNIs with each outcome, out of all the
+records of a dataset, from the ``sample_size`` records classified.
+
+``rates`` maps every outcome, as in ``ValidationReport.counts``, to its
+estimated share, and ``intervals`` to the lower and upper bounds of its
+confidence interval, at the ``confidence`` level.
+
+``exhaustive`` is True if every record was classified, in which case the
+rates are exact and the intervals hold just the rate.
+"""
+
+
+def report(
+    potential_dni_strings: Iterable[str],
+    samples_per_outcome: int = DEFAULT_SAMPLES_PER_OUTCOME,
+    scanner: DNIScanner = None,
+    seed: int = None,
+) -> ValidationReport:
+    """
+    Check the validity of many potential DNIs and summarize the outcomes.
+    Samples of each failure are taken with reservoir sampling, so memory use
+    does not grow with the input.
+
+    :param potential_dni_strings: the strings that may contain DNIs, such as a
+     column of a large file, read lazily.
+    :param samples_per_outcome: how many failures of each kind to keep.
+    :param scanner: the scanner used to validate the strings. If None, the one
+     used by the module-level functions.
+    :param seed: a seed to make the sampling reproducible.
+    :return: the report.
+    """
+    if samples_per_outcome < 0:
+        raise ValueError(
+            "The number of samples per outcome can not be negative, but it"
+            f" is: {samples_per_outcome}"
+        )
+
+    scanner = scanner or _DEFAULT_SCANNER
+    random_generator = random.Random(seed)
+    counts = Counter({outcome: 0 for outcome in OUTCOMES})
+    found_check_letters = Counter()
+    expected_check_letters = Counter()
+    samples: Dict[str, List[dict]] = {
+        outcome: [] for outcome in OUTCOMES if outcome != VALID_OUTCOME
+    }
+
+    for potential_dni_string in potential_dni_strings:
+        issue = scanner.diagnose(potential_dni_string)
+        if issue is None:
+            counts[VALID_OUTCOME] += 1
+            continue
+
+        counts[issue.description] += 1
+        if isinstance(issue, InvalidCheckLetterException):
+            found_check_letters[issue.details.invalid_check_letter] += 1
+            expected_check_letters[issue.details.valid_check_letter] += 1
+
+        sample_index = _pick_reservoir_index(
+            counts[issue.description], samples_per_outcome, random_generator
+        )
+        outcome_samples = samples[issue.description]
+        if sample_index == len(outcome_samples):
+            outcome_samples.append(issue.render_as_dict())
+        elif sample_index is not None:
+            outcome_samples[sample_index] = issue.render_as_dict()
+
+    return ValidationReport(
+        total=sum(counts.values()),
+        counts=dict(counts),
+        found_check_letters=dict(found_check_letters),
+        expected_check_letters=dict(expected_check_letters),
+        samples=samples,
+    )
+
+
+def estimate_quality(
+    path_or_iterable: Union[str, os.PathLike, Iterable[str]],
+    confidence: float = 0.99,
+    margin: float = 0.005,
+    scanner: DNIScanner = None,
+    seed: int = None,
+) -> QualityEstimate:
+    """
+    Estimate the share of potential DNIs with each outcome in a dataset too
+    large to check whole, from a uniform random sample of its records.
+    Sampling stops as soon as the confidence interval of every outcome is
+    within the margin, so datasets that are almost all valid, or almost all
+    invalid, take only a few thousand records.
+
+    Large uncompressed files are sampled by seeking to random byte offsets
+    and reading the line there, without reading the rest of the file. Lines
+    are picked in proportion to their length, which the estimate corrects
+    for. Streams, iterators and compressed files are read whole, but only
+    a reservoir sample of them is classified. Blank lines are not records.
+
+    The intervals are Wilson score intervals, checked as the sample grows,
+    so their actual coverage can be slightly below ``confidence``.
+
+    :param path_or_iterable: the path of a file with one record per line,
+     which may be compressed, as in ``dni.files``; or the records, such as a
+     list, a text stream or any other iterable of strings.
+    :param confidence: the confidence level of the intervals, between 0 and
+     1.
+    :param margin: the largest half width of the intervals to aim for,
+     between 0 and 0.5.
+    :param scanner: the scanner used to classify the records. If None, the
+     one used by the module-level functions.
+    :param seed: a seed to make the sampling reproducible.
+    :return: the estimate.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(
+            f"The confidence must be between 0 and 1, but it is: {confidence}"
+        )
+    if not 0 < margin <= 0.5:
+        raise ValueError(
+            f"The margin must be between 0 and 0.5, but it is: {margin}"
+        )
+
+    # Only imported here, as it loads decimal and slows down ``import dni``.
+    # pylint: disable=import-outside-toplevel
+    from statistics import NormalDist
+
+    random_generator = random.Random(seed)
+    # How many standard deviations around the mean hold the confidence level.
+    z_score = NormalDist().inv_cdf((1 + confidence) / 2)
+    # Enough records for the widest interval, the one of a rate of 0.5.
+    max_sample_size = math.ceil(z_score**2 / (4 * margin**2))
+
+    if isinstance(path_or_iterable, (str, os.PathLike)):
+        file_path = os.fspath(path_or_iterable)
+        if os.path.getsize(
+            file_path
+        ) >= _MIN_BYTES_FOR_SEEKING and not is_compressed(file_path):
+            with open(file_path, "rb") as a_file:
+                # Longer lines weigh less, so more of them may be needed.
+                return _estimate_rates(
+                    _iter_weighted_random_lines(
+                        a_file, 2 * max_sample_size, random_generator
+                    ),
+                    scanner or _DEFAULT_SCANNER,
+                    z_score,
+                    margin,
+                )._replace(confidence=confidence)
+        with ExitStack() as stack:
+            sample, exhaustive = _sample_uniformly(
+                chain.from_iterable(
+                    stack.enter_context(open_text(file_path, member_name))
+                    for member_name in list_members(file_path)
+                ),
+                max_sample_size,
+                random_generator,
+            )
+    else:
+        sample, exhaustive = _sample_uniformly(
+            path_or_iterable, max_sample_size, random_generator
+        )
+
+    estimate = _estimate_rates(
+        ((record, 1.0) for record in sample),
+        scanner or _DEFAULT_SCANNER,
+        z_score,
+        None if exhaustive else margin,
+    )
+    if exhaustive:
+        estimate = estimate._replace(
+            intervals={
+                outcome: (rate, rate)
+                for outcome, rate in estimate.rates.items()
+            },
+            exhaustive=True,
+        )
+
+    return estimate._replace(confidence=confidence)
+
+
+def _estimate_rates(
+    weighted_records: Iterable[Tuple[str, float]],
+    scanner: DNIScanner,
+    z_score: float,
+    margin: Union[float, None],
+) -> QualityEstimate:
+    """
+    Classify records until the confidence interval of every outcome is within
+    a margin, or there are no more records.
+
+    :param weighted_records: the sampled records, with the inverse of their
+     relative probability of being sampled.
+    :param scanner: the scanner used to classify the records.
+    :param z_score: the z-score of the confidence level.
+    :param margin: the largest half width of the intervals, or None to
+     classify every record.
+    :return: the estimate, without its confidence level.
+    """
+    weights_by_outcome = dict.fromkeys(OUTCOMES, 0.0)
+    sum_of_squared_weights = 0.0
+    sample_size = 0
+    intervals = {}
+
+    for record, weight in weighted_records:
+        record = record.rstrip("\r\n")
+        if not record.strip():
+            continue
+
+        issue = scanner.diagnose(record)
+        weights_by_outcome[
+            VALID_OUTCOME if issue is None else issue.description
+        ] += weight
+        sum_of_squared_weights += weight**2
+        sample_size += 1
+
+        if margin is not None and sample_size % _RECORDS_PER_MARGIN_CHECK == 0:
+            intervals = _compute_intervals(
+                weights_by_outcome, sum_of_squared_weights, z_score
+            )
+            if all(
+                (high - low) / 2 <= margin for low, high in intervals.values()
+            ):
+                break
+    else:
+        intervals = _compute_intervals(
+            weights_by_outcome, sum_of_squared_weights, z_score
+        )
+
+    total_weight = sum(weights_by_outcome.values())
+
+    return QualityEstimate(
+        sample_size=sample_size,
+        rates={
+            outcome: weight / total_weight if total_weight else 0.0
+            for outcome, weight in weights_by_outcome.items()
+        },
+        intervals=intervals,
+        confidence=None,
+        exhaustive=False,
+    )
+
+
+def _compute_intervals(
+    weights_by_outcome: Dict[str, float],
+    sum_of_squared_weights: float,
+    z_score: float,
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Compute the Wilson score interval of the rate of every outcome. Weighted
+    samples count as their effective size, the one of an unweighted sample
+    with the same variance.
+
+    :param weights_by_outcome: the sum of the weights of the records with
+     each outcome.
+    :param sum_of_squared_weights: the sum of the squared weights of all the
+     records.
+    :param z_score: the z-score of the confidence level.
+    :return: the lower and upper bounds of the interval of every outcome.
+    """
+    total_weight = sum(weights_by_outcome.values())
+    if not total_weight:
+        return {outcome: (0.0, 1.0) for outcome in weights_by_outcome}
+
+    effective_size = total_weight**2 / sum_of_squared_weights
+    squared_z_score = z_score**2
+    intervals = {}
+    for outcome, weight in weights_by_outcome.items():
+        rate = weight / total_weight
+        center = (rate + squared_z_score / (2 * effective_size)) / (
+            1 + squared_z_score / effective_size
+        )
+        half_width = (
+            z_score
+            / (1 + squared_z_score / effective_size)
+            * math.sqrt(
+                rate * (1 - rate) / effective_size
+                + squared_z_score / (4 * effective_size**2)
+            )
+        )
+        intervals[outcome] = (
+            max(center - half_width, 0.0),
+            min(center + half_width, 1.0),
+        )
+
+    return intervals
+
+
+def _sample_uniformly(
+    records: Iterable[str], sample_size: int, random_generator: random.Random
+) -> Tuple[List[str], bool]:
+    """
+    Take a uniform random sample of records, in random order. Sequences are
+    sampled by index; other iterables are read whole, keeping a reservoir
+    sample, that skips ahead a random number of records between
+    replacements, so that most records cost no random numbers.
+
+    :param records: the records.
+    :param sample_size: how many records to sample.
+    :param random_generator: the source of randomness.
+    :return: the sample, and whether it holds every record.
+    """
+    if isinstance(records, Sequence):
+        if len(records) <= sample_size:
+            return list(records), True
+        return [
+            records[index]
+            for index in random_generator.sample(
+                range(len(records)), sample_size
+            )
+        ], False
+
+    # Skipped records are read too, so they are counted as they are read.
+    records_read = count()
+    iterator = (record for record, _ in zip(records, records_read))
+    reservoir = list(islice(iterator, sample_size))
+    if len(reservoir) < sample_size:
+        return reservoir, True
+
+    threshold = math.exp(_log_random(random_generator) / sample_size)
+    while True:
+        skip = math.floor(
+            _log_random(random_generator) / math.log(1 - threshold)
+        )
+        for record in islice(iterator, skip, skip + 1):
+            reservoir[random_generator.randrange(sample_size)] = record
+            break
+        else:
+            break
+        threshold *= math.exp(_log_random(random_generator) / sample_size)
+
+    random_generator.shuffle(reservoir)
+
+    return reservoir, next(records_read) == sample_size
+
+
+def _log_random(random_generator: random.Random) -> float:
+    """
+    Get the logarithm of a random number between 0 and 1, excluding 0.
+
+    :param random_generator: the source of randomness.
+    :return: the logarithm.
+    """
+    return math.log(random_generator.random() or sys.float_info.min)
+
+
+def _iter_weighted_random_lines(
+    a_file: BinaryIO, n_lines: int, random_generator: random.Random
+) -> Iterator[Tuple[str, float]]:
+    """
+    Read the lines at random byte offsets of a file. Each line is as likely
+    to be read as its share of the bytes of the file, so it is weighted by the
+    inverse of its length.
+
+    :param a_file: the file, opened in binary mode.
+    :param n_lines: how many lines to read.
+    :param random_generator: the source of randomness.
+    :return: an iterator over the lines, with their weights.
+    """
+    file_size = a_file.seek(0, os.SEEK_END)
+    for _ in range(n_lines):
+        line = _read_line_at(a_file, random_generator.randrange(file_size))
+        yield line.decode("utf-8", errors=_DECODING_ERRORS), 1 / len(line)
+
+
+def _read_line_at(a_file: BinaryIO, offset: int) -> bytes:
+    """
+    Read the line of a file that a byte belongs to, reading backwards from it
+    to find where the line starts.
+
+    :param a_file: the file, opened in binary mode.
+    :param offset: the offset of the byte.
+    :return: the line, line break included.
+    """
+    line_start = offset
+    while line_start > 0:
+        block_start = max(line_start - _BYTES_PER_BACKWARD_READ, 0)
+        a_file.seek(block_start)
+        line_break = a_file.read(line_start - block_start).rfind(b"\n")
+        if line_break != -1:
+            line_start = block_start + line_break + 1
+            break
+        line_start = block_start
+
+    a_file.seek(line_start)
+
+    return a_file.readline()
+
+
+def _pick_reservoir_index(
+    items_seen: int, reservoir_size: int, random_generator: random.Random
+) -> Union[int, None]:
+    """
+    Decide where the latest item of a stream goes in a reservoir sample, so
+    that every item seen so far is equally likely to be in it.
+
+    :param items_seen: how many items have been seen, the latest included.
+    :param reservoir_size: how many items the reservoir holds.
+    :param random_generator: the source of randomness.
+    :return: the index of the reservoir to put the item at, or None if the
+     item is left out.
+    """
+    if items_seen <= reservoir_size:
+        return items_seen - 1
+
+    index = random_generator.randrange(items_seen)
+    if index < reservoir_size:
+        return index
+
+    return None
@@ -0,0 +1,576 @@
+"""
+The scanner holds the compiled regexes used to find and parse DNIs. The
+module-level functions of the package use a default scanner; create your own
+to change how tolerant matching is.
+"""
+
+import re
+from collections import namedtuple
+from functools import partial
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Match,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from .constants import (
+    UPPERCASE_CHECK_LETTERS,
+    LOWERCASE_CHECK_LETTERS,
+    UPPER_AND_LOWER_CASE_CHECK_LETTERS,
+    MAX_ALLOWED_SEP_CHARS,
+    NUMBER_CHARACTERS,
+    FULL_WIDTH_DIGITS,
+    FULL_WIDTH_UPPERCASE_CHECK_LETTERS,
+    FULL_WIDTH_LOWERCASE_CHECK_LETTERS,
+    UNICODE_SEPARATORS_BY_ASCII_SEPARATOR,
+)
+from .exceptions import (
+    DNIException,
+    MultipleMatchesException,
+    InvalidCheckLetterException,
+    MissingCheckLetterException,
+    NoNumberFoundException,
+    DNIExceptionDetails,
+)
+
+DNIMatch = namedtuple(
+    "DNIMatch", field_names=["start", "end", "number", "check_letter", "raw"]
+)
+DNIMatch.__doc__ = """
+A DNI-valid substring found in a text. ``start`` and ``end`` are the offsets of
+the substring in the text, ``raw`` is the substring itself, clutter included,
+and ``number`` and ``check_letter`` are its components, as written but with
+full-width characters replaced by their ASCII equivalents.
+"""
+
+ExtractionReport = namedtuple(
+    "ExtractionReport", field_names=["dnis", "invalid_matches"]
+)
+ExtractionReport.__doc__ = """
+The outcome of extracting DNIs from a text in "report" mode. ``dnis`` holds the
+DNIs with a valid check letter, as instances of the DNI class, and
+``invalid_matches`` the ``DNIMatch`` of every candidate with an invalid one.
+"""
+
+EXTRACTION_MODES = ("strict", "valid_only", "fix", "report")
+DEFAULT_STREAM_CHUNK_SIZE = 1024 * 1024
+CHECK_LETTERS_BY_CASE = {
+    "any": UPPER_AND_LOWER_CASE_CHECK_LETTERS,
+    "upper": UPPERCASE_CHECK_LETTERS,
+    "lower": LOWERCASE_CHECK_LETTERS,
+}
+FULL_WIDTH_CHECK_LETTERS_BY_CASE = {
+    "any": FULL_WIDTH_UPPERCASE_CHECK_LETTERS
+    + FULL_WIDTH_LOWERCASE_CHECK_LETTERS,
+    "upper": FULL_WIDTH_UPPERCASE_CHECK_LETTERS,
+    "lower": FULL_WIDTH_LOWERCASE_CHECK_LETTERS,
+}
+_FULL_WIDTH_TO_ASCII = str.maketrans(
+    FULL_WIDTH_DIGITS
+    + FULL_WIDTH_UPPERCASE_CHECK_LETTERS
+    + FULL_WIDTH_LOWERCASE_CHECK_LETTERS,
+    "".join(NUMBER_CHARACTERS)
+    + UPPERCASE_CHECK_LETTERS
+    + LOWERCASE_CHECK_LETTERS,
+)
+
+
+class DNIScanner:
+    """
+    Find, validate and extract DNIs with a configurable tolerance. Patterns
+    are compiled once, when the scanner is created, and scanners are never
+    modified afterwards, so a single scanner can be shared between threads.
+
+    :param max_separator_chars: how many characters may appear between the
+     number and the check letter.
+    :param allowed_separators: the characters that may appear between the
+     number and the check letter. If None, any character but a line break.
+    :param case: which check letters are recognized: "upper", "lower" or
+     "any".
+    :param unicode_tolerant: whether to also recognize the full-width digits
+     and check letters, and the Unicode spaces and dashes, that show up in
+     scanned and OCR'd documents. Texts are matched as they are, without a
+     normalized copy, so offsets still refer to the original text.
+    """
+
+    def __init__(
+        self,
+        max_separator_chars: int = MAX_ALLOWED_SEP_CHARS,
+        allowed_separators: str = None,
+        case: str = "any",
+        unicode_tolerant: bool = False,
+    ):
+        if max_separator_chars < 0:
+            raise ValueError(
+                "The maximum number of separator characters can not be"
+                f" negative, but it is: {max_separator_chars}"
+            )
+        if allowed_separators is not None and "\n" in allowed_separators:
+            raise ValueError("Separators can not include line breaks")
+        if case not in CHECK_LETTERS_BY_CASE:
+            raise ValueError(
+                f"Case must be either 'upper', 'lower' or 'any', not {case}"
+            )
+
+        self._max_separator_chars = max_separator_chars
+        self._allowed_separators = allowed_separators
+        self._case = case
+        self._unicode_tolerant = unicode_tolerant
+
+        digits = "0-9"
+        check_letters = CHECK_LETTERS_BY_CASE[case]
+        if unicode_tolerant:
+            digits += FULL_WIDTH_DIGITS
+            check_letters += FULL_WIDTH_CHECK_LETTERS_BY_CASE[case]
+            if allowed_separators is not None:
+                allowed_separators += "".join(
+                    UNICODE_SEPARATORS_BY_ASCII_SEPARATOR.get(separator, "")
+                    for separator in allowed_separators
+                )
+
+        separator = (
+            "."
+            if allowed_separators is None
+            else f"[{re.escape(allowed_separators)}]"
+        )
+        regex_for_check_letter = (
+            f"(?<![{check_letters}]{{1}})"
+            f"([{check_letters}]{{1}})"
+            f"(?![{check_letters}]{{1}})"
+        )
+        # Starting with a digit, rather than with the lookbehind, lets the
+        # regex engine skip ahead to the next digit, which makes scans of
+        # long texts about twice as fast. The lookbehind then checks that the
+        # character before that digit is not another digit.
+        regex_for_8_digit_number = (
+            f"([{digits}](?<![{digits}]{{2}})[{digits}]{{7}})"
+            f"(?![{digits}]{{1}})"
+        )
+        self._number_pattern = re.compile(regex_for_8_digit_number)
+        # Separators are matched lazily, so the nearest check letter is taken
+        # and words that follow a DNI are not mistaken for its check letter.
+        self._full_dni_pattern = re.compile(
+            f"{regex_for_8_digit_number}"
+            f"{separator}{{0,{max_separator_chars}}}?"
+            f"{regex_for_check_letter}"
+        )
+        self._not_a_dni_char_pattern = re.compile(
+            f"[^{digits}{check_letters}]"
+        )
+
+    def __repr__(self):
+        return (
+            f"DNIScanner(max_separator_chars={self._max_separator_chars},"
+            f" allowed_separators={self._allowed_separators!r},"
+            f" case={self._case!r},"
+            f" unicode_tolerant={self._unicode_tolerant})"
+        )
+
+    @property
+    def max_separator_chars(self) -> int:
+        """
+        Get how many characters may appear between number and check letter.
+
+        :return: the number of characters.
+        """
+        return self._max_separator_chars
+
+    @property
+    def allowed_separators(self) -> Union[str, None]:
+        """
+        Get the characters that may appear between number and check letter.
+
+        :return: the characters, or None if any but a line break is allowed.
+        """
+        return self._allowed_separators
+
+    @property
+    def case(self) -> str:
+        """
+        Get which check letters are recognized.
+
+        :return: "upper", "lower" or "any".
+        """
+        return self._case
+
+    @property
+    def unicode_tolerant(self) -> bool:
+        """
+        Get whether full-width characters and Unicode separators are
+        recognized.
+
+        :return: True if so, False otherwise.
+        """
+        return self._unicode_tolerant
+
+    def contains(self, text: str) -> bool:
+        """
+        Check if a text contains one or more DNI occurrences. Stops scanning
+        the text at the first occurrence.
+
+        :param text: a text that may contain some or no DNI-valid substrings.
+        :return: True if so, False otherwise.
+        """
+        return self._full_dni_pattern.search(text) is not None
+
+    def finditer(
+        self,
+        text_or_stream: Union[str, TextIO],
+        number_filter: Callable[[str], bool] = None,
+    ) -> Iterator[DNIMatch]:
+        """
+        Lazily find DNI-valid substrings in a text, along with their
+        positions. The check letters are not validated.
+
+        :param text_or_stream: a text that may contain some or no DNI-valid
+         substrings, or a text stream, such as a file opened in text mode,
+         that will be read in chunks.
+        :param number_filter: a function that takes the number of every
+         candidate, as written in the text, and tells whether to report it.
+         Rejected candidates are skipped before any match is built for them.
+         If None, every candidate is reported.
+        :return: an iterator over the matches, in order of appearance.
+         Offsets are relative to the start of the text or stream.
+        """
+        if not isinstance(text_or_stream, str):
+            return self.finditer_chunks(
+                _iter_text_chunks(text_or_stream), number_filter
+            )
+
+        return self._finditer_in_text(text_or_stream, number_filter)
+
+    def extract(
+        self, text_or_stream: Union[str, TextIO], mode: str = "strict"
+    ) -> Union[list, ExtractionReport]:
+        """
+        Find DNI-valid substrings in a text and generate DNI instances from
+        them. Every candidate is classified as it is found, in a single pass.
+
+        :param text_or_stream: a text that may contain some or no DNI-valid
+         substrings, or a text stream, that will be read in chunks.
+        :param mode: what to do with candidates with an invalid check letter:
+         raise an ``InvalidCheckLetterException`` ("strict"), skip them
+         ("valid_only"), replace their check letter with the right one
+         ("fix"), or return them along with the valid ones ("report").
+        :return: a list with the found DNIs as instances of the DNI class, or
+         an ``ExtractionReport`` in "report" mode.
+        """
+        return self.classify(self.finditer(text_or_stream), mode)
+
+    def classify(
+        self, dni_matches: Iterable[DNIMatch], mode: str = "strict"
+    ) -> Union[list, ExtractionReport]:
+        """
+        Generate DNI instances from matches, such as those of ``finditer``,
+        following an extraction mode. Matches are classified as they come, so
+        in "strict" mode the ones after the first invalid match are never
+        read.
+
+        :param dni_matches: the matches.
+        :param mode: what to do with candidates with an invalid check letter,
+         as in ``extract``.
+        :return: a list with the DNIs as instances of the DNI class, or an
+         ``ExtractionReport`` in "report" mode.
+        """
+        if mode not in EXTRACTION_MODES:
+            raise ValueError(
+                f"Mode must be one of {', '.join(EXTRACTION_MODES)}, not {mode}"
+            )
+
+        # The DNI class is built on top of this module.
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from . import DNI
+
+        dnis = []
+        invalid_matches = []
+        for dni_match in dni_matches:
+            valid_check_letter = self._compute_check_letter(dni_match.number)
+            if mode == "fix" or (
+                dni_match.check_letter.upper() == valid_check_letter
+            ):
+                dnis.append(
+                    DNI.from_validated(dni_match.number + valid_check_letter)
+                )
+            elif mode == "report":
+                invalid_matches.append(dni_match)
+            elif mode == "strict":
+                raise InvalidCheckLetterException(
+                    DNIExceptionDetails(
+                        string=dni_match.raw,
+                        number=dni_match.number,
+                        invalid_check_letter=dni_match.check_letter.upper(),
+                        valid_check_letter=valid_check_letter,
+                    )
+                )
+
+        if mode == "report":
+            return ExtractionReport(dnis=dnis, invalid_matches=invalid_matches)
+
+        return dnis
+
+    def validate(self, potential_dni_string: str) -> bool:
+        """
+        Check if a string contains a valid DNI.
+
+        :param potential_dni_string: the string that may contain a DNI.
+        :return: True if so, False otherwise.
+        """
+        try:
+            self.parse(potential_dni_string)
+        except (
+            NoNumberFoundException,
+            MissingCheckLetterException,
+            InvalidCheckLetterException,
+        ):
+            return False
+
+        return True
+
+    def parse(self, potential_dni_string: str) -> Tuple[str, str]:
+        """
+        Parse a string to see if it contains a DNI. If not, raise an exception
+        specifying why the string is not a valid DNI.
+
+        :param potential_dni_string: the string that may contain a DNI.
+        :return: the number and the uppercase check letter of the DNI.
+        """
+        try:
+            return self._parse_strictly(potential_dni_string)
+        except MultipleMatchesException:
+            raise NoNumberFoundException(
+                DNIExceptionDetails(string=potential_dni_string)
+            ) from None
+
+    def diagnose(self, potential_dni_string: str) -> Union[DNIException, None]:
+        """
+        Find out why a string is not a valid DNI, if it is not. Unlike
+        ``parse``, strings with several DNI numbers are told apart from
+        strings without any.
+
+        :param potential_dni_string: the string that may contain a DNI.
+        :return: the exception that describes the issue, or None if the
+         string is a valid DNI.
+        """
+        try:
+            self._parse_strictly(potential_dni_string)
+        except DNIException as exception:
+            return exception
+
+        return None
+
+    def _parse_strictly(self, potential_dni_string: str) -> Tuple[str, str]:
+        """
+        Parse a string to see if it contains a DNI, raising a
+        ``MultipleMatchesException`` if it contains several DNI numbers.
+
+        :param potential_dni_string: the string that may contain a DNI.
+        :return: the number and the uppercase check letter of the DNI.
+        """
+        number = self.extract_exactly_one_number(potential_dni_string)
+
+        full_dni_match = self._search_full_dni(potential_dni_string)
+        if full_dni_match is None:
+            raise MissingCheckLetterException(
+                DNIExceptionDetails(string=potential_dni_string, number=number)
+            )
+
+        found_check_letter = self._to_ascii(full_dni_match.group(2)).upper()
+        valid_check_letter = self._compute_check_letter(number)
+        if found_check_letter != valid_check_letter:
+            raise InvalidCheckLetterException(
+                DNIExceptionDetails(
+                    string=potential_dni_string,
+                    number=number,
+                    invalid_check_letter=found_check_letter,
+                    valid_check_letter=valid_check_letter,
+                )
+            )
+
+        return number, found_check_letter
+
+    def _search_full_dni(self, a_string: str) -> Union[Match, None]:
+        """
+        Find the first number followed by a check letter in a string.
+
+        :param a_string: the string.
+        :return: the regex match, or None if there is none.
+        """
+        return self._full_dni_pattern.search(a_string)
+
+    @staticmethod
+    def _compute_check_letter(number: str) -> str:
+        """
+        Get the valid check letter of a DNI number.
+
+        :param number: the number, in ASCII digits.
+        :return: the uppercase check letter.
+        """
+        return UPPERCASE_CHECK_LETTERS[int(number) % 23]
+
+    def extract_exactly_one_number(self, a_string: str) -> str:
+        """
+        Extract the only DNI number in a string. Raises an exception if the
+        string does not contain such a number or contains more than one.
+
+        :param a_string: the string that contains the number.
+        :return: the number in string form.
+        """
+        results = self.extract_numbers(a_string)
+        if len(results) > 1:
+            raise MultipleMatchesException(
+                DNIExceptionDetails(string=a_string)
+            )
+
+        return results.pop()
+
+    def extract_numbers(self, a_string: str) -> List[str]:
+        """
+        Extract all occurences of 8 digit numbers in a string. Raises an
+        exception if the string does not contain any.
+
+        :param a_string: the string that contains some numbers.
+        :return: a list with the found numbers.
+        """
+        results = self._number_pattern.findall(a_string)
+        if not results:
+            raise NoNumberFoundException(DNIExceptionDetails(string=a_string))
+
+        return [self._to_ascii(a_number) for a_number in results]
+
+    def remove_clutter(self, a_string: str) -> str:
+        """
+        Removes all characters that are not part of the valid characters for
+        a DNI from a string.
+
+        :param a_string: the string to remove the characters from.
+        :return: the same string, without any character that is not a valid
+         DNI character, and with ASCII digits and check letters only.
+        """
+        return self._to_ascii(self._not_a_dni_char_pattern.sub("", a_string))
+
+    def _to_ascii(self, a_string: str) -> str:
+        """
+        Replace the full-width characters of a string with their ASCII
+        equivalents, if the scanner recognizes them.
+
+        :param a_string: the string.
+        :return: the string, with ASCII digits and check letters only.
+        """
+        if not self._unicode_tolerant:
+            return a_string
+
+        return a_string.translate(_FULL_WIDTH_TO_ASCII)
+
+    def _finditer_in_text(
+        self, text: str, number_filter: Callable[[str], bool] = None
+    ) -> Iterator[DNIMatch]:
+        """
+        Lazily find DNI-valid substrings in a text held in memory.
+
+        :param text: the text.
+        :param number_filter: a function that tells which numbers to report,
+         or None to report all of them.
+        :return: an iterator over the matches.
+        """
+        for a_match in self._full_dni_pattern.finditer(text):
+            number, check_letter = a_match.groups()
+            if number_filter is not None and not number_filter(number):
+                continue
+            yield DNIMatch(
+                start=a_match.start(),
+                end=a_match.end(),
+                number=self._to_ascii(number),
+                check_letter=self._to_ascii(check_letter),
+                raw=a_match.group(),
+            )
+
+    def finditer_chunks(
+        self,
+        chunks: Iterable[str],
+        number_filter: Callable[[str], bool] = None,
+    ) -> Iterator[DNIMatch]:
+        """
+        Find DNI-valid substrings in a text that comes in chunks, including
+        the ones split across chunks. Only a small overlap is kept between
+        chunks.
+
+        :param chunks: the consecutive pieces of the text.
+        :param number_filter: a function that tells which numbers to report,
+         as in ``finditer``.
+        :return: an iterator over the matches, with offsets relative to the
+         start of the whole text.
+        """
+        # Longest possible DNI match, plus a character of context before it.
+        overlap_chars = 8 + self._max_separator_chars + 1 + 1
+        buffer = ""
+        buffer_start = 0
+        reported_up_to = 0  # Matches ending before this were already yielded.
+
+        for chunk in chunks:
+            buffer += chunk
+            settled_chars = self.count_settled_chars(buffer)
+            for dni_match in self._finditer_in_text(buffer, number_filter):
+                is_settled = dni_match.end <= settled_chars
+                if (
+                    is_settled
+                    and dni_match.end + buffer_start > reported_up_to
+                ):
+                    yield _shift_dni_match(dni_match, buffer_start)
+
+            reported_up_to = max(reported_up_to, buffer_start + settled_chars)
+            overlap_start = max(
+                0, reported_up_to - buffer_start - overlap_chars
+            )
+            buffer = buffer[overlap_start:]
+            buffer_start += overlap_start
+
+        for dni_match in self._finditer_in_text(buffer, number_filter):
+            if dni_match.end + buffer_start > reported_up_to:
+                yield _shift_dni_match(dni_match, buffer_start)
+
+    def count_settled_chars(self, text: str) -> int:
+        """
+        Count how many characters at the start of a text can not change their
+        matches if more text is appended. A match is settled when there is
+        room after its number for the longest separator, the check letter and
+        the character that follows it, or a line break in between, since
+        separators never span lines.
+
+        :param text: the text read so far.
+        :return: the number of settled characters.
+        """
+        settled_chars = max(0, len(text) - (self._max_separator_chars + 1))
+        last_line_break = text.rfind("\n", settled_chars)
+
+        return max(settled_chars, last_line_break + 1)
+
+
+def _iter_text_chunks(
+    stream: TextIO, chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Read a text stream chunk by chunk.
+
+    :param stream: any object with a ``read`` method that returns strings.
+    :param chunk_size: the number of characters to read at once.
+    :return: an iterator over the chunks.
+    """
+    return iter(partial(stream.read, chunk_size), "")
+
+
+def _shift_dni_match(dni_match: DNIMatch, offset: int) -> DNIMatch:
+    """
+    Move the positions of a match by some offset.
+
+    :param dni_match: the match.
+    :param offset: the number of characters to move it.
+    :return: the moved match.
+    """
+    return dni_match._replace(
+        start=dni_match.start + offset, end=dni_match.end + offset
+    )
@@ -0,0 +1,494 @@
+"""
+A small HTTP/JSON service to validate, fix and extract DNIs, meant to run as a
+local sidecar for services not written in Python. Run it with::
+
+    python -m dni serve --port 8080
+
+Every endpoint takes a POST request with a JSON object holding either a single
+``value`` or a list of ``values``, and answers with a ``result`` or a list of
+``results``, respectively:
+
+- ``/validate``: whether each value is a valid DNI.
+- ``/fix``: each value with the right check letter, or null if it does not
+  contain a DNI number.
+- ``/extract``: the DNIs with a valid check letter found in each text.
+
+Concurrent requests to the same endpoint are coalesced into micro-batches,
+which are processed on a worker pool. A batch is processed as soon as it is
+full, or once its first value has waited for the maximum batch latency.
+Connections are kept alive between requests.
+
+Only the standard library is used, so the HTTP support is minimal: no chunked
+request bodies and no TLS. Put a reverse proxy in front of the service if
+those are needed.
+"""
+
+import asyncio
+import json
+from concurrent.futures import Executor
+from http import HTTPStatus
+from typing import Any, Dict, List, Set, Tuple, Union
+
+from . import is_valid, add_or_fix_check_letter, _iter_valid_dni_strings
+from .exceptions import NoNumberFoundException
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BATCH_SIZE = 512
+DEFAULT_MAX_BATCH_LATENCY = 0.002  # In seconds.
+MAX_REQUEST_BODY_BYTES = 8 * 1024 * 1024
+
+
+class HTTPErrorException(Exception):
+    """
+    Raised when an HTTP request can not be served, either because of the
+    request itself, with a 4xx status, or because of the service, with a 5xx
+    status.
+
+    :param status: the HTTP status to answer with.
+    :param message: a description of the problem.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _fix_or_none(a_string: str) -> Union[str, None]:
+    """
+    Add or fix the check letter of a DNI, if the string has a DNI number.
+
+    :param a_string: the string with a DNI or a DNI number.
+    :return: the fixed DNI, or None if there is no DNI number.
+    """
+    try:
+        return add_or_fix_check_letter(a_string)
+    except NoNumberFoundException:
+        return None
+
+
+def _extract_valid_dni_strings(text: str) -> List[str]:
+    """
+    Find the DNIs with a valid check letter in a text.
+
+    :param text: the text.
+    :return: the DNIs, formatted like ``DNI.format()``.
+    """
+    return list(_iter_valid_dni_strings(text))
+
+
+OPERATIONS_BY_PATH = {
+    "/validate": is_valid,
+    "/fix": _fix_or_none,
+    "/extract": _extract_valid_dni_strings,
+}
+
+
+def process_batch(path: str, values: List[str]) -> list:
+    """
+    Run the operation of an endpoint over a batch of values. This is what the
+    worker pool runs, so it only takes and returns picklable objects.
+
+    :param path: the path of the endpoint.
+    :param values: the values sent to the endpoint.
+    :return: the results, in the same order as the values.
+    """
+    operation = OPERATIONS_BY_PATH[path]
+
+    return [operation(value) for value in values]
+
+
+class MicroBatcher:
+    """
+    Coalesce the values submitted to an endpoint into batches.
+
+    :param path: the path of the endpoint.
+    :param max_batch_size: how many values a batch holds at most.
+    :param max_batch_latency: how many seconds a value waits at most for its
+     batch to fill up.
+    :param executor: the pool that processes the batches. If None, they are
+     processed in the event loop.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch_size: int,
+        max_batch_latency: float,
+        executor: Executor = None,
+    ):
+        self.path = path
+        self.max_batch_size = max_batch_size
+        self.max_batch_latency = max_batch_latency
+        self.executor = executor
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_timer = None
+        # The event loop only keeps weak references to tasks, so running
+        # batches are kept here until they are done.
+        self._running_tasks: Set[asyncio.Task] = set()
+
+    def submit(self, value: str) -> asyncio.Future:
+        """
+        Add a value to the next batch.
+
+        :param value: the value.
+        :return: a future with the result for the value.
+        """
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        self._pending.append((value, result))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif len(self._pending) == 1:
+            self._flush_timer = loop.call_later(
+                self.max_batch_latency, self._flush
+            )
+
+        return result
+
+    def _flush(self) -> None:
+        """
+        Send the pending values to be processed as a batch.
+
+        :return: None
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._process(batch))
+            self._running_tasks.add(task)
+            task.add_done_callback(self._running_tasks.discard)
+
+    async def _process(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """
+        Process a batch and hand each result over to its future.
+
+        :param batch: the values and their futures.
+        :return: None
+        """
+        values = [value for value, _ in batch]
+        try:
+            if self.executor is None:
+                results = process_batch(self.path, values)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, process_batch, self.path, values
+                )
+        except Exception as exception:  # pylint: disable=broad-except
+            for _, result in batch:
+                if not result.done():
+                    result.set_exception(exception)
+            return
+
+        for (_, result), value_result in zip(batch, results):
+            if not result.done():
+                result.set_result(value_result)
+
+
+class DNIService:
+    """
+    The HTTP/JSON service.
+
+    :param max_batch_size: how many values a batch holds at most.
+    :param max_batch_latency: how many seconds a value waits at most for its
+     batch to fill up.
+    :param executor: the pool that processes the batches, such as a
+     ``concurrent.futures.ProcessPoolExecutor``. If None, batches are
+     processed in the event loop.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_batch_latency: float = DEFAULT_MAX_BATCH_LATENCY,
+        executor: Executor = None,
+    ):
+        if max_batch_size <= 0:
+            raise ValueError(
+                f"The maximum batch size must be positive, not {max_batch_size}"
+            )
+        if max_batch_latency < 0:
+            raise ValueError(
+                "The maximum batch latency can not be negative, but it is:"
+                f" {max_batch_latency}"
+            )
+
+        self._batchers = {
+            path: MicroBatcher(
+                path, max_batch_size, max_batch_latency, executor
+            )
+            for path in OPERATIONS_BY_PATH
+        }
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> asyncio.AbstractServer:
+        """
+        Start listening for connections.
+
+        :param host: the interface to listen on.
+        :param port: the port to listen on. 0 picks any free port.
+        :return: the listening server.
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Serve the requests sent through a connection until it is closed.
+
+        :param reader: the stream to read requests from.
+        :param writer: the stream to write responses to.
+        :return: None
+        """
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await _read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPErrorException as exception:
+                    writer.write(_render_error(exception, keep_alive=False))
+                    break
+
+                method, path, headers, body = request
+                keep_alive = _wants_keep_alive(headers)
+                try:
+                    payload = await self._respond(method, path, body)
+                except HTTPErrorException as exception:
+                    writer.write(_render_error(exception, keep_alive))
+                else:
+                    writer.write(
+                        _render_response(HTTPStatus.OK, payload, keep_alive)
+                    )
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, method: str, path: str, body: bytes
+    ) -> Dict[str, Any]:
+        """
+        Compute the response to a request.
+
+        :param method: the HTTP method.
+        :param path: the requested path.
+        :param body: the request body.
+        :return: the JSON payload of the response.
+        """
+        batcher = self._batchers.get(path)
+        if batcher is None:
+            raise HTTPErrorException(
+                HTTPStatus.NOT_FOUND, f"Unknown path: {path}"
+            )
+        if method != "POST":
+            raise HTTPErrorException(
+                HTTPStatus.METHOD_NOT_ALLOWED, "Only POST is allowed"
+            )
+
+        try:
+            request_payload = json.loads(body)
+        except ValueError:
+            raise HTTPErrorException(
+                HTTPStatus.BAD_REQUEST, "The body is not valid JSON"
+            ) from None
+
+        if isinstance(request_payload, dict) and _is_text(
+            request_payload.get("value")
+        ):
+            (result,) = await _gather_results(
+                batcher, [request_payload["value"]]
+            )
+            return {"result": result}
+
+        if isinstance(request_payload, dict) and _is_list_of_texts(
+            request_payload.get("values")
+        ):
+            return {
+                "results": await _gather_results(
+                    batcher, request_payload["values"]
+                )
+            }
+
+        raise HTTPErrorException(
+            HTTPStatus.BAD_REQUEST,
+            'The body must be a JSON object with a "value" string or a'
+            ' "values" list of strings',
+        )
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    max_batch_latency: float = DEFAULT_MAX_BATCH_LATENCY,
+    executor: Executor = None,
+) -> None:
+    """
+    Run the service until interrupted.
+
+    :param host: the interface to listen on.
+    :param port: the port to listen on.
+    :param max_batch_size: how many values a batch holds at most.
+    :param max_batch_latency: how many seconds a value waits at most for its
+     batch to fill up.
+    :param executor: the pool that processes the batches. If None, they are
+     processed in the event loop.
+    :return: None
+    """
+
+    async def run():
+        service = DNIService(max_batch_size, max_batch_latency, executor)
+        server = await service.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Tuple[str, str, Dict[str, str], bytes]:
+    """
+    Read an HTTP request from a stream.
+
+    :param reader: the stream.
+    :return: the method, the path, the headers with lowercase names, and the
+     body of the request.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HTTPErrorException(
+            HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+            "The request headers are too large",
+        ) from None
+
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")[:-2]
+    try:
+        method, path, version = request_line.split(" ")
+    except ValueError:
+        raise HTTPErrorException(
+            HTTPStatus.BAD_REQUEST, "Malformed request line"
+        ) from None
+
+    headers = {"http-version": version}
+    for header_line in header_lines:
+        name, _, value = header_line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPErrorException(
+            HTTPStatus.NOT_IMPLEMENTED, "Chunked bodies are not supported"
+        )
+    try:
+        content_length = int(headers.get("content-length", "0"))
+    except ValueError:
+        content_length = -1
+    if not 0 <= content_length <= MAX_REQUEST_BODY_BYTES:
+        raise HTTPErrorException(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            f"Bodies must be between 0 and {MAX_REQUEST_BODY_BYTES} bytes",
+        )
+
+    body = await reader.readexactly(content_length)
+
+    return method, path.split("?")[0], headers, body
+
+
+async def _gather_results(batcher: MicroBatcher, values: List[str]) -> list:
+    """
+    Submit values to a batcher and wait for their results.
+
+    :param batcher: the batcher of the endpoint.
+    :param values: the values.
+    :return: the results, in the same order as the values.
+    """
+    try:
+        results = await asyncio.gather(
+            *(batcher.submit(value) for value in values)
+        )
+    except Exception:  # pylint: disable=broad-except
+        # The whole batch failed, such as when the worker pool is broken.
+        raise HTTPErrorException(
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+            "The values could not be processed",
+        ) from None
+
+    return list(results)
+
+
+def _wants_keep_alive(headers: Dict[str, str]) -> bool:
+    """
+    Check if the client wants to keep the connection open after a request.
+
+    :param headers: the request headers.
+    :return: True if so, False otherwise.
+    """
+    connection = headers.get("connection", "").lower()
+    if headers["http-version"] == "HTTP/1.0":
+        return connection == "keep-alive"
+
+    return connection != "close"
+
+
+def _render_response(
+    status: HTTPStatus, payload: Dict[str, Any], keep_alive: bool
+) -> bytes:
+    """
+    Build an HTTP response with a JSON body.
+
+    :param status: the HTTP status.
+    :param payload: the JSON payload.
+    :param keep_alive: whether the connection stays open afterwards.
+    :return: the response, ready to be sent.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+
+    return head.encode("latin-1") + body
+
+
+def _render_error(exception: HTTPErrorException, keep_alive: bool) -> bytes:
+    """
+    Build an HTTP response for a request that could not be served.
+
+    :param exception: the reason.
+    :param keep_alive: whether the connection stays open afterwards.
+    :return: the response, ready to be sent.
+    """
+    return _render_response(
+        exception.status, {"error": str(exception)}, keep_alive
+    )
+
+
+def _is_text(value: Any) -> bool:
+    """
+    Check if a JSON value is a string.
+
+    :param value: the value.
+    :return: True if so, False otherwise.
+    """
+    return isinstance(value, str)
+
+
+def _is_list_of_texts(value: Any) -> bool:
+    """
+    Check if a JSON value is a list of strings.
+
+    :param value: the value.
+    :return: True if so, False otherwise.
+    """
+    return isinstance(value, list) and all(map(_is_text, value))
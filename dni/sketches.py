@@ -0,0 +1,542 @@
+"""
+Probabilistic summaries of large amounts of DNIs, small enough to be kept for
+many partitions and shipped between processes or machines.
+"""
+
+import heapq
+import math
+import struct
+from typing import Dict, Iterable, List, TextIO, Tuple, Union
+
+from . import DNI, _iter_valid_dni_strings
+from ._optional import import_optional
+from .ranges import DNI_RECORD_SIZE
+
+DEFAULT_RELATIVE_ERROR = 0.02
+DEFAULT_HEAVY_HITTERS_CAPACITY = 1000
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+_SERIALIZATION_MAGIC = b"DHLL"
+_SERIALIZATION_VERSION = 1
+_SERIALIZATION_HEADER = struct.Struct("<4sBB")
+
+
+class DNICardinalitySketch:
+    """
+    Estimate how many distinct DNIs there are in a stream, using a
+    HyperLogLog sketch. Memory use and serialized size are fixed by the
+    error, not by the input: 4 KB for the default error of 2%.
+
+    DNIs are identified by their number, so the same DNI counts once no
+    matter how it is written. Sketches built with the same error can be
+    merged, which gives the sketch of the union of their inputs.
+
+    :param relative_error: the target standard error of the estimates, as a
+     fraction of the real count. Smaller errors need larger sketches.
+    """
+
+    def __init__(self, relative_error: float = DEFAULT_RELATIVE_ERROR):
+        if not 0 < relative_error < 1:
+            raise ValueError(
+                "The relative error must be between 0 and 1, but it is:"
+                f" {relative_error}"
+            )
+
+        precision = math.ceil(2 * math.log2(1.04 / relative_error))
+        self._precision = min(max(precision, MIN_PRECISION), MAX_PRECISION)
+        self._registers = bytearray(1 << self._precision)
+
+    @property
+    def precision(self) -> int:
+        """
+        Get the number of hash bits used to pick a register.
+
+        :return: the precision. The sketch has 2 ** precision registers.
+        """
+        return self._precision
+
+    @property
+    def relative_error(self) -> float:
+        """
+        Get the standard error of the estimates of the sketch, which may be
+        smaller than the requested one.
+
+        :return: the error, as a fraction of the real count.
+        """
+        return 1.04 / math.sqrt(len(self._registers))
+
+    def add(self, a_dni: Union[DNI, str, int]) -> None:
+        """
+        Add a DNI to the sketch.
+
+        :param a_dni: a DNI instance, a DNI string formatted like
+         ``DNI.format()`` or the integer value of a DNI number.
+        :return: None
+        """
+        register_index, rank = self._locate(_hash_number(_as_number(a_dni)))
+        if rank > self._registers[register_index]:
+            self._registers[register_index] = rank
+
+    def update(self, dnis: Iterable[Union[DNI, str, int]]) -> None:
+        """
+        Add many DNIs to the sketch, such as the ones returned by
+        ``extract_dnis_from_text`` or ``iter_range``.
+
+        :param dnis: the DNIs, in any of the forms accepted by ``add``.
+        :return: None
+        """
+        for a_dni in dnis:
+            self.add(a_dni)
+
+    def update_from_text(self, text_or_stream: Union[str, TextIO]) -> None:
+        """
+        Add the DNIs with a valid check letter found in a text to the sketch,
+        without building DNI instances for them.
+
+        :param text_or_stream: a text that may contain some or no DNI-valid
+         substrings, or a text stream.
+        :return: None
+        """
+        self.update(_iter_valid_dni_strings(text_or_stream))
+
+    def update_packed(self, packed_dnis) -> None:
+        """
+        Add many DNIs from a packed array to the sketch, with vectorized
+        operations. Requires NumPy.
+
+        :param packed_dnis: a NumPy integer array of DNI numbers, or a buffer
+         of 9 byte DNI records, such as the ones filled by ``fill_range``.
+        :return: None
+        """
+        numpy = import_optional("numpy")
+        if numpy is None:  # pragma: no cover
+            raise ImportError(
+                "Updating sketches from packed arrays requires numpy."
+                " Install it with: pip install numpy"
+            )
+
+        hashes = _hash_numbers(_unpack_numbers(packed_dnis))
+        value_bits = _HASH_BITS - self._precision
+        register_indexes = (hashes >> numpy.uint64(value_bits)).astype(
+            numpy.intp
+        )
+        values = hashes & numpy.uint64((1 << value_bits) - 1)
+        ranks = (value_bits - _bit_lengths(values) + 1).astype(numpy.uint8)
+
+        registers = numpy.frombuffer(self._registers, dtype=numpy.uint8)
+        numpy.maximum.at(registers, register_indexes, ranks)
+
+    def merge(self, other: "DNICardinalitySketch") -> None:
+        """
+        Add everything added to another sketch to this one.
+
+        :param other: a sketch with the same precision.
+        :return: None
+        """
+        if other.precision != self._precision:
+            raise ValueError(
+                "Only sketches with the same precision can be merged, but"
+                f" they have {self._precision} and {other.precision}"
+            )
+
+        other_registers = other._registers  # pylint: disable=protected-access
+        self._registers = bytearray(map(max, self._registers, other_registers))
+
+    def estimate(self) -> int:
+        """
+        Estimate how many distinct DNIs were added to the sketch.
+
+        :return: the estimated count.
+        """
+        register_count = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / register_count)
+        raw_estimate = (
+            alpha
+            * register_count**2
+            / sum(2.0**-register for register in self._registers)
+        )
+
+        empty_registers = self._registers.count(0)
+        if raw_estimate <= 2.5 * register_count and empty_registers:
+            # Linear counting is more accurate for small counts.
+            return round(
+                register_count * math.log(register_count / empty_registers)
+            )
+
+        return round(raw_estimate)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the sketch.
+
+        :return: the serialized sketch.
+        """
+        return (
+            _SERIALIZATION_HEADER.pack(
+                _SERIALIZATION_MAGIC, _SERIALIZATION_VERSION, self._precision
+            )
+            + self._registers
+        )
+
+    @classmethod
+    def from_bytes(cls, serialized_sketch: bytes) -> "DNICardinalitySketch":
+        """
+        Rebuild a sketch serialized with ``to_bytes``.
+
+        :param serialized_sketch: the serialized sketch.
+        :return: the sketch.
+        """
+        magic, version, precision = _SERIALIZATION_HEADER.unpack_from(
+            serialized_sketch
+        )
+        registers = serialized_sketch[_SERIALIZATION_HEADER.size :]
+        if (
+            magic != _SERIALIZATION_MAGIC
+            or version != _SERIALIZATION_VERSION
+            or not MIN_PRECISION <= precision <= MAX_PRECISION
+            or len(registers) != 1 << precision
+        ):
+            raise ValueError("The bytes are not a serialized DNI sketch")
+
+        sketch = cls()
+        sketch._precision = precision
+        sketch._registers = bytearray(registers)
+
+        return sketch
+
+    def _locate(self, hashed_number: int) -> Tuple[int, int]:
+        """
+        Find the register a hash goes to, and the value it proposes for it.
+
+        :param hashed_number: the 64 bit hash of a DNI number.
+        :return: the index of the register and the proposed value, the
+         position of the first 1 bit after the index bits.
+        """
+        value_bits = _HASH_BITS - self._precision
+        register_index = hashed_number >> value_bits
+        value = hashed_number & ((1 << value_bits) - 1)
+
+        return register_index, value_bits - value.bit_length() + 1
+
+
+class DNIHeavyHitters:
+    """
+    Track the most frequent DNIs in a stream, such as the ones that show up
+    abnormally often in access logs, using the Space-Saving algorithm. Only
+    ``capacity`` DNIs are counted at once, so memory use is fixed.
+
+    Counts are never underestimated, and they are overestimated by at most
+    the total count divided by the capacity. Any DNI more frequent than that
+    is guaranteed to be tracked. Trackers can be merged, which gives the
+    tracker of the union of their inputs, with the same guarantees.
+
+    :param capacity: how many DNIs are counted at once. Larger capacities
+     give more accurate counts.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_HEAVY_HITTERS_CAPACITY):
+        if capacity <= 0:
+            raise ValueError(
+                f"The capacity must be a positive number, not {capacity}"
+            )
+
+        self._capacity = capacity
+        self._total = 0
+        self._counts: Dict[str, int] = {}
+        self._overestimates: Dict[str, int] = {}
+        # Min-heap of (count, DNI) pairs. Pairs go stale when a count grows,
+        # and are skipped when found at the top.
+        self._heap: List[Tuple[int, str]] = []
+
+    @property
+    def capacity(self) -> int:
+        """
+        Get how many DNIs are counted at once.
+
+        :return: the capacity.
+        """
+        return self._capacity
+
+    @property
+    def total(self) -> int:
+        """
+        Get how many DNIs have been added, repetitions included.
+
+        :return: the total count.
+        """
+        return self._total
+
+    def add(self, a_dni: Union[DNI, str], count: int = 1) -> None:
+        """
+        Add one or more occurrences of a DNI to the tracker.
+
+        :param a_dni: a DNI instance, or a DNI string formatted like
+         ``DNI.format()``.
+        :param count: the number of occurrences.
+        :return: None
+        """
+        dni_string = a_dni.format() if isinstance(a_dni, DNI) else a_dni
+        self._total += count
+
+        if dni_string in self._counts:
+            self._counts[dni_string] += count
+        elif len(self._counts) < self._capacity:
+            self._counts[dni_string] = count
+            self._overestimates[dni_string] = 0
+        else:
+            evicted_count = self._evict_least_frequent()
+            self._counts[dni_string] = evicted_count + count
+            self._overestimates[dni_string] = evicted_count
+
+        heapq.heappush(self._heap, (self._counts[dni_string], dni_string))
+        if len(self._heap) > 4 * self._capacity:
+            self._rebuild_heap()
+
+    def update(self, dnis: Iterable[Union[DNI, str]]) -> None:
+        """
+        Add many DNIs to the tracker, such as the ones returned by
+        ``extract_dnis_from_text``.
+
+        :param dnis: the DNIs, in any of the forms accepted by ``add``.
+        :return: None
+        """
+        for a_dni in dnis:
+            self.add(a_dni)
+
+    def update_from_text(self, text_or_stream: Union[str, TextIO]) -> None:
+        """
+        Add the DNIs with a valid check letter found in a text to the tracker,
+        without building DNI instances for them.
+
+        :param text_or_stream: a text that may contain some or no DNI-valid
+         substrings, or a text stream.
+        :return: None
+        """
+        self.update(_iter_valid_dni_strings(text_or_stream))
+
+    def top(self, quantity: int = None) -> List[Tuple[str, int]]:
+        """
+        Get the most frequent DNIs.
+
+        :param quantity: how many DNIs to return. If None, all the tracked
+         ones.
+        :return: a list of (DNI string, count) pairs, most common first, like
+         the one returned by ``dni_frequencies``.
+        """
+        if quantity is not None and quantity <= 0:
+            raise ValueError(
+                f"You can only request the top 1 or more DNIs, not {quantity}"
+            )
+
+        return heapq.nlargest(
+            quantity or len(self._counts),
+            self._counts.items(),
+            key=lambda dni_and_count: dni_and_count[1],
+        )
+
+    def count_bounds(self, a_dni: Union[DNI, str]) -> Tuple[int, int]:
+        """
+        Get the range the real count of a DNI is in.
+
+        :param a_dni: a DNI instance, or a DNI string formatted like
+         ``DNI.format()``.
+        :return: the lowest and highest possible counts.
+        """
+        dni_string = a_dni.format() if isinstance(a_dni, DNI) else a_dni
+        if dni_string in self._counts:
+            count = self._counts[dni_string]
+            return count - self._overestimates[dni_string], count
+
+        return 0, self._min_count()
+
+    def merge(self, other: "DNIHeavyHitters") -> None:
+        """
+        Add everything added to another tracker to this one.
+
+        :param other: a tracker with the same capacity.
+        :return: None
+        """
+        if other.capacity != self._capacity:
+            raise ValueError(
+                "Only trackers with the same capacity can be merged, but they"
+                f" have {self._capacity} and {other.capacity}"
+            )
+
+        # A DNI missing from a tracker may still have appeared in its input,
+        # up to the smallest count of that tracker.
+        # pylint: disable=protected-access
+        own_min_count = self._min_count()
+        other_min_count = other._min_count()
+        other_counts = other.tracked()
+        merged_counts = {}
+        merged_overestimates = {}
+        for dni_string in set(self._counts) | set(other_counts):
+            own_lowest, own_highest = (
+                self.count_bounds(dni_string)
+                if dni_string in self._counts
+                else (0, own_min_count)
+            )
+            other_lowest, other_highest = (
+                other.count_bounds(dni_string)
+                if dni_string in other_counts
+                else (0, other_min_count)
+            )
+            merged_counts[dni_string] = own_highest + other_highest
+            merged_overestimates[dni_string] = merged_counts[dni_string] - (
+                own_lowest + other_lowest
+            )
+
+        kept_dni_strings = heapq.nlargest(
+            self._capacity, merged_counts, key=merged_counts.get
+        )
+        self._total += other.total
+        self._counts = {
+            dni_string: merged_counts[dni_string]
+            for dni_string in kept_dni_strings
+        }
+        self._overestimates = {
+            dni_string: merged_overestimates[dni_string]
+            for dni_string in kept_dni_strings
+        }
+        self._rebuild_heap()
+
+    def tracked(self) -> Dict[str, int]:
+        """
+        Get the DNIs counted at the moment.
+
+        :return: a dictionary with the count of every tracked DNI string.
+        """
+        return dict(self._counts)
+
+    def _min_count(self) -> int:
+        """
+        Get the highest count a DNI that is not tracked may have.
+
+        :return: the smallest tracked count if the tracker is full, 0
+         otherwise.
+        """
+        if len(self._counts) < self._capacity:
+            return 0
+
+        return min(self._counts.values())
+
+    def _evict_least_frequent(self) -> int:
+        """
+        Stop tracking the DNI with the smallest count.
+
+        :return: the count of the evicted DNI.
+        """
+        while True:
+            count, dni_string = heapq.heappop(self._heap)
+            if self._counts.get(dni_string) == count:
+                del self._counts[dni_string]
+                del self._overestimates[dni_string]
+                return count
+
+    def _rebuild_heap(self) -> None:
+        """
+        Drop the stale pairs of the heap.
+
+        :return: None
+        """
+        self._heap = [
+            (count, dni_string) for dni_string, count in self._counts.items()
+        ]
+        heapq.heapify(self._heap)
+
+
+def _as_number(a_dni: Union[DNI, str, int]) -> int:
+    """
+    Get the integer value of the number of a DNI.
+
+    :param a_dni: a DNI instance, a DNI string formatted like ``DNI.format()``
+     or the integer value of a DNI number.
+    :return: the number.
+    """
+    if isinstance(a_dni, int):
+        return a_dni
+    if isinstance(a_dni, DNI):
+        return int(a_dni.number)
+
+    return int(a_dni[:8])
+
+
+def _unpack_numbers(packed_dnis) -> "numpy.ndarray":
+    """
+    Get the integer values of the numbers of packed DNIs. Requires NumPy.
+
+    :param packed_dnis: a NumPy integer array of DNI numbers, or a buffer of
+     9 byte DNI records, such as the ones filled by ``fill_range``.
+    :return: a flat array with the numbers, as 64 bit unsigned integers.
+    """
+    numpy = import_optional("numpy")
+    if isinstance(packed_dnis, numpy.ndarray) and (
+        packed_dnis.dtype.kind in "iu"
+    ):
+        return packed_dnis.astype(numpy.uint64).ravel()
+
+    records = numpy.frombuffer(
+        memoryview(packed_dnis).cast("B"), dtype=numpy.uint8
+    ).reshape(-1, DNI_RECORD_SIZE)
+    digits = records[:, :8].astype(numpy.uint64) - ord("0")
+
+    return digits @ (10 ** numpy.arange(7, -1, -1, dtype=numpy.uint64))
+
+
+def _hash_number(number: int) -> int:
+    """
+    Scramble a DNI number into a 64 bit hash with the SplitMix64 finalizer,
+    which, unlike ``hash``, gives the same result in every process.
+
+    :param number: the number.
+    :return: the hash.
+    """
+    hashed_number = (number + 0x9E3779B97F4A7C15) & _HASH_MASK
+    hashed_number = (
+        (hashed_number ^ (hashed_number >> 30)) * 0xBF58476D1CE4E5B9
+    ) & _HASH_MASK
+    hashed_number = (
+        (hashed_number ^ (hashed_number >> 27)) * 0x94D049BB133111EB
+    ) & _HASH_MASK
+
+    return hashed_number ^ (hashed_number >> 31)
+
+
+def _hash_numbers(numbers: "numpy.ndarray") -> "numpy.ndarray":
+    """
+    Vectorized version of ``_hash_number``.
+
+    :param numbers: a uint64 array of DNI numbers.
+    :return: a uint64 array with their hashes.
+    """
+    numpy = import_optional("numpy")
+    with numpy.errstate(over="ignore"):
+        hashes = numbers + numpy.uint64(0x9E3779B97F4A7C15)
+        hashes = (hashes ^ (hashes >> numpy.uint64(30))) * numpy.uint64(
+            0xBF58476D1CE4E5B9
+        )
+        hashes = (hashes ^ (hashes >> numpy.uint64(27))) * numpy.uint64(
+            0x94D049BB133111EB
+        )
+
+    return hashes ^ (hashes >> numpy.uint64(31))
+
+
+def _bit_lengths(values: "numpy.ndarray") -> "numpy.ndarray":
+    """
+    Vectorized version of ``int.bit_length``, exact for any 64 bit value.
+
+    :param values: a uint64 array.
+    :return: an integer array with the bit length of every value.
+    """
+    numpy = import_optional("numpy")
+    lengths = numpy.zeros(values.shape, dtype=numpy.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        is_longer = values >= numpy.uint64(1 << shift)
+        lengths += is_longer * shift
+        values = numpy.where(is_longer, values >> numpy.uint64(shift), values)
+
+    return lengths + (values > 0)
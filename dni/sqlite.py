@@ -0,0 +1,172 @@
+"""
+SQL functions to deal with DNIs inside SQLite databases, so rows do not have to
+be pulled into Python and written back. All functions are deterministic, so
+they can be used in indexes on expressions, generated columns and CHECK
+constraints. Requires Python 3.8 or later, and SQLite 3.8.3 or later.
+
+Once registered, the functions can be called like any other SQL function:
+
+.. code-block:: sql
+
+    SELECT dni_normalize(document) FROM customers WHERE dni_is_valid(document);
+
+``dni_extract`` returns a JSON array, which SQLite's ``json_each`` turns into
+rows:
+
+.. code-block:: sql
+
+    SELECT notes.id, found.value AS dni
+    FROM notes, json_each(dni_extract(notes.body)) AS found;
+"""
+
+import json
+import sqlite3
+from typing import Union
+
+from . import (
+    DNI,
+    is_valid,
+    compute_check_letter,
+    add_or_fix_check_letter,
+    _DEFAULT_SCANNER,
+    _iter_valid_dni_strings,
+)
+from .exceptions import (
+    MultipleMatchesException,
+    InvalidCheckLetterException,
+    MissingCheckLetterException,
+    NoNumberFoundException,
+)
+
+SQLValue = Union[str, int, float, bytes, None]
+
+
+def register(connection: sqlite3.Connection) -> None:
+    """
+    Register the DNI functions in a SQLite connection:
+
+    - ``dni_is_valid(value)``: 1 if the value contains a valid DNI, 0
+      otherwise.
+    - ``dni_check_letter(number)``: the check letter of a DNI number, given
+      as text or as an integer.
+    - ``dni_fix(value)``: the value with the right check letter, like
+      ``add_or_fix_check_letter``.
+    - ``dni_normalize(value)``: the DNI in the value, formatted like
+      ``DNI.format()``.
+    - ``dni_extract(text)``: a JSON array with the DNIs with a valid check
+      letter found in a text, formatted like ``DNI.format()``.
+
+    All of them return NULL for NULL values, and for values they can not make
+    sense of, instead of failing the whole statement.
+
+    :param connection: the connection to register the functions in.
+    :return: None
+    """
+    sql_functions = {
+        "dni_is_valid": _sql_is_valid,
+        "dni_check_letter": _sql_check_letter,
+        "dni_fix": _sql_fix,
+        "dni_normalize": _sql_normalize,
+        "dni_extract": _sql_extract,
+    }
+    for name, sql_function in sql_functions.items():
+        connection.create_function(name, 1, sql_function, deterministic=True)
+
+
+def _sql_is_valid(value: SQLValue) -> Union[int, None]:
+    """
+    SQL version of ``is_valid``.
+
+    :param value: the SQL value that may contain a DNI.
+    :return: 1 if so, 0 otherwise, or None for NULL values.
+    """
+    if value is None:
+        return None
+
+    return int(is_valid(_to_text(value)))
+
+
+def _sql_check_letter(value: SQLValue) -> Union[str, None]:
+    """
+    SQL version of ``compute_check_letter``.
+
+    :param value: the DNI number, as text or as an integer.
+    :return: the check letter, or None if the value is not a DNI number.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, int):
+        if not 0 <= value < 10**8:
+            return None
+        return compute_check_letter(value)
+
+    try:
+        number = _DEFAULT_SCANNER.extract_exactly_one_number(_to_text(value))
+    except (NoNumberFoundException, MultipleMatchesException):
+        return None
+
+    return compute_check_letter(number)
+
+
+def _sql_fix(value: SQLValue) -> Union[str, None]:
+    """
+    SQL version of ``add_or_fix_check_letter``.
+
+    :param value: the SQL value with a DNI or a DNI number.
+    :return: the DNI with the valid check letter, or None if the value does
+     not contain a DNI number.
+    """
+    if value is None:
+        return None
+
+    try:
+        return add_or_fix_check_letter(_to_text(value))
+    except NoNumberFoundException:
+        return None
+
+
+def _sql_normalize(value: SQLValue) -> Union[str, None]:
+    """
+    Format the DNI in a SQL value like ``DNI.format()``.
+
+    :param value: the SQL value that may contain a DNI.
+    :return: the formatted DNI, or None if the value is not a valid DNI.
+    """
+    if value is None:
+        return None
+
+    try:
+        return DNI(_to_text(value)).format()
+    except (
+        NoNumberFoundException,
+        MissingCheckLetterException,
+        InvalidCheckLetterException,
+    ):
+        return None
+
+
+def _sql_extract(value: SQLValue) -> Union[str, None]:
+    """
+    Find the DNIs with a valid check letter in a SQL value.
+
+    :param value: the SQL value with a text.
+    :return: a JSON array with the found DNIs, or None for NULL values.
+    """
+    if value is None:
+        return None
+
+    return json.dumps(list(_iter_valid_dni_strings(_to_text(value))))
+
+
+def _to_text(value: SQLValue) -> str:
+    """
+    Turn a non-NULL SQL value into text, the way SQLite casts it.
+
+    :param value: the SQL value.
+    :return: the value as text.
+    """
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+
+    return str(value)
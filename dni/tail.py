@@ -0,0 +1,231 @@
+"""
+Incremental scanning of growing files, such as application logs. Only the bytes
+appended since the last scan are read, and the scanned offsets are persisted in
+a small JSON state file so that scans can resume across processes.
+"""
+
+import json
+import os
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+from . import DNI, DNIMatch, DNIScanner, ExtractionReport, _DEFAULT_SCANNER
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+_DECODING_ERRORS = "surrogateescape"  # Keeps byte offsets exact.
+
+
+class DNIFileTailer:
+    """
+    Scan growing files for DNIs, reading only what was appended since the last
+    scan. DNIs are found with the same rules as ``dni.extract_dnis_from_text``.
+
+    Matches too close to the end of the file, which could still change when
+    more data is appended, are held back until they are settled. Each scan
+    re-reads a small overlap window before the last offset, so a DNI split
+    across two appends is still found, and found only once.
+
+    If a file is rotated or truncated, it is scanned again from the start.
+
+    :param state_file_path: the JSON file where offsets are persisted.
+    :param chunk_size: how many bytes are read from the file at once.
+    :param encoding: the encoding of the scanned files.
+    :param scanner: the scanner used to find DNIs. If None, the one used by
+     the module-level functions.
+    """
+
+    def __init__(
+        self,
+        state_file_path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        encoding: str = "utf-8",
+        scanner: DNIScanner = None,
+    ):
+        if chunk_size <= 0:
+            raise ValueError(
+                f"The chunk size must be a positive number, not {chunk_size}"
+            )
+
+        self.state_file_path = state_file_path
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.scanner = scanner or _DEFAULT_SCANNER
+        # A full DNI match spans at most 8 digits, the separator characters
+        # and the check letter, plus one character of context on each side.
+        # Each character, full-width digits included, takes up to 4 bytes.
+        self.overlap_bytes = 4 * (8 + self.scanner.max_separator_chars + 3)
+        self._state = self._load_state()
+
+    def scan(
+        self, file_path: str, mode: str = "valid_only"
+    ) -> Union[List[DNI], ExtractionReport]:
+        """
+        Find the DNIs appended to a file since its last scan, and persist the
+        new offset. The offset moves past every settled match, whatever its
+        check letter, so an invalid DNI is never scanned again.
+
+        :param file_path: the file to scan.
+        :param mode: what to do with candidates with an invalid check letter,
+         as in ``extract_dnis_from_text``. Unlike there, the default is
+         "valid_only": in "strict" mode, the exception is raised before the
+         new offset is persisted, so that no DNI found in the scan is lost,
+         but every later scan raises again until the file is scanned in
+         another mode.
+        :return: a list with the newly found DNIs as instances of the DNI
+         class, or an ``ExtractionReport`` in "report" mode, where the
+         ``start`` and ``end`` of invalid matches are byte offsets in the
+         file.
+        """
+        state_key = os.path.abspath(file_path)
+        dni_matches = []
+
+        with open(file_path, "rb") as a_file:
+            file_stats = os.fstat(a_file.fileno())
+            offset = self._get_resumable_offset(state_key, file_stats)
+            offset = self._scan_from_offset(a_file, offset, dni_matches)
+        result = self.scanner.classify(dni_matches, mode)
+
+        self._state[state_key] = {
+            "offset": offset,
+            "device": file_stats.st_dev,
+            "inode": file_stats.st_ino,
+        }
+        self._save_state()
+
+        return result
+
+    def offset(self, file_path: str) -> int:
+        """
+        Get the offset up to which a file has been scanned.
+
+        :param file_path: the scanned file.
+        :return: the offset in bytes, 0 if the file has never been scanned.
+        """
+        file_state = self._state.get(os.path.abspath(file_path), {})
+
+        return file_state.get("offset", 0)
+
+    def _get_resumable_offset(
+        self, state_key: str, file_stats: os.stat_result
+    ) -> int:
+        """
+        Get the offset to resume a scan from, or 0 if the file was rotated or
+        truncated since the last scan.
+
+        :param state_key: the key of the file in the state.
+        :param file_stats: the current stats of the file.
+        :return: the offset in bytes.
+        """
+        file_state = self._state.get(state_key)
+        if file_state is None:
+            return 0
+
+        is_same_file = (file_state["device"], file_state["inode"]) == (
+            file_stats.st_dev,
+            file_stats.st_ino,
+        )
+        was_truncated = file_stats.st_size < file_state["offset"]
+        if not is_same_file or was_truncated:
+            return 0
+
+        return file_state["offset"]
+
+    def _scan_from_offset(
+        self, a_file: BinaryIO, offset: int, dni_matches: List[DNIMatch]
+    ) -> int:
+        """
+        Read a file from a bit before an offset up to its end, chunk by chunk,
+        collecting the matches that are settled and were not reported before.
+
+        :param a_file: the file, opened in binary mode.
+        :param offset: the offset up to which the file was already scanned.
+        :param dni_matches: the list to append the found matches to. Their
+         ``start`` and ``end`` are byte offsets in the file.
+        :return: the offset up to which the file is now scanned.
+        """
+        window_start = max(0, offset - self.overlap_bytes)
+        a_file.seek(window_start)
+        window = b""
+
+        while True:
+            chunk = a_file.read(self.chunk_size)
+            if not chunk:
+                return offset
+            window += chunk
+
+            text = window.decode(self.encoding, _DECODING_ERRORS)
+            already_scanned_chars = len(
+                window[: offset - window_start].decode(
+                    self.encoding, _DECODING_ERRORS
+                )
+            )
+            settled_chars = self.scanner.count_settled_chars(text)
+
+            for dni_match, byte_match in self._iter_byte_matches(
+                text, window_start
+            ):
+                if already_scanned_chars < dni_match.end <= settled_chars:
+                    dni_matches.append(byte_match)
+
+            unsettled_bytes = self._count_bytes(text[settled_chars:])
+            offset = max(offset, window_start + len(window) - unsettled_bytes)
+            new_window_start = max(0, offset - self.overlap_bytes)
+            window = window[new_window_start - window_start :]
+            window_start = new_window_start
+
+    def _iter_byte_matches(
+        self, text: str, text_start: int
+    ) -> Iterator[Tuple[DNIMatch, DNIMatch]]:
+        """
+        Find the matches in a text read from a scanned file, along with a copy
+        with their ``start`` and ``end`` as byte offsets in the file. Bytes are counted
+        from one match to the next, so each character is encoded only once,
+        however many matches there are.
+
+        :param text: the text.
+        :param text_start: the byte offset of the text in the file.
+        :return: an iterator over the matches and their copies.
+        """
+        counted_chars = 0
+        counted_bytes = text_start
+        for dni_match in self.scanner.finditer(text):
+            start = counted_bytes + self._count_bytes(
+                text[counted_chars : dni_match.start]
+            )
+            end = start + self._count_bytes(
+                text[dni_match.start : dni_match.end]
+            )
+            counted_chars, counted_bytes = dni_match.end, end
+            yield dni_match, dni_match._replace(start=start, end=end)
+
+    def _count_bytes(self, text: str) -> int:
+        """
+        Count the bytes that a text read from a scanned file took in it.
+
+        :param text: the text.
+        :return: the number of bytes.
+        """
+        return len(text.encode(self.encoding, _DECODING_ERRORS))
+
+    def _load_state(self) -> dict:
+        """
+        Read the persisted offsets, if any.
+
+        :return: the state, keyed by absolute file path.
+        """
+        if not os.path.exists(self.state_file_path):
+            return {}
+
+        with open(self.state_file_path, "rt") as state_file:
+            return json.load(state_file)
+
+    def _save_state(self) -> None:
+        """
+        Persist the offsets. The state file is replaced atomically, so a crash
+        never leaves it half written.
+
+        :return: None
+        """
+        temporary_path = self.state_file_path + ".tmp"
+        with open(temporary_path, "wt") as state_file:
+            json.dump(self._state, state_file)
+        os.replace(temporary_path, self.state_file_path)
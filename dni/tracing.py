@@ -0,0 +1,417 @@
+"""
+Break down the time of DNI operations by internal phase, to find out which
+part of the validation pipeline is responsible when latency grows::
+
+    >>> with dni.tracing.trace() as summary:
+    >>>     handle_requests()
+    >>> print(summary.format())
+
+Operations are the entry points of the pipeline: building a ``DNI``
+(``"DNI"``), and the ``parse``, ``validate``, ``extract`` and ``diagnose``
+methods of any ``DNIScanner``, which ``is_valid``, ``extract_dnis_from_text``
+and the rest of the module-level functions run on. Calls made within another
+operation, such as the ``parse`` behind a ``DNI``, are part of the outer one.
+
+Phases are timed exclusively: the time of an exception built while searching
+for numbers counts for ``"exception_construction"``, not for
+``"number_search"``. Anything else, such as building DNI instances, counts for
+``"other"``.
+
+Instrumentation is only installed while a hook is registered, so tracing
+costs nothing when it is off. It does slow down traced calls, so absolute
+times are inflated, but the share of each phase is still meaningful.
+"""
+
+import random
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator
+
+from . import DNI, DNIScanner, extract_dnis_from_text, is_valid
+from .constants import UPPERCASE_CHECK_LETTERS
+from .exceptions import (
+    InvalidCheckLetterException,
+    MissingCheckLetterException,
+    MultipleMatchesException,
+    NoNumberFoundException,
+)
+
+NUMBER_SEARCH = "number_search"
+LETTER_SEARCH = "letter_search"
+CLUTTER_REMOVAL = "clutter_removal"
+CHECK_COMPUTATION = "check_computation"
+EXCEPTION_CONSTRUCTION = "exception_construction"
+OTHER = "other"
+PHASES = (
+    NUMBER_SEARCH,
+    LETTER_SEARCH,
+    CLUTTER_REMOVAL,
+    CHECK_COMPUTATION,
+    EXCEPTION_CONSTRUCTION,
+    OTHER,
+)
+
+CallTrace = namedtuple(
+    "CallTrace", field_names=["operation", "duration", "phase_durations"]
+)
+CallTrace.__doc__ = """
+The time taken by a call to an operation, in seconds, in total and by phase.
+``phase_durations`` has every phase in ``PHASES`` and adds up to
+``duration``.
+"""
+
+# Methods timed as operations or phases, as (class, attribute name, label).
+_TRACED_OPERATIONS = [
+    (DNI, "__init__", "DNI"),
+    (DNIScanner, "parse", "parse"),
+    (DNIScanner, "validate", "validate"),
+    (DNIScanner, "extract", "extract"),
+    (DNIScanner, "diagnose", "diagnose"),
+]
+_TRACED_PHASES = [
+    (DNIScanner, "extract_numbers", NUMBER_SEARCH),
+    (DNIScanner, "_search_full_dni", LETTER_SEARCH),
+    (DNIScanner, "_finditer_in_text", LETTER_SEARCH),
+    (DNIScanner, "remove_clutter", CLUTTER_REMOVAL),
+    (DNIScanner, "_to_ascii", CLUTTER_REMOVAL),
+    (DNIScanner, "_compute_check_letter", CHECK_COMPUTATION),
+] + [
+    (exception_class, "__init__", EXCEPTION_CONSTRUCTION)
+    for exception_class in (
+        NoNumberFoundException,
+        MissingCheckLetterException,
+        InvalidCheckLetterException,
+        MultipleMatchesException,
+    )
+]
+_GENERATOR_METHOD_NAMES = {"_finditer_in_text"}
+
+_hooks_lock = threading.Lock()
+_hooks = []
+_original_attributes = {}
+_thread_state = threading.local()
+
+
+class TraceSummary:
+    """
+    Add up the call traces of many calls, by operation. Instances are hooks,
+    so they can be registered with ``add_hook``.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.durations = Counter()
+        self.phase_durations: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, call_trace: CallTrace) -> None:
+        with self._lock:
+            self.calls[call_trace.operation] += 1
+            self.durations[call_trace.operation] += call_trace.duration
+            self.phase_durations.setdefault(
+                call_trace.operation, Counter()
+            ).update(call_trace.phase_durations)
+
+    def format(self) -> str:
+        """
+        Render the summary as a table, with the mean time per call of every
+        operation and phase, in microseconds.
+
+        :return: the table.
+        """
+        header = ["operation", "calls", "total"] + list(PHASES)
+        rows = [header]
+        for operation in sorted(self.calls):
+            calls = self.calls[operation]
+            rows.append(
+                [operation, str(calls)]
+                + [
+                    f"{duration * 1e6 / calls:.2f}"
+                    for duration in [self.durations[operation]]
+                    + [
+                        self.phase_durations[operation][phase]
+                        for phase in PHASES
+                    ]
+                ]
+            )
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines = [
+            "  ".join(
+                cell.ljust(width) if i == 0 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            )
+            for row in rows
+        ]
+
+        return "\n".join(lines + ["(mean microseconds per call)"])
+
+
+@contextmanager
+def trace(hook: Callable[[CallTrace], None] = None) -> Iterator[TraceSummary]:
+    """
+    Trace the operations run within a block, in any thread.
+
+    :param hook: a function to call with the ``CallTrace`` of every call, in
+     the thread that made the call, as soon as it ends.
+    :return: a context manager that gives a ``TraceSummary`` of the calls.
+    """
+    summary = TraceSummary()
+    hooks = [summary] if hook is None else [summary, hook]
+    for a_hook in hooks:
+        add_hook(a_hook)
+
+    try:
+        yield summary
+    finally:
+        for a_hook in hooks:
+            remove_hook(a_hook)
+
+
+def add_hook(hook: Callable[[CallTrace], None]) -> None:
+    """
+    Register a function to call with the ``CallTrace`` of every call to an
+    operation, in the thread that made the call, until it is removed.
+
+    :param hook: the function.
+    :return: None
+    """
+    with _hooks_lock:
+        if not _hooks:
+            _instrument()
+        _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[CallTrace], None]) -> None:
+    """
+    Stop calling a function registered with ``add_hook``. Instrumentation is
+    removed along with the last hook.
+
+    :param hook: the function.
+    :return: None
+    """
+    with _hooks_lock:
+        _hooks.remove(hook)
+        if not _hooks:
+            _uninstrument()
+
+
+def run_workload(iterations: int = 10000, seed: int = 0) -> None:
+    """
+    Run a representative mix of operations: building DNIs, validating
+    strings, with and without issues, and extracting DNIs from texts.
+
+    :param iterations: how many rounds of operations to run.
+    :param seed: a seed for the generated DNIs.
+    :return: None
+    """
+    random_generator = random.Random(seed)
+    valid_strings = [
+        DNI.from_int(random_generator.randrange(10**8)).format(
+            separator=random_generator.choice(["", "-", " "])
+        )
+        for _ in range(100)
+    ]
+    number = random_generator.randrange(10**8)
+    invalid_strings = [
+        f"DNI: {number:08d}{UPPERCASE_CHECK_LETTERS[(number + 1) % 23]}",
+        f"{number:08d}",
+        f"{number:08d} {number:08d}",
+        "no DNI",
+    ]
+    text = " lorem ipsum ".join(valid_strings[:10])
+
+    for iteration in range(iterations):
+        valid_string = valid_strings[iteration % len(valid_strings)]
+        DNI(valid_string)
+        is_valid(valid_string)
+        is_valid(invalid_strings[iteration % len(invalid_strings)])
+        if iteration % 10 == 0:
+            extract_dnis_from_text(text, mode="report")
+
+
+class _CallRecorder:
+    """
+    Keep the exclusive time of every phase of a call, as phases start and end
+    within each other.
+
+    :param operation: the operation called.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.start = time.perf_counter()
+        self.phase_durations = dict.fromkeys(PHASES, 0.0)
+        self._open_phases = []  # [phase, start time, time in nested phases]
+
+    def enter(self, phase: str) -> None:
+        """
+        Start timing a phase.
+
+        :param phase: the phase.
+        :return: None
+        """
+        self._open_phases.append([phase, time.perf_counter(), 0.0])
+
+    def exit(self) -> None:
+        """
+        Stop timing the latest phase started.
+
+        :return: None
+        """
+        phase, start, nested_duration = self._open_phases.pop()
+        duration = time.perf_counter() - start
+        self.phase_durations[phase] += duration - nested_duration
+        if self._open_phases:
+            self._open_phases[-1][2] += duration
+
+    def finish(self) -> CallTrace:
+        """
+        Stop timing the call.
+
+        :return: the trace of the call.
+        """
+        duration = time.perf_counter() - self.start
+        self.phase_durations[OTHER] = duration - sum(
+            self.phase_durations.values()
+        )
+
+        return CallTrace(
+            operation=self.operation,
+            duration=duration,
+            phase_durations=self.phase_durations,
+        )
+
+
+def _instrument() -> None:
+    """
+    Replace the traced methods with versions that time them.
+
+    :return: None
+    """
+    for a_class, name, label in _TRACED_OPERATIONS + _TRACED_PHASES:
+        attribute = a_class.__dict__[name]
+        _original_attributes[a_class, name] = attribute
+
+        function = getattr(attribute, "__func__", attribute)
+        if (a_class, name, label) in _TRACED_OPERATIONS:
+            timed_function = _time_operation(function, label)
+        elif name in _GENERATOR_METHOD_NAMES:
+            timed_function = _time_generator_phase(function, label)
+        else:
+            timed_function = _time_phase(function, label)
+
+        if isinstance(attribute, staticmethod):
+            timed_function = staticmethod(timed_function)
+        setattr(a_class, name, timed_function)
+
+
+def _uninstrument() -> None:
+    """
+    Put back the original versions of the traced methods.
+
+    :return: None
+    """
+    for (a_class, name), attribute in _original_attributes.items():
+        setattr(a_class, name, attribute)
+    _original_attributes.clear()
+
+
+def _time_operation(function: Callable, operation: str) -> Callable:
+    """
+    Wrap a function so that calls to it are traced as an operation, unless
+    they are made within another operation.
+
+    :param function: the function.
+    :param operation: the name of the operation.
+    :return: the wrapped function.
+    """
+
+    @wraps(function)
+    def timed_function(*args, **kwargs):
+        if getattr(_thread_state, "recorder", None) is not None:
+            return function(*args, **kwargs)
+
+        recorder = _CallRecorder(operation)
+        _thread_state.recorder = recorder
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _thread_state.recorder = None
+            call_trace = recorder.finish()
+            for hook in list(_hooks):
+                hook(call_trace)
+
+    return timed_function
+
+
+def _time_phase(function: Callable, phase: str) -> Callable:
+    """
+    Wrap a function so that its time counts for a phase of the operation
+    that calls it.
+
+    :param function: the function.
+    :param phase: the phase.
+    :return: the wrapped function.
+    """
+
+    @wraps(function)
+    def timed_function(*args, **kwargs):
+        recorder = getattr(_thread_state, "recorder", None)
+        if recorder is None:
+            return function(*args, **kwargs)
+
+        recorder.enter(phase)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            recorder.exit()
+
+    return timed_function
+
+
+def _time_generator_phase(function: Callable, phase: str) -> Callable:
+    """
+    Wrap a generator function so that the time taken to produce each of its
+    items counts for a phase of the operation that iterates it.
+
+    :param function: the generator function.
+    :param phase: the phase.
+    :return: the wrapped function.
+    """
+
+    @wraps(function)
+    def timed_function(*args, **kwargs):
+        recorder = getattr(_thread_state, "recorder", None)
+        if recorder is None:
+            return function(*args, **kwargs)
+
+        return _iter_timed(function(*args, **kwargs), recorder, phase)
+
+    return timed_function
+
+
+def _iter_timed(
+    iterator: Iterator, recorder: _CallRecorder, phase: str
+) -> Iterator:
+    """
+    Iterate over an iterator, timing how long each item takes as a phase.
+
+    :param iterator: the iterator.
+    :param recorder: the recorder of the call that iterates it.
+    :param phase: the phase.
+    :return: an iterator over the same items.
+    """
+    while True:
+        recorder.enter(phase)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            recorder.exit()
+
+        yield item
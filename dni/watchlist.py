@@ -0,0 +1,74 @@
+"""
+Screen texts against a watchlist of DNIs, such as a sanctions list or the
+identities exposed in a breach, reporting only the watchlisted DNIs found.
+"""
+
+from typing import Iterable, Iterator, List, TextIO, Union
+
+from . import DNI, DNIMatch, DNIScanner, _DEFAULT_SCANNER
+from .fuzzy import _DNIBitmap
+
+
+class DNIWatchlist(_DNIBitmap):
+    """
+    Find which of a set of DNIs appear in texts.
+
+    Watchlisted DNIs are kept as a bitmap over the space of 8 digit numbers,
+    so memory use is fixed at 12.5 MB, however long the watchlist is. Texts
+    are scanned once, and each candidate is checked against the bitmap by its
+    number before anything is built for it, so the cost of a search depends
+    on the length of the text and on the number of hits, not on the size of
+    the watchlist.
+
+    DNIs are watched by their number: candidates with a watchlisted number
+    are hits even if their check letter is not valid, since a typo in the
+    check letter of a watchlisted DNI still points to it. Check the
+    ``check_letter`` of the hits to tell them apart.
+
+    :param dnis: the DNIs to watch, as in ``update``.
+    :param scanner: the scanner used to find DNIs. If None, the one used by
+     the module-level functions.
+    """
+
+    def __init__(
+        self,
+        dnis: Iterable[Union[DNI, str, int]] = (),
+        scanner: DNIScanner = None,
+    ):
+        super().__init__(dnis)
+        self.scanner = scanner or _DEFAULT_SCANNER
+
+    def search(self, text_or_stream: Union[str, TextIO]) -> List[DNIMatch]:
+        """
+        Find the watchlisted DNIs in a text.
+
+        :param text_or_stream: a text, or a text stream, such as a file
+         opened in text mode, that will be read in chunks.
+        :return: the hits, in order of appearance, with their offsets
+         relative to the start of the text or stream.
+        """
+        return list(self.iter_search(text_or_stream))
+
+    def iter_search(
+        self, text_or_stream: Union[str, TextIO]
+    ) -> Iterator[DNIMatch]:
+        """
+        Lazily find the watchlisted DNIs in a text.
+
+        :param text_or_stream: a text, or a text stream.
+        :return: an iterator over the hits, in order of appearance.
+        """
+        return self.scanner.finditer(
+            text_or_stream, number_filter=self._is_watched_number
+        )
+
+    def _is_watched_number(self, number: str) -> bool:
+        """
+        Check if a number, as matched in a text, is in the watchlist.
+
+        :param number: the 8 digit number, in ASCII or full-width digits.
+        :return: True if so, False otherwise.
+        """
+        number = int(number)
+
+        return bool(self._bitmap[number >> 3] & (1 << (number & 7)))
@@ -0,0 +1,102 @@
+import pytest
+
+import dni
+
+pa = pytest.importorskip("pyarrow")
+dni_arrow = pytest.importorskip("dni.arrow")
+
+
+@pytest.fixture
+def dni_column():
+    return pa.array(
+        [
+            "27592354J",
+            "31654234-r",
+            "27592354X",
+            "27592354",
+            "123456789H",
+            None,
+            "12345678 A B",
+            "27592354J y",
+        ]
+    )
+
+
+def test_validation_status_matches_dni_exceptions(dni_column):
+    statuses = dni_arrow.validation_status(dni_column).to_pylist()
+
+    assert statuses == [
+        "valid",
+        "valid",
+        dni.InvalidCheckLetterException.description,
+        dni.MissingCheckLetterException.description,
+        dni.NoNumberFoundException.description,
+        None,
+        dni.InvalidCheckLetterException.description,
+        "valid",
+    ]
+
+
+def test_is_valid_agrees_with_scalar_is_valid(dni_column):
+    results = dni_arrow.is_valid(dni_column).to_pylist()
+
+    expected_results = [
+        None if value is None else dni.is_valid(value)
+        for value in dni_column.to_pylist()
+    ]
+
+    assert results == expected_results
+
+
+def test_is_valid_works_with_chunked_binary_columns():
+    column = pa.chunked_array(
+        [[b"27592354J", b"27592354X"], [b"05302398-R"]], type=pa.binary()
+    )
+
+    assert dni_arrow.is_valid(column).to_pylist() == [True, False, True]
+
+
+def test_add_or_fix_check_letter_fixes_and_nulls_non_dnis(dni_column):
+    fixed_values = dni_arrow.add_or_fix_check_letter(dni_column).to_pylist()
+
+    assert fixed_values == [
+        "27592354J",
+        "31654234-r",
+        "27592354J",
+        "27592354J",
+        None,
+        None,
+        "12345678Z",
+        "27592354J y",
+    ]
+
+
+def test_extract_dnis_from_text_returns_one_list_per_value():
+    column = pa.array(
+        ["Mi DNI no es 12543456-S, es el 65412354-D.", None, "Nada"]
+    )
+
+    extracted = dni_arrow.extract_dnis_from_text(column).to_pylist()
+
+    assert extracted == [["12543456S", "65412354D"], None, []]
+
+
+def test_extract_dnis_from_text_skips_invalid_check_letters_by_default():
+    column = pa.chunked_array(
+        [["Alta de 12543456-S"], ["Errata: 12345678A y 65412354D"]]
+    )
+
+    skipped = dni_arrow.extract_dnis_from_text(column).to_pylist()
+    fixed = dni_arrow.extract_dnis_from_text(column, mode="fix").to_pylist()
+
+    assert skipped == [["12543456S"], ["65412354D"]]
+    assert fixed == [["12543456S"], ["12345678Z", "65412354D"]]
+    with pytest.raises(dni.InvalidCheckLetterException):
+        dni_arrow.extract_dnis_from_text(column, mode="strict")
+    with pytest.raises(ValueError):
+        dni_arrow.extract_dnis_from_text(column, mode="report")
+
+
+def test_non_string_column_raises_type_error():
+    with pytest.raises(TypeError):
+        dni_arrow.is_valid(pa.array([1, 2, 3]))
@@ -0,0 +1,104 @@
+import gzip
+import shutil
+import zipfile
+
+import pytest
+
+import dni
+from dni.cache import ExtractionCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ExtractionCache(str(tmp_path / "cache.sqlite")) as a_cache:
+        yield a_cache
+
+
+def test_unchanged_texts_are_not_scanned_again(cache):
+    text = "Tiene el DNI 12543456-S, y el 65412354-D"
+
+    first_results = cache.extract(text)
+    second_results = cache.extract(text)
+
+    assert first_results == second_results == ["12543456S", "65412354D"]
+    assert isinstance(second_results[0], dni.DNI)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.extract(text + ", y el 72345678-Y")
+
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_results_are_kept_between_sessions(tmp_path):
+    database_path = str(tmp_path / "cache.sqlite")
+    with ExtractionCache(database_path) as cache:
+        cache.extract("12543456-S")
+
+    with ExtractionCache(database_path) as cache:
+        assert cache.extract("12543456-S") == ["12543456S"]
+        assert cache.hits == 1
+
+
+def test_results_depend_on_mode_and_scanner(tmp_path):
+    database_path = str(tmp_path / "cache.sqlite")
+    text = "１２５４３４５６Ｓ, 65412354-X"
+    with ExtractionCache(database_path) as cache:
+        assert cache.extract(text, mode="valid_only") == []
+        assert cache.extract(text, mode="fix") == ["65412354D"]
+
+    scanner = dni.DNIScanner(unicode_tolerant=True)
+    with ExtractionCache(database_path, scanner=scanner) as cache:
+        assert cache.extract(text, mode="valid_only") == ["12543456S"]
+        assert cache.misses == 1
+
+
+def test_reports_are_rebuilt_from_the_cache(cache):
+    text = "12543456-S, 65412354-X"
+
+    first_report = cache.extract(text, mode="report")
+    second_report = cache.extract(text, mode="report")
+
+    assert second_report == first_report
+    assert isinstance(second_report.invalid_matches[0], dni.DNIMatch)
+    assert cache.hits == 1
+
+
+def test_invalid_modes_are_rejected(cache):
+    with pytest.raises(ValueError):
+        cache.extract("12543456-S", mode="lenient")
+
+
+def test_files_with_the_same_contents_share_results(tmp_path, cache):
+    # Gzip headers hold the file name, so both files must be the same copy.
+    file_paths = [str(tmp_path / "a.log.gz"), str(tmp_path / "b.log.gz")]
+    with gzip.open(file_paths[0], "wt") as a_file:
+        a_file.write("12543456-S ok\nfallo 65412354-X\n")
+    shutil.copyfile(file_paths[0], file_paths[1])
+
+    first_results = cache.extract_from_file(file_paths[0], mode="fix")
+    second_results = cache.extract_from_file(file_paths[1], mode="fix")
+
+    assert first_results == {file_paths[0]: ["12543456S", "65412354D"]}
+    assert second_results == {file_paths[1]: ["12543456S", "65412354D"]}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_zip_members_are_cached_together(tmp_path, cache):
+    file_path = str(tmp_path / "logs.zip")
+    with zipfile.ZipFile(file_path, "w") as archive:
+        archive.writestr("a.log", "12543456-S")
+        archive.writestr("b.log", "65412354-D")
+
+    cache.extract_from_file(file_path)
+    results = cache.extract_from_file(file_path)
+
+    assert results == {"a.log": ["12543456S"], "b.log": ["65412354D"]}
+    assert cache.hits == 1
+
+
+def test_clear_removes_every_entry(cache):
+    cache.extract("12543456-S")
+    cache.clear()
+    cache.extract("12543456-S")
+
+    assert (cache.hits, cache.misses) == (0, 2)
@@ -0,0 +1,121 @@
+import pickle
+
+import numpy
+import pytest
+
+import dni
+from dni import dispatch
+from dni.exceptions import InvalidCheckLetterException
+
+VALUES = ["12345678Z", "12345678-z", "12345678A", "DNI", None, 5, "1234567Z"]
+TEXT = "\n".join(
+    f"Line {line}: 12345678Z, {line:08d}{'TRWAGMYFPDXBNJZSQVHLCKE'[line % 23]}"
+    f" and 8765432{line % 10}A"
+    for line in range(40)
+)
+
+
+@pytest.fixture
+def thresholds():
+    yield
+    dispatch.set_thresholds(dispatch.DEFAULT_THRESHOLDS)
+
+
+@pytest.fixture
+def every_input_is_large(thresholds):
+    dispatch.set_thresholds(dispatch.Thresholds(1, 1, 1))
+
+
+def test_every_kind_of_input_is_validated():
+    pandas = pytest.importorskip("pandas")
+    expected = [True, True, False, False, False, False, False]
+
+    assert dni.validate("12345678Z") is True
+    assert dni.validate(VALUES) == expected
+    assert dni.validate(iter(VALUES)) == expected
+    assert dni.validate(numpy.array(VALUES[:4]).reshape(2, 2)).tolist() == [
+        [True, True],
+        [False, False],
+    ]
+
+    series = pandas.Series(VALUES, index=range(10, 17), name="nif")
+    validity = dni.validate(series)
+    assert validity.tolist() == expected
+    assert validity.index.tolist() == list(range(10, 17))
+    assert validity.name == "nif"
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_every_path_validates_alike(thresholds, workers):
+    values = VALUES + [a_dni.format() for a_dni in dni.iter_range(0, 50)]
+
+    dispatch.set_thresholds(dispatch.Thresholds(1, 1, 1))
+    large_input_validity = dni.validate(values, workers=workers)
+    dispatch.set_thresholds(dispatch.Thresholds(None, None, None))
+
+    assert large_input_validity == dni.validate(values)
+
+
+@pytest.mark.parametrize("workers", [0, 3])
+@pytest.mark.parametrize("mode", ["valid_only", "fix", "report"])
+def test_every_path_extracts_alike(thresholds, workers, mode):
+    dispatch.set_thresholds(dispatch.Thresholds(1, 1, 1))
+    large_input_dnis = dni.extract(TEXT, mode, workers)
+    large_inputs_dnis = dni.extract(TEXT.splitlines(), mode, workers)
+    dispatch.set_thresholds(dispatch.Thresholds(None, None, None))
+
+    assert large_input_dnis == dni.extract_dnis_from_text(TEXT, mode)
+    assert large_inputs_dnis == [
+        dni.extract_dnis_from_text(line, mode) for line in TEXT.splitlines()
+    ]
+
+
+def test_parallel_strict_extraction_raises(every_input_is_large):
+    with pytest.raises(InvalidCheckLetterException) as exception_info:
+        dni.extract(TEXT, workers=2)
+
+    assert exception_info.value.details.number == "87654320"
+
+
+def test_streams_and_paths_are_read(tmp_path):
+    file_path = tmp_path / "customers.txt"
+    file_path.write_text(TEXT)
+
+    with open(file_path) as stream:
+        assert dni.extract(stream, "valid_only") == dni.extract(
+            TEXT, "valid_only"
+        )
+    assert dni.extract(file_path, "valid_only") == {
+        str(file_path): dni.extract(TEXT, "valid_only")
+    }
+    assert dni.extract(str(file_path)) == []  # Strings are texts.
+
+
+@pytest.mark.parametrize("mode", ["valid_only", "report"])
+def test_large_plain_files_are_split_among_workers(
+    every_input_is_large, tmp_path, mode
+):
+    file_path = tmp_path / "customers.txt"
+    file_path.write_bytes(("ñ " + TEXT + "\r\n").encode() * 5)
+
+    assert dni.extract(file_path, mode, workers=3) == (
+        dni.files.extract_dnis_from_file(str(file_path), mode)
+    )
+
+
+def test_calibration_sets_the_thresholds(thresholds):
+    calibrated_thresholds = dispatch.calibrate(sample_size=2000, workers=1)
+
+    assert dispatch.get_thresholds() == calibrated_thresholds
+    assert calibrated_thresholds.parallel_min_size is None
+    assert calibrated_thresholds.parallel_min_chars is None
+
+
+def test_exceptions_survive_pickling():
+    with pytest.raises(InvalidCheckLetterException) as exception_info:
+        dni.DNI("12345678A")
+
+    unpickled = pickle.loads(pickle.dumps(exception_info.value))
+
+    assert type(unpickled) is InvalidCheckLetterException
+    assert unpickled.render_as_dict() == exception_info.value.render_as_dict()
@@ -1,5 +1,8 @@
 import csv
+import io
 import re
+import subprocess
+import sys
 
 import pytest
 
@@ -111,6 +114,14 @@ def test_is_valid_with_not_a_dni_returns_false(dni_lookalikes):
     assert all_validations_returned_false
 
 
+@pytest.mark.parametrize(
+    "dni_string", ["27592354J y", "27592354-J ok", "27592354J l", "27592354 J a"]
+)
+def test_is_valid_ignores_short_words_after_the_check_letter(dni_string):
+    assert dni.is_valid(dni_string)
+    assert dni.DNI(dni_string).format() == "27592354J"
+
+
 def test_check_letter_is_valid_with_valids_returns_true(dni_strings):
     validation_results = [
         dni.check_letter_is_valid(dni_string["valid"])
@@ -299,6 +310,125 @@ def test_extract_dnis_without_a_dni_returns_empty_list(text_with_no_dni):
     assert dni.extract_dnis_from_text(text_with_no_dni) == []
 
 
+@pytest.fixture()
+def text_with_valid_and_invalid_dnis():
+    return "Mi DNI no es 12543456-X, es el 65412354-D."
+
+
+def test_extract_dnis_with_invalid_dni_raises_exception(
+    text_with_valid_and_invalid_dnis,
+):
+    with pytest.raises(dni.InvalidCheckLetterException):
+        dni.extract_dnis_from_text(text_with_valid_and_invalid_dnis)
+
+
+@pytest.mark.parametrize(
+    "mode, expected_dnis",
+    [("valid_only", ["65412354D"]), ("fix", ["12543456S", "65412354D"])],
+)
+def test_extract_dnis_modes_keep_every_match(
+    text_with_valid_and_invalid_dnis, mode, expected_dnis
+):
+    extracted_dnis = dni.extract_dnis_from_text(
+        text_with_valid_and_invalid_dnis, mode=mode
+    )
+
+    assert [a_dni.format() for a_dni in extracted_dnis] == expected_dnis
+
+
+def test_extract_dnis_in_report_mode_returns_invalid_matches(
+    text_with_valid_and_invalid_dnis,
+):
+    extraction_report = dni.extract_dnis_from_text(
+        text_with_valid_and_invalid_dnis, mode="report"
+    )
+
+    assert extraction_report.dnis == ["65412354D"]
+    assert [
+        dni_match.raw for dni_match in extraction_report.invalid_matches
+    ] == ["12543456-X"]
+
+
+def test_extract_dnis_with_unknown_mode_raises_value_error(text_with_two_dnis):
+    with pytest.raises(ValueError):
+        dni.extract_dnis_from_text(text_with_two_dnis, mode="lenient")
+
+
+def test_extract_dnis_takes_the_nearest_check_letter():
+    text = "Titular 27592354J y 12543456-S logged in"
+
+    found_dnis = dni.extract_dnis_from_text(text)
+
+    assert [a_dni.format() for a_dni in found_dnis] == [
+        "27592354J",
+        "12543456S",
+    ]
+
+
+def test_iter_dni_matches_yields_spans_and_components(text_with_two_dnis):
+    dni_matches = list(dni.iter_dni_matches(text_with_two_dnis))
+
+    assert [dni_match.raw for dni_match in dni_matches] == [
+        "12543456-S",
+        "65412354-D",
+    ]
+    assert all(
+        text_with_two_dnis[dni_match.start : dni_match.end] == dni_match.raw
+        for dni_match in dni_matches
+    )
+    assert (dni_matches[0].number, dni_matches[0].check_letter) == (
+        "12543456",
+        "S",
+    )
+
+
+def test_iter_dni_matches_is_lazy(text_with_two_dnis):
+    dni_matches = dni.iter_dni_matches(text_with_two_dnis)
+
+    assert next(dni_matches).number == "12543456"
+
+
+def test_iter_dni_matches_without_a_dni_yields_nothing(text_with_no_dni):
+    assert list(dni.iter_dni_matches(text_with_no_dni)) == []
+
+
+def test_iter_dni_matches_on_stream_finds_dnis_split_across_chunks():
+    text = "Mi DNI no es 12543456-S,\nes el 65412354-D." * 50
+    chunks = [text[i : i + 7] for i in range(0, len(text), 7)]
+
+    chunked_matches = list(dni.DNIScanner().finditer_chunks(chunks))
+    stream_matches = list(dni.iter_dni_matches(io.StringIO(text)))
+
+    assert chunked_matches == list(dni.iter_dni_matches(text))
+    assert stream_matches == chunked_matches
+
+
+def test_count_dnis_skips_invalid_check_letters():
+    text = "12543456-S, 65412354-D, 12543456s, 27592354X."
+
+    assert dni.count_dnis(text) == 3
+
+
+def test_count_dnis_works_with_streams(text_with_two_dnis):
+    assert dni.count_dnis(io.StringIO(text_with_two_dnis)) == 2
+
+
+def test_dni_frequencies_returns_most_common_first():
+    text = "65412354-D, 12543456-S, 12543456s, 27592354 J, 27592354J"
+
+    frequencies = dni.dni_frequencies(text)
+    top_frequency = dni.dni_frequencies(text, top=1)
+
+    assert frequencies[0][1] == 2 and len(frequencies) == 3
+    assert top_frequency == [frequencies[0]]
+    assert dict(frequencies)["65412354D"] == 1
+
+
+def test_dni_frequencies_with_non_positive_top_raises_value_error():
+    with pytest.raises(ValueError):
+        dni.dni_frequencies("65412354-D", top=0)
+
+
 def test_extract_number_from_string_that_contains_it_extracts_succesfully(
     dni_strings
 ):
@@ -527,6 +657,33 @@ class TestDNI:
 
         assert all_numbers_are_correct and all_check_letter_are_correct
 
+    def test_from_int_computes_the_check_letter(self):
+        assert dni.DNI.from_int(1234567) == dni.DNI("01234567L")
+
+    def test_from_int_out_of_range_raises_value_error(self):
+        with pytest.raises(ValueError):
+            dni.DNI.from_int(10**8)
+
+    def test_from_parts_checks_the_check_letter(self):
+        assert dni.DNI.from_parts("27592354", "j").format() == "27592354J"
+        with pytest.raises(dni.InvalidCheckLetterException):
+            dni.DNI.from_parts("27592354", "X")
+        with pytest.raises(dni.NoNumberFoundException):
+            dni.DNI.from_parts("2759235", "J")
+
+    @pytest.mark.parametrize("number", ["２７５９２３５４", "²⁷⁵⁹²³⁵⁴"])
+    def test_from_parts_rejects_non_ascii_digits(self, number):
+        with pytest.raises(dni.NoNumberFoundException):
+            dni.DNI.from_parts(number, "J")
+
+    def test_from_validated_skips_parsing(self):
+        assert dni.DNI.from_validated("27592354J") == dni.DNI("27592354J")
+
+    def test_dni_components_ignore_letters_around_the_dni(self):
+        a_dni = dni.DNI("DNI: 27592354J")
+
+        assert a_dni.number == "27592354" and a_dni.check_letter == "J"
+
     def test_several_format_combinations_output_as_expected(self):
         a_dni = dni.DNI("27592354J")
 
@@ -551,3 +708,20 @@ class TestDNI:
 
     def test_inequality_works_with_random_stuff(self):
         assert dni.DNI("27592354J") != csv.reader
+
+
+def test_importing_the_package_does_not_load_heavy_modules():
+    heavy_modules = ["numpy", "pyarrow", "zipfile", "lzma", "multiprocessing"]
+    loaded_modules = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, dni\n"
+            f"print([name for name in {heavy_modules} if name in sys.modules])",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+    assert loaded_modules.strip() == "[]"
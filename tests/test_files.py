@@ -0,0 +1,73 @@
+import bz2
+import gzip
+import lzma
+import zipfile
+
+import pytest
+
+import dni
+from dni.files import extract_dnis_from_file, list_members, open_text
+from dni.scanner import DEFAULT_STREAM_CHUNK_SIZE
+
+
+@pytest.fixture
+def log_text():
+    # The first DNI is split between the first two chunks read.
+    padding = " " * (DEFAULT_STREAM_CHUNK_SIZE - 4)
+    return padding + "12543456-S ok\nfallo 65412354-X\n"
+
+
+def as_strings(extracted_dnis):
+    return [a_dni.format() for a_dni in extracted_dnis]
+
+
+@pytest.mark.parametrize(
+    "file_name, opener",
+    [
+        ("app.log", open),
+        ("app.log.gz", gzip.open),
+        ("app.log.bz2", bz2.open),
+        ("app.log.xz", lzma.open),
+        ("app.log.misnamed", gzip.open),
+    ],
+)
+def test_compressed_files_are_scanned_directly(
+    tmp_path, log_text, file_name, opener
+):
+    file_path = str(tmp_path / file_name)
+    with opener(file_path, "wt") as a_file:
+        a_file.write(log_text)
+
+    extracted_dnis = extract_dnis_from_file(file_path, mode="fix")
+
+    assert list(extracted_dnis) == [file_path]
+    assert as_strings(extracted_dnis[file_path]) == ["12543456S", "65412354D"]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_zip_members_are_scanned_separately(tmp_path, workers):
+    file_path = str(tmp_path / "logs.zip")
+    with zipfile.ZipFile(file_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("a.log", "12543456-S")
+        archive.writestr("nested/", "")
+        archive.writestr("nested/b.log", "65412354-X")
+
+    extracted_dnis = extract_dnis_from_file(
+        file_path, mode="report", workers=workers
+    )
+
+    assert list_members(file_path) == ["a.log", "nested/b.log"]
+    assert extracted_dnis["a.log"].dnis == ["12543456S"]
+    assert [
+        dni_match.raw
+        for dni_match in extracted_dnis["nested/b.log"].invalid_matches
+    ] == ["65412354-X"]
+
+
+def test_open_text_gives_decompressed_text(tmp_path):
+    file_path = str(tmp_path / "app.log.gz")
+    with gzip.open(file_path, "wt") as a_file:
+        a_file.write("12543456-S")
+
+    with open_text(file_path) as text_stream:
+        assert dni.count_dnis(text_stream) == 1
@@ -0,0 +1,72 @@
+import numpy
+import pytest
+
+import dni
+from dni.fuzzy import _iter_neighbour_numbers
+
+
+@pytest.fixture
+def index():
+    return dni.DNIFuzzyIndex(
+        ["12345678Z", dni.DNI("12345687T"), 12345679, "87654321X"]
+    )
+
+
+def test_neighbours_are_one_substitution_or_transposition_away():
+    neighbours = dict(_iter_neighbour_numbers(12345678))
+
+    assert len(neighbours) == 1 + 8 * 9 + 7
+    assert neighbours[12345678] == "exact"
+    assert neighbours[12345671] == "substitution"
+    assert neighbours[92345678] == "substitution"
+    assert neighbours[21345678] == "transposition"
+    assert neighbours[12345687] == "transposition"
+    assert 12345687 not in dict(_iter_neighbour_numbers(12345588))
+
+
+def test_lookup_finds_typos(index):
+    matches = index.lookup("12345678")
+
+    assert [(a_match.dni, a_match.edit) for a_match in matches] == [
+        ("12345678Z", "exact"),
+        ("12345679S", "substitution"),
+        ("12345687T", "transposition"),
+    ]
+    assert {a_match.check_letter_matches for a_match in matches} == {None}
+    assert index.lookup("00000000T") == []
+
+
+def test_check_letters_rank_matches(index):
+    # The number has a typo, but the check letter is the one of 12345687.
+    matches = index.lookup("DNI: 12345678-t")
+
+    assert matches[0] == dni.FuzzyMatch(
+        dni=dni.DNI("12345687T"),
+        edit="transposition",
+        check_letter_matches=True,
+        score=2,
+    )
+    assert [a_match.score for a_match in matches] == [2, 1, 0]
+
+
+def test_lookup_needs_exactly_one_number(index):
+    with pytest.raises(dni.NoNumberFoundException):
+        index.lookup("no DNI here")
+
+    with pytest.raises(dni.exceptions.MultipleMatchesException):
+        index.lookup("12345678Z 87654321X")
+
+
+def test_packed_dnis_are_indexed(index):
+    buffer = bytearray(3 * dni.ranges.DNI_RECORD_SIZE)
+    dni.fill_range(buffer, 12345680)
+    index.update_packed(buffer)
+    index.update_packed(numpy.array([12345678, 55555555]))
+
+    assert len(index) == 8
+    assert "12345682H" in index
+    assert 55555555 in index
+    assert 55555556 not in index
+
+    with pytest.raises(ValueError):
+        index.update_packed(numpy.array([10**8]))
@@ -0,0 +1,141 @@
+import io
+import json
+
+import pytest
+
+import dni.jsonl
+
+
+@pytest.fixture
+def records():
+    return [
+        {
+            "customer": {"nif": "27592354-j"},
+            "items": [{"holder_id": "27592354X"}, {"holder_id": None}],
+        },
+        {"customer": {"nif": "No tengo"}, "items": []},
+        {"customer": {}},
+    ]
+
+
+def process_records(records, **options):
+    in_stream = io.StringIO(
+        "".join(json.dumps(record) + "\n" for record in records) + "\n"
+    )
+    out_stream = io.StringIO()
+
+    written_records = dni.jsonl.process(
+        in_stream,
+        out_stream,
+        paths=["customer.nif", "items[*].holder_id"],
+        **options,
+    )
+
+    assert written_records == len(records)
+    return [json.loads(line) for line in out_stream.getvalue().splitlines()]
+
+
+def test_validate_annotates_every_found_field(records):
+    processed_records = process_records(records)
+
+    assert [record["_dni_valid"] for record in processed_records] == [
+        {
+            "customer.nif": True,
+            "items[0].holder_id": False,
+            "items[1].holder_id": False,
+        },
+        {"customer.nif": False},
+        {},
+    ]
+    assert processed_records[0]["customer"] == records[0]["customer"]
+
+
+def test_fix_replaces_check_letters(records):
+    processed_records = process_records(records, action="fix")
+
+    assert processed_records[0]["items"][0]["holder_id"] == "27592354J"
+    assert processed_records[0]["customer"]["nif"] == "27592354-j"
+    assert processed_records[1]["customer"]["nif"] == "No tengo"
+
+
+def test_redact_replaces_fields_with_dni_numbers(records):
+    processed_records = process_records(records, action="redact")
+
+    assert processed_records[0]["customer"]["nif"] == "[REDACTED]"
+    assert processed_records[0]["items"][1]["holder_id"] is None
+    assert processed_records[1]["customer"]["nif"] == "No tengo"
+
+
+def test_parallel_processing_keeps_record_order(records):
+    many_records = records * 1000
+
+    assert process_records(many_records, workers=2) == process_records(
+        many_records
+    )
+
+
+@pytest.mark.parametrize("path", ["", "a..b", "a[x]", "[0]", "a.", "a b[*]c"])
+def test_invalid_paths_raise_value_error(path):
+    with pytest.raises(ValueError):
+        dni.jsonl.process(io.StringIO(), io.StringIO(), paths=[path])
+
+
+def test_unknown_action_raises_value_error():
+    with pytest.raises(ValueError):
+        dni.jsonl.process(
+            io.StringIO(), io.StringIO(), paths=["nif"], action="hide"
+        )
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_malformed_lines_are_reported_and_skipped(records, caplog, workers):
+    in_stream = io.StringIO(
+        json.dumps(records[0])
+        + "\n\n"
+        + '{"customer": \n'
+        + json.dumps(records[1])
+        + "\n"
+    )
+    out_stream = io.StringIO()
+
+    written_records = dni.jsonl.process(
+        in_stream, out_stream, paths=["customer.nif"], workers=workers
+    )
+
+    assert written_records == 2
+    assert [
+        json.loads(line)["customer"]
+        for line in out_stream.getvalue().splitlines()
+    ] == [records[0]["customer"], records[1]["customer"]]
+    assert "Skipping line 3" in caplog.text
+
+
+def test_malformed_lines_can_be_fatal(records):
+    in_stream = io.StringIO(
+        json.dumps(records[0])
+        + "\n"
+        + "nif: 27592354J\n"
+        + json.dumps(records[1])
+        + "\n"
+    )
+    out_stream = io.StringIO()
+
+    with pytest.raises(ValueError, match="Line 2 "):
+        dni.jsonl.process(
+            in_stream,
+            out_stream,
+            paths=["customer.nif"],
+            on_malformed_line="raise",
+        )
+
+    assert len(out_stream.getvalue().splitlines()) == 1
+
+
+def test_unknown_malformed_line_action_raises_value_error():
+    with pytest.raises(ValueError):
+        dni.jsonl.process(
+            io.StringIO(),
+            io.StringIO(),
+            paths=["nif"],
+            on_malformed_line="ignore",
+        )
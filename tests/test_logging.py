@@ -0,0 +1,88 @@
+import logging
+
+import pytest
+
+import dni
+from dni.logging import RedactingFilter
+
+
+@pytest.fixture
+def records():
+    handler = CollectingHandler()
+    handler.addFilter(RedactingFilter())
+    logger = logging.getLogger("tests.redacted")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_dnis_in_messages_and_args_are_masked(records):
+    logger = logging.getLogger("tests.redacted.child")
+
+    logger.info("Alta de 12543456-S")
+    logger.info("Usuario %s con %d pedidos", "65412354D", 3)
+    logger.info("Usuario %(nif)s", {"nif": "65412354 x"})
+    logger.info("Pedido %d", 12543456)
+
+    assert [record.getMessage() for record in records] == [
+        "Alta de [REDACTED]",
+        "Usuario [REDACTED] con 3 pedidos",
+        "Usuario [REDACTED]",
+        "Pedido 12543456",
+    ]
+    assert records[1].args is None
+    assert records[3].args == (12543456,)
+
+
+def test_records_without_candidates_are_left_untouched():
+    record = logging.LogRecord(
+        "app", logging.INFO, __file__, 1, "%s tardó %d ms", ("GET", 12), None
+    )
+
+    assert RedactingFilter().filter(record)
+    assert record.msg == "%s tardó %d ms"
+    assert record.args == ("GET", 12)
+
+
+def test_redacted_messages_are_cached():
+    redacting_filter = RedactingFilter(mask="***")
+
+    for _ in range(3):
+        assert redacting_filter.redact("DNI 12543456S") == "DNI ***"
+
+    cache_info = redacting_filter._redact_message.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (2, 1)
+
+
+def test_custom_scanners_are_used():
+    redacting_filter = RedactingFilter(
+        scanner=dni.DNIScanner(unicode_tolerant=True)
+    )
+
+    assert (
+        redacting_filter.redact("DNI １２５４３４５６Ｓ") == "DNI [REDACTED]"
+    )
+    assert (
+        RedactingFilter().redact("DNI １２５４３４５６Ｓ")
+        == "DNI １２５４３４５６Ｓ"
+    )
+
+
+def test_records_from_other_loggers_pass_through_unchanged():
+    redacting_filter = RedactingFilter("app")
+    record = logging.LogRecord(
+        "other", logging.INFO, __file__, 1, "12543456S", None, None
+    )
+
+    assert redacting_filter.filter(record)
+    assert record.msg == "12543456S"
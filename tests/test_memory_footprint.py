@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+import memory_footprint  # pylint: disable=wrong-import-position
+
+REGRESSION_CHECK_SIZE = 10**4
+
+
+@pytest.fixture(scope="module")
+def baselines():
+    recorded_baselines = memory_footprint.load_baselines()
+    if str(REGRESSION_CHECK_SIZE) not in recorded_baselines:
+        pytest.skip("No memory baselines recorded for this Python version.")
+
+    return recorded_baselines
+
+
+def test_memory_footprint_has_not_regressed(baselines):
+    results = {
+        str(REGRESSION_CHECK_SIZE): memory_footprint.measure(
+            REGRESSION_CHECK_SIZE
+        )
+    }
+
+    assert memory_footprint.find_regressions(results, baselines) == []
+
+
+def test_is_valid_does_not_retain_memory():
+    measurements = memory_footprint.measure_is_valid_bytes(1000)
+
+    assert measurements["is_valid_retained_bytes_per_call"] < 1
+
+
+def test_find_regressions_only_flags_growth_beyond_tolerance():
+    baselines = {"10": {"dni_instance_bytes": 100.0}}
+
+    small_growth = {"10": {"dni_instance_bytes": 105.0}}
+    big_growth = {"10": {"dni_instance_bytes": 120.0}}
+    shrink = {"10": {"dni_instance_bytes": 50.0}}
+
+    assert memory_footprint.find_regressions(small_growth, baselines) == []
+    assert memory_footprint.find_regressions(shrink, baselines) == []
+    assert len(memory_footprint.find_regressions(big_growth, baselines)) == 1
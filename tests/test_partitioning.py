@@ -0,0 +1,91 @@
+import numpy
+import pytest
+
+import dni
+from dni.partitioning import PartitionedWriter, partition_of
+
+
+def test_partitions_depend_only_on_the_number():
+    values = ["12345678Z", "12345678-z", "DNI: 12345678", dni.DNI("12345678Z")]
+
+    # Pinned, as partitions must not change between versions.
+    assert dni.partition(values + [12345678], 16) == [10] * 5
+    assert dni.partition(["no DNI", "12345678 87654321", 10**8], 16) == [
+        None,
+        None,
+        None,
+    ]
+
+
+def test_vectorized_partitions_agree_with_scalar_ones():
+    numbers = numpy.random.default_rng(0).integers(0, 10**8, 2000)
+    buffer = bytearray(100 * dni.ranges.DNI_RECORD_SIZE)
+    dni.fill_range(buffer, 12345600)
+
+    for n_partitions in (1, 7, 1000):
+        assert dni.partition(numbers, n_partitions).tolist() == [
+            partition_of(int(number), n_partitions) for number in numbers
+        ]
+        assert dni.partition(buffer, n_partitions).tolist() == [
+            partition_of(number, n_partitions)
+            for number in range(12345600, 12345700)
+        ]
+
+
+def test_arrow_columns_are_partitioned():
+    pa = pytest.importorskip("pyarrow")
+    column = pa.chunked_array([["12345678Z", None], ["no DNI", "87654321-x"]])
+
+    partitions = dni.partition(column, 16)
+
+    assert partitions.to_pylist() == dni.partition(
+        ["12345678Z", None, "no DNI", "87654321-x"], 16
+    )
+
+
+def test_adding_a_partition_only_moves_dnis_to_it():
+    numbers = numpy.arange(10**6, 10**6 + 20000)
+
+    before = dni.partition(numbers, 10)
+    after = dni.partition(numbers, 11)
+
+    moved = before != after
+    assert set(after[moved]) == {10}
+    assert 0.07 < moved.mean() < 0.11
+
+
+def test_invalid_partition_counts_raise_value_error():
+    with pytest.raises(ValueError):
+        dni.partition(["12345678Z"], 0)
+
+
+def test_writer_routes_records_to_partition_files(tmp_path):
+    records = [
+        '{"nif": "12345678Z", "total": 3}',
+        '{"nif": "12345678-z", "total": 5}\n',
+        '{"nif": "87654321X", "total": 1}',
+        '{"nif": null, "total": 0}',
+    ]
+
+    with PartitionedWriter(str(tmp_path), 4) as writer:
+        written_partitions = [writer.write(record) for record in records]
+
+    assert written_partitions == [3, 3, 0, None]
+    assert writer.record_counts == [1, 0, 0, 2]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "part-00000.txt",
+        "part-00003.txt",
+        "unpartitioned.txt",
+    ]
+    assert (tmp_path / "part-00003.txt").read_text().splitlines() == [
+        records[0],
+        records[1].strip(),
+    ]
+    assert (tmp_path / "unpartitioned.txt").read_text() == records[3] + "\n"
+
+
+def test_writer_keys_pick_the_dni_of_records(tmp_path):
+    with PartitionedWriter(
+        str(tmp_path), 4, key=lambda record: record.split(";")[1]
+    ) as writer:
+        assert writer.write("87654321X;12345678Z") == 3
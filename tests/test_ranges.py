@@ -0,0 +1,81 @@
+import array
+
+import pytest
+
+import dni
+
+
+def test_iter_range_yields_one_valid_dni_per_number():
+    dni_strings = list(dni.iter_range(27592340, 27592380))
+
+    assert len(dni_strings) == 40
+    assert "27592354J" in dni_strings
+    assert all(dni.is_valid(dni_string) for dni_string in dni_strings)
+
+
+def test_iter_range_check_letters_match_compute_check_letter():
+    dni_strings = dni.iter_range(99999900, 10**8)
+
+    assert all(
+        dni_string[-1] == dni.compute_check_letter(dni_string[:8])
+        for dni_string in dni_strings
+    )
+
+
+def test_iter_range_as_dni_and_int():
+    dnis = list(dni.iter_range(0, 3, as_=dni.DNI))
+    numbers = list(dni.iter_range(0, 3, as_=int))
+
+    assert dnis == ["00000000T", "00000001R", "00000002W"]
+    assert all(isinstance(a_dni, dni.DNI) for a_dni in dnis)
+    assert numbers == [0, 1, 2]
+
+
+def test_iter_range_is_lazy():
+    dnis = dni.iter_range(0, 10**8)
+
+    assert next(dnis) == "00000000T"
+
+
+def test_iter_range_with_invalid_arguments_raises_value_error():
+    with pytest.raises(ValueError):
+        dni.iter_range(10, 5)
+    with pytest.raises(ValueError):
+        dni.iter_range(0, 10**8 + 1)
+    with pytest.raises(ValueError):
+        dni.iter_range(0, 5, as_=float)
+
+
+@pytest.mark.parametrize(
+    "buffer",
+    [bytearray(9 * 50), array.array("B", bytes(9 * 50))],
+    ids=["bytearray", "array"],
+)
+def test_fill_range_matches_iter_range(buffer):
+    written = dni.fill_range(buffer, 27592330)
+
+    assert written == 50
+    assert bytes(buffer).decode("ascii") == "".join(
+        dni.iter_range(27592330, 27592380)
+    )
+
+
+def test_fill_range_fills_numpy_arrays():
+    numpy = pytest.importorskip("numpy")
+    records = numpy.zeros(4, dtype="S9")
+
+    dni.fill_range(records, 99999996)
+
+    assert [record.decode("ascii") for record in records] == list(
+        dni.iter_range(99999996, 10**8)
+    )
+
+
+def test_fill_range_with_wrong_buffer_size_raises_value_error():
+    with pytest.raises(ValueError):
+        dni.fill_range(bytearray(10), 0)
+
+
+def test_fill_range_past_the_last_number_raises_value_error():
+    with pytest.raises(ValueError):
+        dni.fill_range(bytearray(18), 10**8 - 1)
@@ -0,0 +1,150 @@
+import gzip
+
+import pytest
+
+import dni
+
+
+@pytest.fixture
+def potential_dni_strings():
+    return [
+        "27592354J",
+        "27592354-j",
+        "ABC",
+        "27592354",
+        "27592354X",
+        "27592354 65412354",
+    ]
+
+
+def test_report_counts_every_outcome(potential_dni_strings):
+    a_report = dni.report(iter(potential_dni_strings))
+
+    assert a_report.total == 6
+    assert a_report.counts == {
+        "valid": 2,
+        "missing_dni_number": 1,
+        "missing_check_letter": 1,
+        "invalid_check_letter": 1,
+        "multiple_dni_numbers": 1,
+    }
+    assert a_report.found_check_letters == {"X": 1}
+    assert a_report.expected_check_letters == {"J": 1}
+
+
+def test_report_samples_are_rendered_exceptions(potential_dni_strings):
+    a_report = dni.report(potential_dni_strings)
+
+    assert a_report.samples["invalid_check_letter"] == [
+        dni.InvalidCheckLetterException(
+            dni.exceptions.DNIExceptionDetails(
+                string="27592354X",
+                number="27592354",
+                invalid_check_letter="X",
+                valid_check_letter="J",
+            )
+        ).render_as_dict()
+    ]
+    assert a_report.samples["multiple_dni_numbers"][0]["details"][
+        "string"
+    ] == ("27592354 65412354")
+
+
+def test_report_keeps_a_bounded_uniform_sample():
+    potential_dni_strings = (f"no number {i}" for i in range(1000))
+
+    a_report = dni.report(potential_dni_strings, samples_per_outcome=3, seed=1)
+    sampled_strings = [
+        sample["details"]["string"]
+        for sample in a_report.samples["missing_dni_number"]
+    ]
+
+    assert a_report.counts["missing_dni_number"] == 1000
+    assert len(set(sampled_strings)) == 3
+    assert sampled_strings != ["no number 0", "no number 1", "no number 2"]
+
+
+def test_negative_samples_per_outcome_raises_value_error():
+    with pytest.raises(ValueError):
+        dni.report([], samples_per_outcome=-1)
+
+
+def mostly_valid_lines(n_lines):
+    # One in ten lines has a missing check letter, and is much shorter.
+    return [
+        (
+            f"{i % 10}. sin letra: 27592354"
+            if i % 10 == 0
+            else f"{i % 10}. {'-' * (i % 50)} 27592354-J"
+        )
+        for i in range(n_lines)
+    ]
+
+
+def test_small_inputs_are_classified_exhaustively(potential_dni_strings):
+    estimate = dni.estimate_quality(potential_dni_strings + ["", " \n"])
+
+    assert estimate.exhaustive
+    assert estimate.sample_size == 6
+    assert estimate.rates["valid"] == pytest.approx(2 / 6)
+    assert estimate.intervals["valid"] == (
+        estimate.rates["valid"],
+        estimate.rates["valid"],
+    )
+
+
+def test_streams_are_reservoir_sampled():
+    estimate = dni.estimate_quality(
+        iter(mostly_valid_lines(20000)), margin=0.02, seed=0
+    )
+
+    assert not estimate.exhaustive
+    assert estimate.sample_size < 20000
+    low, high = estimate.intervals["missing_check_letter"]
+    assert low <= 0.1 <= high
+    assert high - low <= 0.04
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_streams_just_larger_than_the_sample_are_not_exhaustive(seed):
+    # A margin of 0.5 at 0.99 confidence takes a sample of 7 records.
+    lines = mostly_valid_lines(8)
+
+    estimate = dni.estimate_quality(iter(lines), margin=0.5, seed=seed)
+    whole_estimate = dni.estimate_quality(iter(lines[:7]), margin=0.5)
+
+    assert not estimate.exhaustive
+    assert estimate.intervals["valid"][0] < estimate.intervals["valid"][1]
+    assert whole_estimate.exhaustive
+
+
+def test_large_files_are_sampled_by_seeking(tmp_path, monkeypatch):
+    monkeypatch.setattr(dni.reporting, "_MIN_BYTES_FOR_SEEKING", 0)
+    file_path = tmp_path / "delivery.txt"
+    file_path.write_text("\n".join(mostly_valid_lines(20000)))
+
+    estimate = dni.estimate_quality(file_path, confidence=0.95, seed=0)
+
+    # Short lines are sampled less often, which the weights correct.
+    assert estimate.rates["missing_check_letter"] == pytest.approx(
+        0.1, abs=0.01
+    )
+    assert estimate.confidence == 0.95
+
+
+def test_sampling_stops_once_the_margin_is_reached(tmp_path):
+    file_path = tmp_path / "delivery.txt.gz"
+    with gzip.open(file_path, "wt") as a_file:
+        a_file.write("27592354J\n" * 100000)
+
+    estimate = dni.estimate_quality(str(file_path), margin=0.01)
+
+    assert estimate.sample_size < 1000
+    assert estimate.rates["valid"] == 1
+    assert estimate.intervals["valid"][0] >= 0.98
+
+
+@pytest.mark.parametrize("confidence, margin", [(1, 0.01), (0.9, 0)])
+def test_invalid_estimate_parameters_raise_value_error(confidence, margin):
+    with pytest.raises(ValueError):
+        dni.estimate_quality([], confidence=confidence, margin=margin)
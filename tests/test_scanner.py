@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+
+import dni
+
+
+@pytest.fixture
+def text_with_spaced_dni():
+    return "Titular: 12543456 --> S. Firmado."
+
+
+@pytest.fixture
+def dni_strings_sample():
+    return ["27592354J", "31654234-R", "27592354X", "27592354", "ABC"]
+
+
+def test_default_scanner_behaves_like_module_functions(dni_strings_sample):
+    scanner = dni.DNIScanner()
+
+    assert [scanner.validate(a_string) for a_string in dni_strings_sample] == [
+        dni.is_valid(a_string) for a_string in dni_strings_sample
+    ]
+
+
+def test_max_separator_chars_widens_tolerance(text_with_spaced_dni):
+    tolerant_scanner = dni.DNIScanner(max_separator_chars=5)
+
+    assert not dni.text_contains_dni(text_with_spaced_dni)
+    assert tolerant_scanner.contains(text_with_spaced_dni)
+    assert tolerant_scanner.extract(text_with_spaced_dni) == ["12543456S"]
+
+
+def test_allowed_separators_restrict_matches():
+    scanner = dni.DNIScanner(allowed_separators="-")
+
+    assert scanner.validate("12543456-S")
+    assert not scanner.validate("12543456_S")
+
+
+def test_case_restricts_check_letters():
+    upper_scanner = dni.DNIScanner(case="upper")
+
+    assert upper_scanner.validate("12543456S")
+    assert not upper_scanner.validate("12543456s")
+
+
+def test_parse_returns_components_and_raises_issues():
+    scanner = dni.DNIScanner()
+
+    assert scanner.parse(" 12543456-s ") == ("12543456", "S")
+    with pytest.raises(dni.InvalidCheckLetterException):
+        scanner.parse("12543456-T")
+    with pytest.raises(dni.MissingCheckLetterException):
+        scanner.parse("12543456")
+    with pytest.raises(dni.NoNumberFoundException):
+        scanner.parse("12543456 65412354")
+
+
+def test_finditer_reports_positions():
+    text = "A: 12543456-S; B: 65412354-D"
+
+    dni_matches = list(dni.DNIScanner().finditer(text))
+
+    assert [(dni_match.start, dni_match.end) for dni_match in dni_matches] == [
+        (3, 13),
+        (18, 28),
+    ]
+
+
+def test_words_after_a_dni_are_not_taken_as_check_letters():
+    text = "12543456S logged in, 65412354-D y otro"
+
+    dni_matches = list(dni.DNIScanner().finditer(text))
+
+    assert [dni_match.raw for dni_match in dni_matches] == [
+        "12543456S",
+        "65412354-D",
+    ]
+
+
+def test_scanner_can_be_shared_between_threads():
+    scanner = dni.DNIScanner(max_separator_chars=5)
+    text = "Titular: 12543456 --> S. " * 200
+    results = []
+
+    def extract():
+        results.append(len(scanner.extract(text)))
+
+    threads = [threading.Thread(target=extract) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [200] * 8
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"max_separator_chars": -1},
+        {"case": "title"},
+        {"allowed_separators": "-\n"},
+    ],
+)
+def test_invalid_options_raise_value_error(options):
+    with pytest.raises(ValueError):
+        dni.DNIScanner(**options)
+
+
+def test_unicode_tolerant_scanner_reports_offsets_in_original_text():
+    text = "Titular: １２５４３４５６\u00a0\u2014\u00a0Ｓ."
+    scanner = dni.DNIScanner(unicode_tolerant=True)
+
+    dni_matches = list(scanner.finditer(text))
+
+    assert not dni.text_contains_dni(text)
+    assert [
+        (
+            dni_match.start,
+            dni_match.end,
+            dni_match.number,
+            dni_match.check_letter,
+        )
+        for dni_match in dni_matches
+    ] == [(9, 21, "12543456", "S")]
+    assert dni_matches[0].raw == text[9:21]
+    assert scanner.extract(text) == ["12543456S"]
+
+
+def test_unicode_tolerant_scanner_extends_allowed_separators():
+    scanner = dni.DNIScanner(allowed_separators="-", unicode_tolerant=True)
+
+    assert scanner.validate("12543456−S")
+    assert scanner.parse("１２５４３４５６-s") == (
+        "12543456",
+        "S",
+    )
+    assert not scanner.validate("12543456 S")
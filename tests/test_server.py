@@ -0,0 +1,172 @@
+import asyncio
+import gc
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dni.server import DNIService, MicroBatcher
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.batches = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.batches.append(args[1])
+        return super().submit(fn, *args, **kwargs)
+
+
+class BrokenExecutor(ThreadPoolExecutor):
+    def submit(self, fn, *args, **kwargs):
+        raise RuntimeError("The pool is broken")
+
+
+async def send(reader, writer, path, payload, method="POST"):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    content_length = int(
+        head.lower().split(b"content-length: ")[1].split(b"\r\n")[0]
+    )
+    return status, json.loads(await reader.readexactly(content_length))
+
+
+def run_against_service(client, **service_options):
+    async def run():
+        service = DNIService(**service_options)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await client(port)
+
+    return asyncio.run(run())
+
+
+def test_endpoints_over_a_kept_alive_connection():
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = [
+            await send(reader, writer, "/validate", {"value": "27592354-J"}),
+            await send(
+                reader, writer, "/fix", {"values": ["27592354X", "ABC"]}
+            ),
+            await send(
+                reader, writer, "/extract", {"value": "Es 12543456-S, no 1"}
+            ),
+        ]
+        writer.close()
+        return responses
+
+    assert run_against_service(client) == [
+        (200, {"result": True}),
+        (200, {"results": ["27592354J", None]}),
+        (200, {"result": ["12543456S"]}),
+    ]
+
+
+def test_concurrent_requests_are_coalesced_into_batches():
+    executor = RecordingExecutor()
+
+    async def client(port):
+        async def validate(value):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            response = await send(
+                reader, writer, "/validate", {"value": value}
+            )
+            writer.close()
+            return response
+
+        return await asyncio.gather(
+            *(validate(f"2759235{digit}J") for digit in range(10))
+        )
+
+    responses = run_against_service(
+        client, max_batch_size=4, max_batch_latency=0.05, executor=executor
+    )
+    executor.shutdown()
+
+    assert [body["result"] for _, body in responses] == [
+        digit == 4 for digit in range(10)
+    ]
+    assert sorted(len(batch) for batch in executor.batches) == [2, 4, 4]
+
+
+@pytest.mark.parametrize(
+    "path, payload, method, expected_status",
+    [
+        ("/unknown", {"value": "27592354J"}, "POST", 404),
+        ("/validate", {"value": "27592354J"}, "GET", 405),
+        ("/validate", {"value": 27592354}, "POST", 400),
+    ],
+)
+def test_bad_requests_get_an_error(path, payload, method, expected_status):
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        response = await send(reader, writer, path, payload, method)
+        writer.close()
+        return response
+
+    status, body = run_against_service(client)
+
+    assert status == expected_status and "error" in body
+
+
+def test_failed_batches_get_an_internal_server_error():
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        other_reader, other_writer = await asyncio.open_connection(
+            "127.0.0.1", port
+        )
+        responses = await asyncio.gather(
+            send(reader, writer, "/validate", {"value": "27592354J"}),
+            send(
+                other_reader,
+                other_writer,
+                "/validate",
+                {"values": ["27592354"]},
+            ),
+        )
+        # The connection is still open.
+        responses.append(
+            await send(reader, writer, "/validate", {"value": "27592354J"})
+        )
+        writer.close()
+        other_writer.close()
+        return responses
+
+    responses = run_against_service(
+        client, max_batch_latency=0.05, executor=BrokenExecutor()
+    )
+
+    assert [status for status, _ in responses] == [500, 500, 500]
+    assert all("error" in body for _, body in responses)
+
+
+def test_running_batches_are_kept_until_done():
+    async def run():
+        batcher = MicroBatcher(
+            "/validate",
+            max_batch_size=1,
+            max_batch_latency=1,
+            executor=ThreadPoolExecutor(max_workers=1),
+        )
+        result = batcher.submit("27592354J")
+        (task,) = batcher._running_tasks
+        gc.collect()
+        await task
+        return await result, len(batcher._running_tasks)
+
+    assert asyncio.run(run()) == (True, 0)
+
+
+def test_invalid_options_raise_value_error():
+    with pytest.raises(ValueError):
+        DNIService(max_batch_size=0)
@@ -0,0 +1,113 @@
+import numpy
+import pytest
+
+import dni
+
+
+def sketch_of_range(start, stop, **options):
+    sketch = dni.DNICardinalitySketch(**options)
+    sketch.update(dni.iter_range(start, stop))
+    return sketch
+
+
+def test_estimate_is_within_error():
+    sketch = sketch_of_range(0, 50000)
+
+    assert sketch.to_bytes().__len__() < 5000
+    assert abs(sketch.estimate() - 50000) < 50000 * 3 * sketch.relative_error
+
+
+def test_duplicates_and_formats_count_once():
+    sketch = dni.DNICardinalitySketch()
+
+    sketch.update(["27592354J", dni.DNI("27592354-j"), 27592354])
+    sketch.update_from_text("DNI 27592354 J, otra vez 27592354J.")
+
+    assert sketch.estimate() == 1
+
+
+def test_merged_sketch_is_sketch_of_union():
+    merged_sketch = sketch_of_range(0, 3000)
+    merged_sketch.merge(sketch_of_range(2000, 5000))
+
+    assert merged_sketch.to_bytes() == sketch_of_range(0, 5000).to_bytes()
+
+
+def test_packed_updates_match_single_updates():
+    records = bytearray(1000 * 9)
+    dni.fill_range(records, 1000)
+    from_records = dni.DNICardinalitySketch()
+    from_records.update_packed(records)
+    from_numbers = dni.DNICardinalitySketch()
+    from_numbers.update_packed(numpy.arange(1000, 2000))
+
+    expected_bytes = sketch_of_range(1000, 2000).to_bytes()
+    assert from_records.to_bytes() == expected_bytes
+    assert from_numbers.to_bytes() == expected_bytes
+
+
+def test_serialization_round_trip():
+    sketch = sketch_of_range(0, 1000, relative_error=0.05)
+
+    restored_sketch = dni.DNICardinalitySketch.from_bytes(sketch.to_bytes())
+
+    assert restored_sketch.precision == sketch.precision
+    assert restored_sketch.estimate() == sketch.estimate()
+    with pytest.raises(ValueError):
+        dni.DNICardinalitySketch.from_bytes(sketch.to_bytes()[:-1])
+
+
+def test_invalid_error_and_merges_raise_value_error():
+    with pytest.raises(ValueError):
+        dni.DNICardinalitySketch(relative_error=0)
+    with pytest.raises(ValueError):
+        dni.DNICardinalitySketch(0.01).merge(dni.DNICardinalitySketch(0.1))
+
+
+@pytest.fixture
+def skewed_dni_strings():
+    dni_strings = []
+    for position, dni_string in enumerate(dni.iter_range(0, 2000)):
+        dni_strings.extend([dni_string] * (50 if position < 5 else 1))
+    return dni_strings
+
+
+def test_heavy_hitters_finds_the_most_frequent_dnis(skewed_dni_strings):
+    heavy_hitters = dni.DNIHeavyHitters(capacity=50)
+
+    heavy_hitters.update(skewed_dni_strings)
+
+    assert heavy_hitters.total == len(skewed_dni_strings)
+    assert len(heavy_hitters.tracked()) == 50
+    assert sorted(dni_string for dni_string, _ in heavy_hitters.top(5)) == (
+        list(dni.iter_range(0, 5))
+    )
+    for dni_string, count in heavy_hitters.top(5):
+        lowest, highest = heavy_hitters.count_bounds(dni_string)
+        assert lowest <= 50 <= highest == count
+
+
+def test_merged_heavy_hitters_keep_the_most_frequent_dnis(skewed_dni_strings):
+    heavy_hitters = dni.DNIHeavyHitters(capacity=50)
+    heavy_hitters.update(skewed_dni_strings[::2])
+    other_heavy_hitters = dni.DNIHeavyHitters(capacity=50)
+    other_heavy_hitters.update_from_text(" ".join(skewed_dni_strings[1::2]))
+
+    heavy_hitters.merge(other_heavy_hitters)
+
+    assert heavy_hitters.total == len(skewed_dni_strings)
+    assert sorted(dni_string for dni_string, _ in heavy_hitters.top(5)) == (
+        list(dni.iter_range(0, 5))
+    )
+    for dni_string in dni.iter_range(0, 5):
+        lowest, highest = heavy_hitters.count_bounds(dni_string)
+        assert lowest <= 50 <= highest
+
+
+def test_heavy_hitters_invalid_arguments_raise_value_error():
+    with pytest.raises(ValueError):
+        dni.DNIHeavyHitters(capacity=0)
+    with pytest.raises(ValueError):
+        dni.DNIHeavyHitters().top(0)
+    with pytest.raises(ValueError):
+        dni.DNIHeavyHitters(10).merge(dni.DNIHeavyHitters(20))
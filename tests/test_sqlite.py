@@ -0,0 +1,70 @@
+import json
+import sqlite3
+
+import pytest
+
+from dni.sqlite import register
+
+
+@pytest.fixture
+def connection():
+    a_connection = sqlite3.connect(":memory:")
+    register(a_connection)
+    yield a_connection
+    a_connection.close()
+
+
+def select_one(connection, sql, *parameters):
+    return connection.execute(sql, parameters).fetchone()[0]
+
+
+@pytest.mark.parametrize(
+    "sql_function, value, expected",
+    [
+        ("dni_is_valid", "27592354-j", 1),
+        ("dni_is_valid", "27592354X", 0),
+        ("dni_is_valid", None, None),
+        ("dni_check_letter", "27592354", "J"),
+        ("dni_check_letter", 1234567, "L"),
+        ("dni_check_letter", "ABC", None),
+        ("dni_fix", "27592354X", "27592354J"),
+        ("dni_fix", "27592354", "27592354J"),
+        ("dni_fix", "ABC", None),
+        ("dni_normalize", " 27592354 - j", "27592354J"),
+        ("dni_normalize", "27592354X", None),
+    ],
+)
+def test_scalar_functions(connection, sql_function, value, expected):
+    assert select_one(connection, f"SELECT {sql_function}(?)", value) == (
+        expected
+    )
+
+
+def test_extracted_dnis_can_be_turned_into_rows(connection):
+    connection.execute("CREATE TABLE notes (id INTEGER, body TEXT)")
+    connection.executemany(
+        "INSERT INTO notes VALUES (?, ?)",
+        [(1, "Mi DNI es 12543456-S, no 65412354-X"), (2, "Otro: 65412354-D")],
+    )
+
+    rows = connection.execute(
+        "SELECT notes.id, found.value"
+        " FROM notes, json_each(dni_extract(notes.body)) AS found"
+        " ORDER BY notes.id"
+    ).fetchall()
+
+    assert rows == [(1, "12543456S"), (2, "65412354D")]
+    assert json.loads(select_one(connection, "SELECT dni_extract('')")) == []
+
+
+def test_functions_can_be_used_in_indexes_and_generated_columns(connection):
+    connection.execute(
+        "CREATE TABLE customers (document TEXT,"
+        " dni TEXT GENERATED ALWAYS AS (dni_normalize(document)))"
+    )
+    connection.execute(
+        "CREATE INDEX valid_documents ON customers (dni_is_valid(document))"
+    )
+    connection.execute("INSERT INTO customers VALUES ('27592354-j')")
+
+    assert select_one(connection, "SELECT dni FROM customers") == "27592354J"
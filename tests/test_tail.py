@@ -0,0 +1,124 @@
+import pytest
+
+import dni
+from dni.tail import DNIFileTailer
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return tmp_path / "app.log"
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "state.json")
+
+
+def append(path, text):
+    with open(path, "at") as log_file:
+        log_file.write(text)
+
+
+def scan_as_strings(tailer, path):
+    return [a_dni.format() for a_dni in tailer.scan(path)]
+
+
+def test_scan_only_returns_newly_appended_dnis(log_path, state_path):
+    tailer = DNIFileTailer(state_path)
+
+    append(log_path, "login 12543456-S\n")
+    first_scan = scan_as_strings(tailer, log_path)
+    append(log_path, "login 65412354-D\n")
+    second_scan = scan_as_strings(tailer, log_path)
+
+    assert first_scan == ["12543456S"] and second_scan == ["65412354D"]
+
+
+def test_dni_split_across_appends_is_found_once(log_path, state_path):
+    tailer = DNIFileTailer(state_path)
+
+    append(log_path, "login 1254")
+    first_scan = scan_as_strings(tailer, log_path)
+    append(log_path, "3456-S\n")
+    second_scan = scan_as_strings(tailer, log_path)
+    third_scan = scan_as_strings(tailer, log_path)
+
+    assert first_scan == [] and second_scan == ["12543456S"]
+    assert third_scan == []
+
+
+def test_offsets_are_persisted_across_instances(log_path, state_path):
+    append(log_path, "login 12543456-S\n")
+    scan_as_strings(DNIFileTailer(state_path), log_path)
+
+    new_tailer = DNIFileTailer(state_path)
+
+    assert new_tailer.offset(log_path) == log_path.stat().st_size
+    assert scan_as_strings(new_tailer, log_path) == []
+
+
+def test_truncated_file_is_scanned_from_the_start(log_path, state_path):
+    tailer = DNIFileTailer(state_path)
+    append(log_path, "login 12543456-S\nlogin 65412354-D\n")
+    scan_as_strings(tailer, log_path)
+
+    log_path.write_text("login 27592354J\n")
+
+    assert scan_as_strings(tailer, log_path) == ["27592354J"]
+
+
+def test_small_chunks_find_the_same_dnis(log_path, state_path):
+    append(log_path, "ñ 12543456-S € 65412354 D\n27592354J\n")
+
+    tailer = DNIFileTailer(state_path, chunk_size=3)
+
+    assert scan_as_strings(tailer, log_path) == [
+        "12543456S",
+        "65412354D",
+        "27592354J",
+    ]
+
+
+def test_custom_scanner_is_used(log_path, state_path):
+    tailer = DNIFileTailer(
+        state_path, scanner=dni.DNIScanner(max_separator_chars=6)
+    )
+
+    append(log_path, "login 12543456 ---> S\n")
+
+    assert scan_as_strings(tailer, log_path) == ["12543456S"]
+
+
+def test_non_positive_chunk_size_raises_value_error(state_path):
+    with pytest.raises(ValueError):
+        DNIFileTailer(state_path, chunk_size=0)
+
+
+def test_invalid_dnis_do_not_block_later_scans(log_path, state_path):
+    tailer = DNIFileTailer(state_path)
+
+    append(log_path, "typo 12345678A\n")
+    first_scan = tailer.scan(log_path, mode="report")
+    append(log_path, "login 65412354-D\n")
+    second_scan = scan_as_strings(tailer, log_path)
+
+    assert first_scan.dnis == []
+    assert [
+        (dni_match.start, dni_match.raw)
+        for dni_match in first_scan.invalid_matches
+    ] == [(5, "12345678A")]
+    assert second_scan == ["65412354D"]
+
+
+def test_strict_scans_raise_without_dropping_dnis(log_path, state_path):
+    tailer = DNIFileTailer(state_path)
+    append(log_path, "typo 12345678A\nlogin 65412354-D\n")
+
+    with pytest.raises(dni.InvalidCheckLetterException):
+        tailer.scan(log_path, mode="strict")
+    report = tailer.scan(log_path, mode="report")
+
+    assert [a_dni.format() for a_dni in report.dnis] == ["65412354D"]
+    assert [dni_match.raw for dni_match in report.invalid_matches] == [
+        "12345678A"
+    ]
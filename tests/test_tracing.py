@@ -0,0 +1,74 @@
+import pytest
+
+import dni
+from dni import tracing
+from dni.__main__ import main
+
+
+def test_calls_are_broken_down_by_phase():
+    call_traces = []
+
+    with tracing.trace(call_traces.append) as summary:
+        dni.DNI("12345678-Z")
+        assert not dni.is_valid("12345678A")
+        dni.extract_dnis_from_text("12345678Z y 87654321X")
+
+    assert [call_trace.operation for call_trace in call_traces] == [
+        "DNI",
+        "validate",
+        "extract",
+    ]
+    assert dict(summary.calls) == {"DNI": 1, "validate": 1, "extract": 1}
+    for call_trace in call_traces:
+        assert set(call_trace.phase_durations) == set(tracing.PHASES)
+        assert sum(call_trace.phase_durations.values()) == pytest.approx(
+            call_trace.duration
+        )
+
+    dni_phases, validate_phases, extract_phases = [
+        call_trace.phase_durations for call_trace in call_traces
+    ]
+    assert dni_phases["number_search"] > 0
+    assert dni_phases["exception_construction"] == 0
+    assert validate_phases["exception_construction"] > 0
+    assert extract_phases["letter_search"] > 0
+    assert extract_phases["number_search"] == 0
+
+
+def test_instrumentation_is_removed_after_tracing():
+    original_parse = dni.DNIScanner.parse
+
+    with tracing.trace():
+        with tracing.trace() as inner_summary:
+            assert dni.DNIScanner.parse is not original_parse
+        dni.is_valid("12345678Z")
+
+    assert dni.DNIScanner.parse is original_parse
+    assert isinstance(
+        dni.DNIScanner.__dict__["_compute_check_letter"], staticmethod
+    )
+    assert not inner_summary.calls
+
+
+def test_hooks_see_calls_from_custom_scanners():
+    call_traces = []
+    scanner = dni.DNIScanner(unicode_tolerant=True)
+
+    tracing.add_hook(call_traces.append)
+    try:
+        scanner.diagnose("１２３４５６７８Ｚ")
+    finally:
+        tracing.remove_hook(call_traces.append)
+    scanner.diagnose("12345678Z")
+
+    assert [call_trace.operation for call_trace in call_traces] == ["diagnose"]
+    assert call_traces[0].phase_durations["clutter_removal"] > 0
+
+
+def test_profile_command_prints_phases_and_hot_functions(capsys):
+    main(["profile", "--iterations", "20", "--limit", "5"])
+
+    output = capsys.readouterr().out
+    assert "exception_construction" in output
+    assert "scanner.py" in output
+    assert "run_workload" not in output
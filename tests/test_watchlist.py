@@ -0,0 +1,55 @@
+import io
+
+import numpy
+
+import dni
+from dni.scanner import DEFAULT_STREAM_CHUNK_SIZE
+from dni.watchlist import DNIWatchlist
+
+
+def test_only_watchlisted_dnis_are_reported():
+    watchlist = DNIWatchlist(["12345678Z", 87654321])
+    text = "Pagos de 12345678-Z, 11111111H y 87654321-a, otra vez 12345678z"
+
+    hits = watchlist.search(text)
+
+    assert [(hit.start, hit.end, hit.raw) for hit in hits] == [
+        (9, 19, "12345678-Z"),
+        (33, 43, "87654321-a"),
+        (54, 63, "12345678z"),
+    ]
+    assert [hit.check_letter for hit in hits] == ["Z", "a", "z"]
+    assert watchlist.search("Nada que ver: 11111111H") == []
+
+
+def test_streams_are_searched_across_chunks():
+    watchlist = DNIWatchlist()
+    watchlist.update_packed(numpy.array([12543456, 65412354]))
+    padding = " " * (DEFAULT_STREAM_CHUNK_SIZE - 4)
+    text = padding + "12543456-S 11111111H\n65412354D\n"
+
+    hits = list(watchlist.iter_search(io.StringIO(text)))
+
+    assert [hit.number for hit in hits] == ["12543456", "65412354"]
+    assert hits == watchlist.search(text)
+
+
+def test_unicode_tolerant_scanners_match_full_width_numbers():
+    watchlist = DNIWatchlist(
+        ["12543456S"], scanner=dni.DNIScanner(unicode_tolerant=True)
+    )
+
+    (hit,) = watchlist.search("DNI １２５４３４５６－Ｓ")
+
+    assert (hit.number, hit.check_letter) == ("12543456", "S")
+
+
+def test_number_filters_skip_candidates():
+    scanner = dni.DNIScanner()
+    text = "12543456S 65412354D 11111111H"
+
+    dni_matches = scanner.finditer(
+        text, number_filter=lambda number: number.startswith("6")
+    )
+
+    assert [dni_match.raw for dni_match in dni_matches] == ["65412354D"]